@@ -0,0 +1,91 @@
+"""
+Measure the time it takes to issue a command (until its handle is returned), with and without reading the pose first.
+
+Needs a running simulator. The drone takes off and is sent many short commands, each replacing the previous one.
+Run from the repository root: python -m benchmarks.command_latency
+"""
+import argparse
+import time
+from typing import Callable, List
+
+from simple_airsim._utils import do_action, get_state
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.command_handle import CommandHandle
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.sim_drone import SimDrone
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def _two_reads_move_by(drone: SimDrone, x: float, y: float, z: float, telemetry: bool = False) -> CommandHandle:
+    """
+    move_by as it used to be: the position and the orientation in separate calls, then the command.
+    The reads used to share the connection of the commands, unless telemetry is set.
+    """
+    def action():
+        client = drone.telemetry_client if telemetry else drone.client
+        pos = get_state.position(client, drone.vehicle_name)
+        ori = get_state.orientation(client, drone.vehicle_name)
+        # noinspection PyProtectedMember
+        return do_action._move_by(drone.client, pos, ori['yaw'], x, y, z, drone.vehicle_name)
+
+    # noinspection PyProtectedMember
+    return drone._command(action)
+
+
+def _measure(cached: SimDrone, send: Callable[[int], CommandHandle], commands: int) -> List[float]:
+    latencies = []
+    for i in range(commands):
+        if i % 10 == 0:
+            cached.get_snapshot()  # Keeps the reading fresh for the cached pose, outside of the measurement.
+        start = time.perf_counter()
+        send(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ip", default="")
+    parser.add_argument("--port", type=int, default=41451)
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument("--body-frame", action="store_true",
+                        help="Also measure move_by_velocity in the drone's frame (needs AirSim 1.4 or later).")
+    args = parser.parse_args()
+
+    pool = ConnectionPool(args.ip, args.port)
+    drone = SimDrone(coordinate_system.AIRSIM, pool=pool)
+    # The same drone, starting relative commands from a reading of the last second.
+    cached = SimDrone(coordinate_system.AIRSIM, pool=pool, pose_max_age=1)
+    drone.client.confirmConnection()
+    drone.enable_api_control(True)
+    drone.takeoff(True)
+
+    def sign(i: int) -> int:
+        return 1 if i % 2 == 0 else -1
+
+    cases = [
+        ("move_by, 2 pose reads (before)", lambda i: _two_reads_move_by(drone, 0.1 * sign(i), 0, 0)),
+        ("move_by, 2 pose reads, telemetry", lambda i: _two_reads_move_by(drone, 0.1 * sign(i), 0, 0, True)),
+        ("move_by, 1 pose read", lambda i: drone.move_by(0.1 * sign(i), 0, 0)),
+        ("move_by, cached pose", lambda i: cached.move_by(0.1 * sign(i), 0, 0)),
+        ("move_by_velocity (world)", lambda i: drone.move_by_velocity(0.1 * sign(i), 0, 0, 0.1, body_frame=False)),
+        ("turn_at_rate", lambda i: drone.turn_at_rate(10 * sign(i), 0.1)),
+    ]
+    if args.body_frame:
+        cases.append(("move_by_velocity (body)", lambda i: drone.move_by_velocity(0.1 * sign(i), 0, 0, 0.1)))
+
+    print("%-34s %10s %10s %10s" % ("", "p50 (ms)", "p95 (ms)", "max (ms)"))
+    for name, send in cases:
+        latencies = _measure(cached, send, args.commands)
+        print("%-34s %10.3f %10.3f %10.3f" % (name, _percentile(latencies, 50) * 1000,
+                                                _percentile(latencies, 95) * 1000, max(latencies) * 1000))
+
+    drone.hover(True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Measure the per-point cost of converting positions and orientations with the scalar and the batch methods
+of CoordinateSystem.
+
+Doesn't need a simulator.
+Run from the repository root: python -m benchmarks.coordinate_transforms
+"""
+import argparse
+import time
+
+import numpy as np
+
+from simple_airsim.api import coordinate_system
+
+
+def _seconds(method, repeat: int) -> float:
+    method()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        method()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-points", type=int, default=10 ** 6)
+    parser.add_argument("--scalar-points", type=int, default=10 ** 4,
+                        help="The number of points converted one at a time (the scalar loop is slow).")
+    args = parser.parse_args()
+
+    system = coordinate_system.CoordinateSystem(pos_matrix=np.diag([1, -1, -1]), pos_offset=(1, 2, 3),
+                                                ori_matrix=np.diag([1, -1, -1]), name="FLU")
+    rng = np.random.default_rng(0)
+
+    points = rng.uniform(-100, 100, (args.scalar_points, 3))
+    rows = points.tolist()
+    scalar = _seconds(lambda: [system.fa_pos(x, y, z) for x, y, z in rows], 3) / len(rows)
+    scalar_ori = _seconds(lambda: [system.fa_ori(r, p, y) for r, p, y in rows], 3) / len(rows)
+
+    print("%-22s %12s" % ("", "ns / point"))
+    print("%-22s %12.1f" % ("fa_pos (scalar)", scalar * 1e9))
+    print("%-22s %12.1f" % ("fa_ori (scalar)", scalar_ori * 1e9))
+
+    count = 1
+    while count <= args.max_points:
+        points = rng.uniform(-100, 100, (count, 3))
+        repeat = max(3, 10 ** 5 // count)
+        batch = _seconds(lambda: system.fa_pos_batch(points), repeat) / count
+        print("%-22s %12.1f" % ("fa_pos_batch (N=%d)" % count, batch * 1e9))
+        count *= 100
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare get_image (one compressed image per call) and get_images (all the cameras, uncompressed, in one call),
+with and without reusing the output arrays: the frames per second, and the CPU time of the calling thread per frame
+(decoding and unpacking the responses, which is what get_images saves).
+
+Runs against the local stand-in simulator (LocalSim), started on a free port, or against a running simulator with
+--port. LocalSim renders in the same process as the client, so its frame rate is mostly its own rendering;
+the CPU time is the client's alone.
+Run from the repository root: python -m benchmarks.image_capture --cameras 0 1 2 [--image-size 640 480]
+"""
+import argparse
+import time
+
+from simple_airsim.api import coordinate_system, camera_config
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.local_sim import DEFAULT_IMAGE_SIZE, LocalSim
+from simple_airsim.api.sim_drone import SimDrone
+
+
+def _measure(capture, repeat: int):
+    """
+    :return: The frames per second, and the CPU time of this thread per frame, in seconds.
+    """
+    capture()  # warm up
+    start, cpu_start = time.perf_counter(), time.thread_time()
+    for _ in range(repeat):
+        capture()
+    return repeat / (time.perf_counter() - start), (time.thread_time() - cpu_start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ip", default="")
+    parser.add_argument("--port", type=int, help="Use a running simulator instead of the local stand-in.")
+    parser.add_argument("--image-size", type=int, nargs=2, default=DEFAULT_IMAGE_SIZE,
+                        help="The width and height of the local stand-in's images.")
+    parser.add_argument("--cameras", nargs="+", default=["0"], help="The ids of the cameras.")
+    parser.add_argument("--image-type", default="VISUAL", choices=[t.name for t in camera_config.ImageType])
+    parser.add_argument("--return-type", default="RGB", choices=[t.name for t in camera_config.ReturnType])
+    parser.add_argument("--repeat", type=int, default=50, help="Frames per measurement.")
+    args = parser.parse_args()
+
+    sim = None
+    if args.port is None:
+        sim = LocalSim(port=0, image_size=tuple(args.image_size)).start()
+    pool = ConnectionPool(args.ip, sim.port if sim is not None else args.port)
+    try:
+        drone = SimDrone(coordinate_system.AIRSIM, pool=pool)
+
+        image_type = camera_config.ImageType[args.image_type]
+        return_type = camera_config.ReturnType[args.return_type]
+        requests = [camera_config.ImageRequest(camera, image_type, return_type) for camera in args.cameras]
+        buffers = [buffer.copy() for buffer in drone.get_images(requests)]  # Writable arrays of the right shapes.
+
+        results = [
+            ("get_image", lambda: [drone.get_image(camera, image_type, return_type) for camera in args.cameras]),
+            ("get_images", lambda: drone.get_images(requests)),
+            ("get_images + out", lambda: drone.get_images(requests, out=buffers)),
+        ]
+
+        print("%-18s %12s %12s %18s" % ("", "frames/s", "images/s", "CPU / frame (ms)"))
+        for name, capture in results:
+            fps, cpu = _measure(capture, args.repeat)
+            print("%-18s %12.1f %12.1f %18.2f" % (name, fps, fps * len(requests), cpu * 1000))
+    finally:
+        pool.close()
+        if sim is not None:
+            sim.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Compare sequential and pipelined lidar reads as the number of lidars grows.
+
+Needs a running simulator with the lidars from 'settings.json'.
+Counts above the 6 configured lidars cycle through them again, which costs the simulator the same as reading the
+extra sensors of the 10 lidar layout would.
+Run from the repository root: python -m benchmarks.lidar_reads
+"""
+import argparse
+import itertools
+import time
+
+import airsim
+
+# noinspection PyProtectedMember
+from simple_airsim._utils import airsim_lidars
+# noinspection PyProtectedMember
+from simple_airsim.api.sim_drone import _DEFAULT_LIDAR_NAMES
+
+
+def _sequential(client: airsim.MultirotorClient, names):
+    return [client.getLidarData(lidar_name=name) for name in names]
+
+
+def _pipelined(client: airsim.MultirotorClient, names):
+    # noinspection PyProtectedMember
+    return airsim_lidars._get_many(client, names)
+
+
+def _time_per_call(method, client, names, repeat: int) -> float:
+    method(client, names)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        method(client, names)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=100, help="Reads per measurement.")
+    parser.add_argument("--max-lidars", type=int, default=10)
+    args = parser.parse_args()
+
+    client = airsim.MultirotorClient()
+    client.confirmConnection()
+
+    print("%7s %16s %16s" % ("lidars", "sequential (ms)", "pipelined (ms)"))
+    for count in range(1, args.max_lidars + 1):
+        names = list(itertools.islice(itertools.cycle(_DEFAULT_LIDAR_NAMES.keys()), count))
+        sequential = _time_per_call(_sequential, client, names, args.repeat)
+        pipelined = _time_per_call(_pipelined, client, names, args.repeat)
+        print("%7d %16.3f %16.3f" % (count, sequential * 1000, pipelined * 1000))
+
+
+if __name__ == '__main__':
+    main()
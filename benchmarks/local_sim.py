@@ -0,0 +1,54 @@
+"""
+Measure how much faster than real time the local stand-in simulator (LocalSim) runs: the raw physics steps of its
+model, and a lockstep run of SimDrone against it over RPC (see Lockstep).
+
+Needs no simulator.
+Run from the repository root: python -m benchmarks.local_sim
+"""
+import argparse
+import time
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.local_sim import LocalSim
+from simple_airsim.api.lockstep import Lockstep
+from simple_airsim.api.sim_drone import SimDrone
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sim-seconds", type=float, default=600, help="The simulator time of the raw physics run.")
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--dt", type=float, nargs="+", default=[0.01, 0.05, 0.1],
+                        help="The simulator time of a lockstep step, in seconds.")
+    args = parser.parse_args()
+
+    sim = LocalSim(port=0, paused=True)
+    # noinspection PyProtectedMember
+    model = sim._vehicle("").model
+    model.takeoff()
+    start = time.monotonic()
+    # noinspection PyProtectedMember
+    sim._advance(args.sim_seconds)
+    wall = time.monotonic() - start
+    print("physics: %d steps of %g s in %.3f s, %.0f x real time" % (round(args.sim_seconds / sim.physics_dt),
+                                                                    sim.physics_dt, wall, args.sim_seconds / wall))
+
+    with LocalSim(port=0) as sim:
+        drone = SimDrone(coordinate_system.AIRSIM, pool=ConnectionPool("", sim.port))
+        drone.enable_api_control(True)
+        drone.takeoff(wait=True)
+
+        def tick(d: SimDrone, _):
+            d.move_by_velocity(1, 0, 0, 1, body_frame=False)
+
+        print("%-8s %8s %12s %12s %12s" % ("dt (s)", "steps", "sim (s)", "wall (s)", "sim / wall"))
+        for dt in args.dt:
+            stats = Lockstep(drone, tick, dt, with_lidars=True).run(args.steps)
+            print("%-8g %8d %12.3f %12.3f %12.2f" % (dt, stats["steps"], stats["sim_time"], stats["wall_time"],
+                                                     stats["sim_wall_ratio"]))
+        drone.pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Measure the latency of the getters while another thread waits for a long move to finish.
+
+Needs a running simulator. The drone takes off and flies back and forth.
+Run from the repository root: python -m benchmarks.lock_contention
+"""
+import argparse
+import threading
+import time
+from typing import List
+
+import airsim
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.sim_drone import SimDrone
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def _print_latencies(name: str, latencies: List[float]):
+    print("%-12s %7d %10.3f %10.3f %10.3f" % (name, len(latencies), _percentile(latencies, 50) * 1000,
+                                              _percentile(latencies, 95) * 1000, max(latencies) * 1000))
+
+
+def _read_until(drone: SimDrone, done) -> List[float]:
+    latencies = []
+    while not done():
+        start = time.perf_counter()
+        drone.get_position()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ip", default="")
+    parser.add_argument("--port", type=int, default=41451)
+    parser.add_argument("--distance", type=float, default=5, help="The length of the move, in meters.")
+    args = parser.parse_args()
+
+    client = airsim.MultirotorClient(args.ip, args.port)
+    client.confirmConnection()
+    client.enableApiControl(True)
+    drone = SimDrone(coordinate_system.AIRSIM, client=client)
+    drone.takeoff(True)
+
+    idle_end = time.perf_counter() + 1
+    idle = _read_until(drone, lambda: time.perf_counter() > idle_end)
+
+    move = threading.Thread(target=drone.move_by, args=(args.distance, 0, 0, True))
+    move.start()
+    moving = _read_until(drone, lambda: not move.is_alive())
+    drone.move_by(-args.distance, 0, 0, True)
+
+    print("%-12s %7s %10s %10s %10s" % ("", "reads", "p50 (ms)", "p95 (ms)", "max (ms)"))
+    _print_latencies("idle", idle)
+    _print_latencies("during move", moving)
+
+
+if __name__ == '__main__':
+    main()
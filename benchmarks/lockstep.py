@@ -0,0 +1,42 @@
+"""
+Measure how fast a lockstep run goes: the simulator time covered per real second (see Lockstep).
+
+Needs a running simulator. The drone flies forward at 1 m/s, one command per step.
+Run from the repository root: python -m benchmarks.lockstep
+"""
+import argparse
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.lockstep import Lockstep
+from simple_airsim.api.sim_drone import SimDrone
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ip", default="")
+    parser.add_argument("--port", type=int, default=41451)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--dt", type=float, nargs="+", default=[0.01, 0.05, 0.1],
+                        help="The simulator time of a step, in seconds.")
+    parser.add_argument("--with-lidars", action="store_true")
+    args = parser.parse_args()
+
+    drone = SimDrone(coordinate_system.AIRSIM, pool=ConnectionPool(args.ip, args.port))
+    drone.enable_api_control(True)
+
+    def tick(d: SimDrone, _):
+        d.move_by_velocity(1, 0, 0, 1, body_frame=False)
+
+    print("%-8s %8s %12s %12s %12s %12s" % ("dt (s)", "steps", "sim (s)", "wall (s)", "sim / wall", "tick (ms)"))
+    for dt in args.dt:
+        stats = Lockstep(drone, tick, dt, args.with_lidars).run(args.steps)
+        print("%-8g %8d %12.3f %12.3f %12.2f %12.3f" % (dt, stats["steps"], stats["sim_time"], stats["wall_time"],
+                                                        stats["sim_wall_ratio"],
+                                                        stats["tick_time"] / max(1, stats["steps"]) * 1000))
+
+    drone.hover()
+
+
+if __name__ == '__main__':
+    main()
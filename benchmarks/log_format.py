@@ -0,0 +1,73 @@
+"""
+Compare the write and load throughput of the CSV and binary log formats.
+Does not need a simulator. Run from the repository root: python -m benchmarks.log_format
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from simple_airsim.api import binary_log
+# noinspection PyProtectedMember
+from simple_airsim.api.logwriter import DEFAULT_SNAPSHOT_VALUES, _CsvFile
+
+
+def _write(file_type, filename, columns, rows, batch_size: int) -> float:
+    start = time.perf_counter()
+    file = file_type(filename, columns)
+    for i in range(0, len(rows), batch_size):
+        file.write_rows(rows[i:i + batch_size])
+    file.close()
+    return time.perf_counter() - start
+
+
+def _load_csv(filename) -> float:
+    start = time.perf_counter()
+    with open(filename) as file:
+        columns = [name.strip() for name in file.readline().split(",")]
+        values = [[] for _ in columns]
+        for line in file:
+            for column, x in zip(values, line.split(",")):
+                column.append(float(x))
+        loaded = {name: np.array(column) for name, column in zip(columns, values)}
+    sum(column.sum() for column in loaded.values())
+    return time.perf_counter() - start
+
+
+def _load_binary(filename) -> float:
+    start = time.perf_counter()
+    loaded = binary_log.read(filename)
+    sum(column.sum() for column in loaded.values())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    columns = list(DEFAULT_SNAPSHOT_VALUES.keys())
+    rows = np.random.rand(args.rows, len(columns)).tolist()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_filename = os.path.join(directory, "log.csv")
+        binary_filename = os.path.join(directory, "log.salog")
+
+        results = {
+            "csv": (_write(_CsvFile, csv_filename, columns, rows, args.batch_size), _load_csv(csv_filename),
+                    os.path.getsize(csv_filename)),
+            "binary": (_write(binary_log.BinaryLogFile, binary_filename, columns, rows, args.batch_size),
+                       _load_binary(binary_filename), os.path.getsize(binary_filename)),
+        }
+
+    print("%d rows of %d columns" % (args.rows, len(columns)))
+    print("%7s %16s %16s %10s" % ("format", "write (rows/s)", "load (rows/s)", "size (MB)"))
+    for name, (write_time, load_time, size) in results.items():
+        print("%7s %16.0f %16.0f %10.1f" % (name, args.rows / write_time, args.rows / load_time, size / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Measure the rays per second that World casts (the lidars and depth cameras of LocalSim) as the number of obstacles
+grows, with and without its spatial index. The obstacles are random boxes and walls at a fixed density, so a larger
+world is a larger area, as in a maze.
+
+Needs no simulator.
+Run from the repository root: python -m benchmarks.ray_casting
+"""
+import argparse
+import time
+
+import numpy as np
+
+from simple_airsim._utils import depth
+from simple_airsim.api.world import World
+
+# The obstacles per square kilometer.
+DENSITY = 2000
+
+
+def _world(count: int, rng: np.random.Generator, cell_size) -> World:
+    side = np.sqrt(count / DENSITY) * 1000
+    boxes = [{"center": [x, y, -2], "size": list(rng.uniform(1, 4, 2)) + [4], "yaw": float(rng.uniform(0, 90))}
+             for x, y in rng.uniform(-side / 2, side / 2, (count // 2, 2))]
+    walls = [{"start": list(start), "end": list(start + rng.uniform(-10, 10, 2)), "z": [-5, 0]}
+             for start in rng.uniform(-side / 2, side / 2, (count - count // 2, 2))]
+    return World(boxes, [{"point": [0, 0, 0], "normal": [0, 0, -1]}], walls, cell_size)
+
+
+def _lidar_rays(lidars: int, channels: int, points: int) -> np.ndarray:
+    elevation, azimuth = np.meshgrid(np.radians(np.linspace(-15, 15, channels)),
+                                     np.radians(np.linspace(0, 360, points, endpoint=False)), indexing="ij")
+    rays = np.stack((np.cos(elevation) * np.cos(azimuth), np.cos(elevation) * np.sin(azimuth), -np.sin(elevation)),
+                    axis=-1).reshape(-1, 3)
+    return np.tile(rays, (lidars, 1))
+
+
+def _rate(world: World, rays: np.ndarray, max_range: float, repeat: int) -> float:
+    origin = np.array([0.0, 0.0, -2.0])
+    world.cast(origin, rays, max_range)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        world.cast(origin, rays, max_range)
+    return len(rays) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--max-brute-force", type=int, default=1000,
+                        help="Skip the runs without the index above this many obstacles, since they take long.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    batches = {"lidars (6 x 16 x 180, 20 m)": (_lidar_rays(6, 16, 180), 20.0),
+               "depth camera (256 x 144, 100 m)": (depth.ray_grid(256, 144, 90.0, True).astype(float), 100.0)}
+
+    print("%-32s %10s %16s %16s" % ("batch", "obstacles", "index (rays/s)", "no index (rays/s)"))
+    for count in args.counts:
+        indexed, brute_force = _world(count, rng, 10.0), _world(count, np.random.default_rng(0), None)
+        for name, (rays, max_range) in batches.items():
+            brute = "-"
+            if count <= args.max_brute_force:
+                brute = "%.3g" % _rate(brute_force, rays, max_range, args.repeat)
+            print("%-32s %10d %16.3g %16s" % (name, len(indexed), _rate(indexed, rays, max_range, args.repeat), brute))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Measure recording and replaying a lockstep run (see RecordingClient and ReplayClient): what recording adds to a step,
+the size of the recording, and how fast it replays, as fast as possible and accelerated.
+
+Records against a local stand-in simulator (LocalSim) with a world to see, so the lidars return real distances.
+Run from the repository root: python -m benchmarks.replay
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.local_sim import LocalSim
+from simple_airsim.api.lockstep import Lockstep
+from simple_airsim.api.recording import RecordingClient, ReplayClient, read
+from simple_airsim.api.sim_drone import SimDrone
+
+WORLD = os.path.join(os.path.dirname(__file__), "..", "examples", "worlds", "square_loop.json")
+
+
+def _run(client, steps: int, dt: float):
+    """
+    :return: The readings of every step, and the wall time of the run.
+    """
+    drone = SimDrone(coordinate_system.AIRSIM, client=client)
+    drone.enable_api_control(True)
+    readings = []
+
+    def tick(d: SimDrone, snapshot):
+        readings.append((snapshot.position, snapshot.lidars))
+        d.move_by_velocity(1, 0, 0, 1)
+
+    start = time.perf_counter()
+    Lockstep(drone, tick, dt).run(steps)
+    return readings, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--dt", type=float, default=0.05, help="The simulator time of a step, in seconds.")
+    parser.add_argument("--speed", type=float, nargs="+", default=[10.0],
+                        help="The speeds to replay at, besides as fast as possible.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory, LocalSim(port=0, paused=True, world=WORLD) as sim:
+        path = os.path.join(directory, "run.rec")
+        _, plain = _run(ConnectionPool("", sim.port).control.client, args.steps, args.dt)
+        with RecordingClient(path, port=sim.port) as client:
+            recorded, recording = _run(client, args.steps, args.dt)
+        calls = len(read(path))
+        print("%d steps, %d calls, %.0f bytes per call" % (args.steps, calls, os.path.getsize(path) / calls))
+        print("%-28s %10s %12s %10s" % ("run", "wall (s)", "step (ms)", "same"))
+        print("%-28s %10.3f %12.3f %10s" % ("simulator", plain, plain / args.steps * 1000, "-"))
+        print("%-28s %10.3f %12.3f %10s" % ("simulator, recording", recording, recording / args.steps * 1000, "-"))
+
+        for speed in [None] + args.speed:
+            replayed, replaying = _run(ReplayClient(path, speed), args.steps, args.dt)
+            name = "replay, as fast as possible" if speed is None else "replay, %gx" % speed
+            print("%-28s %10.3f %12.3f %10s" % (name, replaying, replaying / args.steps * 1000, replayed == recorded))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Measure the cost of collecting RPC stats: the latency of get_snapshot without stats, with stats, and after
+disabling them again. Then print the stats that were collected.
+
+Needs a running simulator.
+Run from the repository root: python -m benchmarks.rpc_stats
+"""
+import argparse
+import time
+from typing import List
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.sim_drone import SimDrone
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def _read(drone: SimDrone, reads: int) -> List[float]:
+    latencies = []
+    for _ in range(reads):
+        start = time.perf_counter()
+        drone.get_snapshot()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ip", default="")
+    parser.add_argument("--port", type=int, default=41451)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--json", help="A path to save the collected stats to.")
+    args = parser.parse_args()
+
+    pool = ConnectionPool(args.ip, args.port)
+    drone = SimDrone(coordinate_system.AIRSIM, pool=pool)
+    _read(drone, 100)  # warm up
+
+    # Interleave the runs, so a drift in the simulator's speed doesn't favor one of them.
+    off, on, disabled = [], [], []
+    stats = None
+    for _ in range(5):
+        off += _read(drone, args.reads // 5)
+        stats = pool.enable_stats(stats)
+        on += _read(drone, args.reads // 5)
+        pool.disable_stats()
+        disabled += _read(drone, args.reads // 5)
+
+    print("%-16s %10s %10s %10s" % ("", "p50 (ms)", "p95 (ms)", "mean (ms)"))
+    for name, latencies in (("stats off", off), ("stats on", on), ("stats disabled", disabled)):
+        print("%-16s %10.3f %10.3f %10.3f" % (name, _percentile(latencies, 50) * 1000,
+                                              _percentile(latencies, 95) * 1000,
+                                              sum(latencies) / len(latencies) * 1000))
+
+    print(stats.to_json())
+    if args.json is not None:
+        stats.save(args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Measure the cost of the library's hot paths, save the results as JSON, and compare them with a baseline.
+
+The getters and the control tick run against the local stand-in simulator (LocalSim), started on a free port,
+or against a running simulator with --ip and --port. Every metric is timed call by call, and compared by its median.
+--record saves the responses of a run (see RecordingClient), and --replay runs against them as fast as possible
+instead of a simulator (with the same --repeat, --warmup and --metrics), to time the library without the network.
+With --baseline, the run fails (exit code 1) if a metric's median is slower than the baseline's by more than
+--threshold (e.g. 0.25 for 25%).
+
+Run from the repository root: python -m benchmarks.suite --output results.json [--baseline baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import airsim
+
+# noinspection PyProtectedMember
+from simple_airsim._utils import tools
+from simple_airsim.api import camera_config, coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.local_sim import LocalSim
+from simple_airsim.api.lockstep import Lockstep
+from simple_airsim.api.logwriter import LogWriter
+from simple_airsim.api.manager import Manager
+from simple_airsim.api.recording import RecordingClient, ReplayClient
+from simple_airsim.api.sim_drone import SimDrone
+
+DEFAULT_THRESHOLD = 0.25
+
+
+def _time(method: Callable[[], Any], repeat: int, warmup: int) -> Dict[str, float]:
+    """
+    :return: The 'count', 'mean', 'p50', 'p95' and 'max' of the time of a call, in seconds.
+    """
+    for _ in range(warmup):
+        method()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        method()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {"count": repeat, "mean": statistics.mean(times), "p50": statistics.median(times),
+            "p95": times[min(repeat - 1, int(repeat * 0.95))], "max": times[-1]}
+
+
+def _metrics(drone: SimDrone, manager: Manager, log_path: str) -> Dict[str, Callable[[], Any]]:
+    quaternion = airsim.to_quaternion(0.1, 0.2, 0.3)
+    log = LogWriter(manager, filename=log_path, use_thread=False)
+
+    def control_tick(d: SimDrone, snapshot):
+        d.move_by_velocity(1 if snapshot.lidars["front"] < 0 or snapshot.lidars["front"] > 2 else 0, 0, 0, 1)
+
+    # noinspection PyProtectedMember
+    lockstep = Lockstep(manager._drone, control_tick, 0.02, with_lidars=True)
+
+    return {"sim_drone.get_position": drone.get_position,
+            "sim_drone.get_orientation": drone.get_orientation,
+            "sim_drone.get_velocity": drone.get_velocity,
+            "sim_drone.get_lidars": drone.get_lidars,
+            "sim_drone.get_image": lambda: drone.get_image(0, camera_config.ImageType.VISUAL,
+                                                           camera_config.ReturnType.RGB),
+            "tools.quaternion_to_euler": lambda: tools.quaternion_to_euler(quaternion),
+            "log_writer.write": log.write,
+            "manager.control_tick": lockstep.step}
+
+
+def run(pool: ConnectionPool, repeat: int, warmup: int, names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    :param pool: The connections to the simulator.
+    :param repeat: The number of timed calls of every metric.
+    :param warmup: The number of calls before the timed ones.
+    :param names: The metrics to run. Leave 'None' for all.
+    :return: The results: 'metadata' and 'metrics' (the times of each, see _time).
+    """
+    drone = SimDrone(coordinate_system.AIRSIM, pool=pool)
+    drone.enable_api_control(True)
+    drone.takeoff(wait=True)
+    manager = Manager(coordinate_system.AIRSIM, pool=pool)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        metrics = _metrics(drone, manager, os.path.join(directory, "log.csv"))
+        was_paused = drone.pause_sim_state()
+        for name, method in metrics.items():
+            if names is not None and name not in names:
+                continue
+            if name == "manager.control_tick":  # It steps a paused simulator.
+                drone.pause_sim()
+            results[name] = _time(method, repeat, warmup)
+            if name == "manager.control_tick" and not was_paused:
+                drone.resume_sim()
+            print("%-28s p50 %10.1f us, p95 %10.1f us" % (name, results[name]["p50"] * 1e6, results[name]["p95"] * 1e6))
+
+    return {"metadata": {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                         "platform": platform.platform(), "repeat": repeat},
+            "metrics": results}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Print the change of every metric from the baseline.
+    :param results: The results of run.
+    :param baseline: The results of an earlier run.
+    :param threshold: The largest allowed slowdown of a median, as a fraction (e.g. 0.25 for 25%).
+    :return: The metrics that slowed down past the threshold.
+    """
+    regressions = []
+    print("%-28s %12s %12s %8s" % ("metric", "baseline", "current", "change"))
+    for name, metric in results["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            print("%-28s %12s %10.1fus %8s" % (name, "-", metric["p50"] * 1e6, "new"))
+            continue
+        change = metric["p50"] / base["p50"] - 1
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print("%-28s %10.1fus %10.1fus %+7.1f%%%s" % (name, base["p50"] * 1e6, metric["p50"] * 1e6, change * 100,
+                                                      "  SLOWER" if regressed else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ip", default="")
+    parser.add_argument("--port", type=int, help="Use a running simulator instead of the local stand-in.")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--metrics", nargs="+", help="The metrics to run. Leave out for all.")
+    parser.add_argument("--output", help="The path to save the results to, as JSON.")
+    parser.add_argument("--baseline", help="The path of earlier results to compare with.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--record", help="The path to record the calls of the run to.")
+    parser.add_argument("--replay", help="The path of a recorded run to replay instead of using a simulator.")
+    args = parser.parse_args()
+
+    sim = client = None
+    if args.replay is not None:
+        client = ReplayClient(args.replay, speed=None)
+        backend = "replay of %s" % args.replay
+    elif args.port is None:
+        sim = LocalSim(port=0).start()
+        backend = "local"
+    else:
+        backend = "%s:%d" % (args.ip or "127.0.0.1", args.port)
+    port = sim.port if sim is not None else args.port
+
+    if args.record is not None and client is None:
+        client = RecordingClient(args.record, args.ip, port)
+    pool = ConnectionPool.from_client(client) if client is not None else ConnectionPool(args.ip, port)
+    try:
+        results = run(pool, args.repeat, args.warmup, args.metrics)
+    finally:
+        pool.close()
+        if client is not None:
+            client.close()
+        if sim is not None:
+            sim.stop()
+    results["metadata"]["backend"] = backend
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("Slower than the baseline by more than %d%%: %s" % (args.threshold * 100, ", ".join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Measure how long a Stop (terminate_algo) takes while the algorithm waits for a long move, and how long a
+Stop -> Start cycle takes until the algorithm runs again (see Manager.terminate_algo).
+
+Needs a running simulator. The drone is sent far away, so the move is still running when it is stopped.
+Run from the repository root: python -m benchmarks.terminate_latency
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.manager import Manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ip", default="")
+    parser.add_argument("--port", type=int, default=41451)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--distance", type=float, default=1000, help="The length of the move, in meters.")
+    args = parser.parse_args()
+
+    started = threading.Event()
+
+    def algorithm(drone):
+        started.set()
+        drone.move_by(args.distance, 0, 0, wait=True)
+
+    manager = Manager(coordinate_system.AIRSIM, method=algorithm, pool=ConnectionPool(args.ip, args.port))
+    manager.enable_api_control(True)
+
+    stops, cycles, pauses = [], [], []
+    for _ in range(args.cycles):
+        started.clear()
+        manager.start_algo()
+        started.wait()
+        time.sleep(0.05)  # Let the move start.
+
+        # Pause: the wait is interrupted and the move cancelled, then sent again on resume.
+        start = time.monotonic()
+        manager.pause_algo()
+        # noinspection PyProtectedMember
+        while not manager._drone._last_command._interrupting:
+            time.sleep(0.0005)
+        pauses.append(time.monotonic() - start)
+        manager.resume_algo()
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        if not manager.terminate_algo():
+            raise RuntimeError("The algorithm didn't stop within the timeout.")
+        stops.append(time.monotonic() - start)
+
+        started.clear()
+        manager.start_algo()
+        started.wait()
+        cycles.append(time.monotonic() - start)
+        manager.terminate_algo()
+
+    for name, values in (("pause", pauses), ("stop", stops), ("stop -> start", cycles)):
+        print("%-14s p50 %8.2f ms, max %8.2f ms" % (name, statistics.median(values) * 1000, max(values) * 1000))
+
+    manager.enable_api_control(False)
+
+
+if __name__ == '__main__':
+    main()
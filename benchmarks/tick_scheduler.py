@@ -0,0 +1,53 @@
+"""
+Compare the rate of an algorithm loop that sleeps for a fixed time after every step (like examples/square.py) with
+the rate of the same step driven by TickScheduler, and show the scheduler's jitter and overruns.
+
+Needs a running simulator.
+Run from the repository root: python -m benchmarks.tick_scheduler
+"""
+import argparse
+import random
+import time
+
+from simple_airsim.api import coordinate_system, tick_scheduler
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.sim_drone import SimDrone
+from simple_airsim.api.tick_scheduler import TickScheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ip", default="")
+    parser.add_argument("--port", type=int, default=41451)
+    parser.add_argument("--rate", type=float, default=20)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--work", type=float, default=0.02,
+                        help="The longest time of the algorithm's own work in a step, in seconds (random up to this).")
+    args = parser.parse_args()
+
+    drone = SimDrone(coordinate_system.AIRSIM, pool=ConnectionPool(args.ip, args.port))
+    drone.enable_api_control(True)
+    rng = random.Random(0)
+
+    def tick(d: SimDrone, snapshot):
+        time.sleep(rng.uniform(0, args.work))
+        d.move_by_velocity(1 if snapshot.position['x'] < 10 else -1, 0, 0, 1, body_frame=False)
+
+    start = time.monotonic()
+    for _ in range(args.ticks):
+        tick(drone, drone.get_snapshot(True))
+        time.sleep(1 / args.rate)
+    print("%-22s %8.2f Hz (target %.2f)" % ("sleep after each step", args.ticks / (time.monotonic() - start), args.rate))
+
+    for policy in tick_scheduler.OVERRUN_POLICIES:
+        stats = TickScheduler(drone, tick, args.rate, policy).run(args.ticks)
+        jitter = stats["jitter"]
+        print("%-22s %8.2f Hz, jitter p50 %.2f / p95 %.2f / p99 %.2f ms, %d overruns, %d skipped"
+              % ("scheduler (%s)" % policy, stats["rate"], jitter["p50"] * 1000, jitter["p95"] * 1000,
+                 jitter["p99"] * 1000, stats["overruns"], stats["skipped"]))
+
+    drone.hover()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare the per-sample cost of the batch functions of _utils.tools with the scalar ones.
+That they give the same results is checked by tests/test_tools.py.
+
+Doesn't need a simulator.
+Run from the repository root: python -m benchmarks.tools_kernels
+"""
+import argparse
+import time
+
+import airsim
+import numpy as np
+
+# noinspection PyProtectedMember
+from simple_airsim._utils import tools
+
+
+def _seconds(method) -> float:
+    start = time.perf_counter()
+    method()
+    return time.perf_counter() - start
+
+
+def _random_quaternions(rng: np.random.Generator, count: int) -> np.ndarray:
+    q = rng.normal(size=(count, 4))
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    return q
+
+
+def _cases(rng: np.random.Generator, count: int):
+    quaternions = _random_quaternions(rng, count)
+    positions = rng.uniform(-100, 100, (count, 3))
+    moves = rng.uniform(-10, 10, (count, 3))
+    yaws = rng.uniform(-720, 720, count)
+    angles = rng.uniform(-5000, 5000, count)
+
+    def scalar_quaternions():
+        return np.array([tools.quaternion_to_euler(airsim.Quaternionr(x, y, z, w)) for w, x, y, z in quaternions])
+
+    def batch_quaternions():
+        return np.column_stack(tools.quaternion_to_euler_batch(*quaternions.T))
+
+    def scalar_relative_to_global():
+        return np.array([tools.relative_to_global({'x': p[0], 'y': p[1], 'z': p[2]}, yaw, *move)
+                         for p, yaw, move in zip(positions, yaws, moves)])
+
+    def scalar_velocity():
+        return np.array([tools.global_to_relative_velocity(*v, yaw) for v, yaw in zip(moves, yaws)])
+
+    return [
+        ("quaternion_to_euler", scalar_quaternions, batch_quaternions),
+        ("relative_to_global", scalar_relative_to_global,
+         lambda: tools.relative_to_global_batch(positions, yaws, moves)),
+        ("global_to_relative_velocity", scalar_velocity,
+         lambda: tools.global_to_relative_velocity_batch(moves, yaws)),
+        ("range_degrees", lambda: np.array([tools.range_degrees(a) for a in angles]),
+         lambda: tools.range_degrees_batch(angles)),
+        ("range_degrees (positive)", lambda: np.array([tools.range_degrees(a, False) for a in angles]),
+         lambda: tools.range_degrees_batch(angles, False)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=10 ** 5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print("%-30s %14s %14s %10s" % ("", "scalar (ns)", "batch (ns)", "speedup"))
+    for name, scalar, batch in _cases(rng, args.samples):
+        scalar_seconds = _seconds(scalar)
+        batch_seconds = _seconds(batch)
+        print("%-30s %14.1f %14.1f %10.0f" % (name, scalar_seconds / args.samples * 1e9,
+                                              batch_seconds / args.samples * 1e9, scalar_seconds / batch_seconds))
+
+
+if __name__ == '__main__':
+    main()
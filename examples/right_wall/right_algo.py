@@ -84,10 +84,11 @@ def loop(drone: Drone):
     global gui
 
     while True:
-        lidars: Dict[str, Optional[float]] = drone.get_lidars()
-        position: Dict[str, float] = drone.get_position()
-        orientation: Dict[str, float] = drone.get_orientation()
-        velocity: Dict[str, float] = drone.get_velocity()
+        snapshot = drone.get_snapshot(with_lidars=True)  # The state and the lidars in a single round trip.
+        lidars: Dict[str, Optional[float]] = dict(snapshot.lidars)
+        position: Dict[str, float] = snapshot.position
+        orientation: Dict[str, float] = snapshot.orientation
+        velocity: Dict[str, float] = snapshot.velocity
         normal_lidars(
             lidars)  # incase of infinity for the dronewwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwww not to go crazy
         print(lidars)
@@ -7,13 +7,11 @@ from simple_airsim.api.manager import Manager
 
 
 def loop(drone: Drone):
-    drone.takeoff(True)
+    drone.takeoff().wait()
     while True:
         for i in range(4):
-            drone.move_by(1, 0, 0, False)
-            time.sleep(2)
-            drone.turn_by(0, 0, 90, False)
-            time.sleep(2)
+            drone.move_by(1, 0, 0).wait()
+            drone.turn_by(0, 0, 90).wait()
         time.sleep(0.1)
 
 
@@ -1,45 +1,118 @@
 import math
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, Iterable, List, Union
 
 import airsim
 import numpy as np
+from msgpackrpc.future import Future
 
 from . import world_to_airsim
 
+# A reduction turns the ranges of all the points of a lidar (a 1D float32 array, in airsim) into a single value.
+Reduction = Callable[[np.ndarray], float]
+
+
+def percentile(q: float) -> Reduction:
+    """
+    :param q: The percentile to compute, between 0 and 100.
+    :return: A reduction that returns the q-th percentile of the ranges.
+    """
+    return lambda ranges: float(np.percentile(ranges, q))
+
+
+REDUCTIONS = {
+    "nearest": lambda ranges: float(ranges.min()),
+    "farthest": lambda ranges: float(ranges.max()),
+    "mean": lambda ranges: float(ranges.mean()),
+    "median": lambda ranges: float(np.median(ranges)),
+    "count": lambda ranges: float(ranges.shape[0]),
+}
+
+# Reductions that do not return a distance, and so should not be translated to real-world.
+UNITLESS_REDUCTIONS = {"count"}
+
+DEFAULT_REDUCTION = "last"
+
 
 def _parse_lidarData(data):
-    # reshape array of floats to array of [X,Y,Z]
-    points = np.array(data.point_cloud, dtype=np.dtype('f4'))
-    points = np.reshape(points, (int(points.shape[0] / 3), 3))
+    # reshape array of floats to array of [X,Y,Z]. The reshape is a view, so the point cloud is only copied once.
+    points = np.asarray(data.point_cloud, dtype=np.float32)
+    return points[:points.shape[0] - points.shape[0] % 3].reshape(-1, 3)
 
-    return points
 
+def _ranges(points: np.ndarray) -> np.ndarray:
+    """
+    :param points: An array of [X,Y,Z] points in the sensor's frame.
+    :return: The distance of every point from the sensor.
+    """
+    return np.sqrt(np.einsum('ij,ij->i', points, points))
 
-def _get_dist(point: np.ndarray, pos: np.ndarray) -> float:
-    x = point[0] - pos[0]
-    y = point[1] - pos[1]
-    z = point[2] - pos[2]
 
+def _last_dist(point_cloud) -> float:
+    x, y, z = point_cloud[-3:]
     return math.sqrt(x * x + y * y + z * z)
 
 
-def _lidar_dist(lidar: airsim.LidarData) -> Optional[float]:
+def _lidar_dist(lidar: airsim.LidarData, reduction: Union[str, Reduction] = DEFAULT_REDUCTION) -> Optional[float]:
     if len(lidar.point_cloud) < 3:
-        return world_to_airsim.distance(-1)
+        return 0.0 if reduction == "count" else world_to_airsim.distance(-1)
+
+    if reduction == DEFAULT_REDUCTION:
+        # Only the last point is needed, so skip building the array.
+        return _last_dist(lidar.point_cloud)
+
+    if not callable(reduction):
+        reduction = REDUCTIONS[reduction]
+    return reduction(_ranges(_parse_lidarData(lidar)))
+
+
+def _request_many(client: airsim.MultirotorClient, lidar_names: Iterable[str], vehicle_name: str = "") -> List[Future]:
+    """
+    Send a request for each lidar without waiting for the responses.
+
+    :param client: The multirotor client.
+    :param lidar_names: The names of the lidars in airsim.
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
+    :return: A future for each lidar, in the same order as lidar_names. Pass them to _gather.
+    """
+    return [client.client.call_async("getLidarData", name, vehicle_name) for name in lidar_names]
+
+
+def _gather(futures: Iterable[Future]) -> List[airsim.LidarData]:
+    return [airsim.LidarData.from_msgpack(future.get()) for future in futures]
+
+
+def _get_many(client: airsim.MultirotorClient, lidar_names: Iterable[str],
+              vehicle_name: str = "") -> List[airsim.LidarData]:
+    """
+    Read several lidars in about one round trip.
+    All the requests are sent before waiting for any of the responses, so the simulator handles them back to back.
+
+    :param client: The multirotor client.
+    :param lidar_names: The names of the lidars in airsim.
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
+    :return: The data of each lidar, in the same order as lidar_names.
+    """
+    return _gather(_request_many(client, lidar_names, vehicle_name))
+
+
+def _reduce_all(lidar_names: Dict[str, str], data: Iterable[airsim.LidarData],
+                reductions: Optional[Dict[str, Union[str, Reduction]]] = None):
+    if reductions is None:
+        reductions = {}
 
-    point = _parse_lidarData(lidar)[-1]
-    val = _get_dist(point, np.array([0, 0, 0]))
-    return val if val is not None else world_to_airsim.distance(-1)
+    return {value: _lidar_dist(lidar, reductions.get(name, DEFAULT_REDUCTION))
+            for (name, value), lidar in zip(lidar_names.items(), data)}
 
 
-def get(client: airsim.MultirotorClient, lidar_names: Dict[str, str]):
+def get(client: airsim.MultirotorClient, lidar_names: Dict[str, str],
+        reductions: Optional[Dict[str, Union[str, Reduction]]] = None, vehicle_name: str = ""):
     """
 
-    :param client: 
-    :param lidar_names: 
+    :param client:
+    :param lidar_names:
+    :param reductions: The reduction of each lidar (by its name in airsim), either a name from REDUCTIONS,
+     "last" for the range of the last point, or a function from the ranges to a value. Defaults to "last".
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
     :return:
     """
-    return_value = {}
-    for name, value in lidar_names.items():
-        return_value[value] = _lidar_dist(client.getLidarData(lidar_name=name))
-    return return_value
+    return _reduce_all(lidar_names, _get_many(client, lidar_names.keys(), vehicle_name), reductions)
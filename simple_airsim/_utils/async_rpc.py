@@ -0,0 +1,170 @@
+import asyncio
+import itertools
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import airsim
+import msgpack
+from msgpackrpc.error import RPCError
+
+_REQUEST = 0
+_RESPONSE = 1
+
+
+class _Request(Exception):
+    def __init__(self, method: str, args: tuple):
+        super().__init__(method)
+        self.request = method, args
+
+
+class _RequestBuilder(airsim.MultirotorClient):
+    """
+    Runs the methods of airsim's client, but stops at the call and returns its (method, args) instead of sending it.
+    This keeps the arguments of every call exactly as airsim sends them.
+    """
+
+    # noinspection PyMissingConstructor
+    def __init__(self):
+        self.client = self
+
+    def call(self, method: str, *args):
+        raise _Request(method, args)
+
+    def call_async(self, method: str, *args):
+        raise _Request(method, args)
+
+
+class _Requests:
+    def __init__(self):
+        self._builder = _RequestBuilder()
+
+    def __getattr__(self, name: str) -> Callable[..., Tuple[str, tuple]]:
+        method = getattr(self._builder, name)
+
+        def build(*args, **kwargs) -> Tuple[str, tuple]:
+            try:
+                method(*args, **kwargs)
+            except _Request as request:
+                return request.request
+            raise ValueError("airsim's %s() does not call the simulator." % name)
+
+        return build
+
+    @property
+    def client(self) -> "_Requests":
+        """
+        For code that calls client.client.call_async itself, e.g. for calls that airsim's client doesn't wrap.
+        """
+        return self
+
+    @staticmethod
+    def call_async(method: str, *args) -> Tuple[str, tuple]:
+        return method, args
+
+
+# E.g. REQUESTS.takeoffAsync() returns ("takeoff", (20, "")).
+REQUESTS = _Requests()
+
+
+class AsyncClient:
+    """
+    A msgpack-rpc client for asyncio, that talks to the same server as airsim.MultirotorClient.
+    Any number of calls can be in progress at once, on a single connection and without threads.
+    """
+    _reader: Optional[asyncio.StreamReader]
+    _writer: Optional[asyncio.StreamWriter]
+    _pending: Dict[int, asyncio.Future]
+
+    def __init__(self, ip: str = "", port: int = 41451, timeout: Optional[float] = None):
+        """
+
+        :param ip: The ip of the simulator. Leave empty for localhost.
+        :param port: The port of the simulator.
+        :param timeout: The maximal time to wait for a response, in seconds. Leave 'None' to wait forever.
+        """
+        self.ip = ip if ip != "" else "127.0.0.1"
+        self.port = port
+        self.timeout = timeout
+
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._pending = {}
+        self._ids = itertools.count()
+        self._packer = msgpack.Packer(default=lambda x: x.to_msgpack())
+        self._connect_lock = None
+
+    async def connect(self):
+        """
+        Connect to the simulator. Called automatically by the first call.
+        """
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+            self._reader, self._writer = await asyncio.open_connection(self.ip, self.port)
+            self._read_task = asyncio.ensure_future(self._read_loop())
+
+    async def call(self, method: str, *args) -> Any:
+        """
+        Call a method of the simulator.
+        :param method: The name of the method in the msgpack-rpc api (e.g. "getMultirotorState").
+        :param args: The arguments of the method.
+        :return: The raw result (e.g. a dictionary, to be parsed with airsim.MultirotorState.from_msgpack).
+        """
+        if self._writer is None:
+            await self.connect()
+
+        msgid = next(self._ids)
+        future = asyncio.get_event_loop().create_future()
+        self._pending[msgid] = future
+        self._writer.write(self._packer.pack([_REQUEST, msgid, method, args]))
+        await self._writer.drain()
+
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(msgid, None)
+
+    async def send(self, request: Tuple[str, tuple]) -> Any:
+        """
+        :param request: A (method, args) tuple, e.g. from REQUESTS.
+        :return: The raw result.
+        """
+        method, args = request
+        return await self.call(method, *args)
+
+    async def _read_loop(self):
+        unpacker = msgpack.Unpacker(raw=False)
+        try:
+            while True:
+                data = await self._reader.read(1 << 16)
+                if not data:
+                    break
+                unpacker.feed(data)
+                for message in unpacker:
+                    if message[0] != _RESPONSE:
+                        continue
+                    _, msgid, error, result = message
+                    future = self._pending.pop(msgid, None)
+                    if future is None or future.done():
+                        continue
+                    if error is not None:
+                        future.set_exception(RPCError(error))
+                    else:
+                        future.set_result(result)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("The connection to the simulator was closed."))
+            self._pending = {}
+            self._writer = None
+
+    def close(self):
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
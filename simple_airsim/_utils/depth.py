@@ -0,0 +1,109 @@
+import functools
+import math
+from typing import Optional, Tuple
+
+import airsim
+import numpy as np
+
+
+def intrinsics(width: int, height: int, fov: float) -> Tuple[float, float, float]:
+    """
+    The pinhole model of an airsim camera, which has square pixels and its principal point at the center.
+
+    :param width: The width of the image, in pixels.
+    :param height: The height of the image, in pixels.
+    :param fov: The horizontal field of view, in degrees.
+    :return: The focal length (in pixels), and the x and y of the principal point.
+    """
+    return width / (2 * math.tan(math.radians(fov) / 2)), width / 2, height / 2
+
+
+@functools.lru_cache(maxsize=16)
+def ray_grid(width: int, height: int, fov: float, perspective: bool, stride: int = 1) -> np.ndarray:
+    """
+    The direction of every pixel, in the camera's frame (x forward, y right, z down).
+    Cached, since it only depends on the camera.
+
+    :param width: The width of the image, in pixels.
+    :param height: The height of the image, in pixels.
+    :param fov: The horizontal field of view, in degrees.
+    :param perspective: True for unit rays (for DepthPerspective, the distance along the ray),
+     False for rays with x = 1 (for DepthPlanar, the distance along the camera's axis).
+    :param stride: Use every stride-th pixel in each axis.
+    :return: A read-only float32 array of shape (N, 3), in the order of image[::stride, ::stride].ravel().
+    """
+    f, cx, cy = intrinsics(width, height, fov)
+    v, u = np.mgrid[0:height:stride, 0:width:stride].astype(np.float32)
+
+    rays = np.empty(u.shape + (3,), dtype=np.float32)
+    rays[..., 0] = 1
+    rays[..., 1] = (u + 0.5 - cx) / f
+    rays[..., 2] = (v + 0.5 - cy) / f
+    rays = rays.reshape(-1, 3)
+    if perspective:
+        rays /= np.linalg.norm(rays, axis=1, keepdims=True)
+
+    rays.setflags(write=False)
+    return rays
+
+
+def rotation_matrix(q: airsim.Quaternionr) -> np.ndarray:
+    """
+
+    :param q: An orientation.
+    :return: The 3x3 matrix that rotates from the rotated frame to the original one.
+    """
+    w, x, y, z = q.w_val, q.x_val, q.y_val, q.z_val
+    return np.array([[1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+                     [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+                     [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)]], dtype=np.float32)
+
+
+def to_points(depth: np.ndarray, fov: float, perspective: bool, position: airsim.Vector3r,
+              orientation: airsim.Quaternionr, stride: int = 1, max_depth: Optional[float] = None) -> np.ndarray:
+    """
+    Turn a depth image into a point cloud, in one vectorized pass.
+
+    :param depth: A float depth image of shape (height, width), in airsim units.
+    :param fov: The horizontal field of view of the camera, in degrees.
+    :param perspective: True for DepthPerspective, False for DepthPlanar.
+    :param position: The position of the camera (ImageResponse.camera_position).
+    :param orientation: The orientation of the camera (ImageResponse.camera_orientation).
+    :param stride: Use every stride-th pixel in each axis.
+    :param max_depth: Drop the pixels that are farther than this (e.g. the sky), in airsim units. Leave 'None' to keep all.
+    :return: A float32 array of shape (N, 3) of the points in airsim's world frame.
+    """
+    height, width = depth.shape
+    rays = ray_grid(width, height, fov, perspective, stride)
+    values = depth[::stride, ::stride].reshape(-1)
+
+    keep = np.isfinite(values)
+    if max_depth is not None:
+        keep &= values <= max_depth
+    if not keep.all():
+        rays = rays[keep]
+        values = values[keep]
+
+    points = rays * values[:, None]
+    # Rotate and move the points to the world, as row vectors: p @ R.T == (R @ p.T).T
+    points = points @ rotation_matrix(orientation).T
+    points += np.array([position.x_val, position.y_val, position.z_val], dtype=np.float32)
+    return points
+
+
+def voxel_downsample(points: np.ndarray, voxel_size: float) -> np.ndarray:
+    """
+    Keep a single point of each voxel.
+
+    :param points: An array of shape (N, 3).
+    :param voxel_size: The edge of a voxel, in the units of the points.
+    :return: The first point of every occupied voxel, of shape (M, 3).
+    """
+    if len(points) == 0:
+        return points
+
+    keys = np.floor(points / voxel_size).astype(np.int64)
+    keys -= keys.min(axis=0)
+    flat = np.ravel_multi_index(keys.T, tuple(keys.max(axis=0) + 1))
+    _, first = np.unique(flat, return_index=True)
+    return points[np.sort(first)]
@@ -1,48 +1,61 @@
+from typing import Dict
+
 import airsim
 from msgpackrpc.future import Future
 
 from . import airsim_to_world, tools, world_to_airsim, get_state
 
-def turn_by(client: airsim.MultirotorClient, roll, pitch, yaw) -> Future:
+def turn_by(client: airsim.MultirotorClient, roll, pitch, yaw, vehicle_name: str = "") -> Future:
     """
 
     :param yaw:
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
     """
+    pos, ori = get_state.pose(client, vehicle_name)
+    return _turn_by(client, pos['z'], ori['yaw'], roll, pitch, yaw, vehicle_name)
+
+
+def _turn_by(client: airsim.MultirotorClient, z, current_yaw, roll, pitch, yaw, vehicle_name: str = "") -> Future:
     roll = tools.degree_to_radians(roll)
     pitch = tools.degree_to_radians(pitch)
-    z = get_state.position(client)['z']
     z = world_to_airsim.distance(z)
 
     if yaw != 0:
-        yaw = yaw + get_state.orientation(client)['yaw']
+        yaw = yaw + current_yaw
         yaw = tools.range_degrees(yaw, with_negative=False)
-        return client.moveByVelocityZAsync(0, 0, z, 1, yaw_mode=airsim.YawMode(is_rate=False, yaw_or_rate=yaw))
+        return client.moveByVelocityZAsync(0, 0, z, 1, yaw_mode=airsim.YawMode(is_rate=False, yaw_or_rate=yaw),
+                                           vehicle_name=vehicle_name)
     else:
-        return client.moveByRollPitchYawrateZAsync(roll, pitch, 0, z, 1)
+        return client.moveByRollPitchYawrateZAsync(roll, pitch, 0, z, 1, vehicle_name=vehicle_name)
 
 
-def move_by(client: airsim.MultirotorClient, x, y, z) -> Future:
+def move_by(client: airsim.MultirotorClient, x, y, z, vehicle_name: str = "") -> Future:
     """
 
     :param client:
     :param x:
     :param y:
     :param z:
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
     :return:
     """
-    pos = get_state.position(client)
-    ori = get_state.orientation(client)
+    pos, ori = get_state.pose(client, vehicle_name)
+    return _move_by(client, pos, ori['yaw'], x, y, z, vehicle_name)
 
-    x, y, z = tools.relative_to_global(pos, ori['yaw'], x, y, z)
+
+def _move_by(client: airsim.MultirotorClient, pos: Dict[str, float], current_yaw, x, y, z,
+             vehicle_name: str = "") -> Future:
+    x, y, z = tools.relative_to_global(pos, current_yaw, x, y, z)
 
     x = world_to_airsim.distance(x)
     y = world_to_airsim.distance(y)
     z = world_to_airsim.distance(z)
 
-    return client.moveToPositionAsync(x, y, z, world_to_airsim.distance(1))
+    return client.moveToPositionAsync(x, y, z, world_to_airsim.distance(1), vehicle_name=vehicle_name)
 
 
-def move_roll_pitch_yaw_rate_z(client: airsim.MultirotorClient, roll, pitch, yaw_rate, z, time: float = 1) -> Future:
+def move_roll_pitch_yaw_rate_z(client: airsim.MultirotorClient, roll, pitch, yaw_rate, z, time: float = 1,
+                               vehicle_name: str = "") -> Future:
     """
     Move by real-world roll pitch yaw-rate z.
 
@@ -52,7 +65,49 @@ def move_roll_pitch_yaw_rate_z(client: airsim.MultirotorClient, roll, pitch, yaw
     :param yaw_rate: yaw-rate in real-world (degrees).
     :param z: z in real-world (meters).
     :param time: Time (in seconds) to execute this call.
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
     :return: what client.moveByRollPitchYawrateZAsync returns.
     """
     return client.moveByRollPitchYawrateZAsync(world_to_airsim.angle(roll), world_to_airsim.angle(pitch),
-                                               world_to_airsim.angle(yaw_rate), world_to_airsim.distance(z), time)
+                                               world_to_airsim.angle(yaw_rate), world_to_airsim.distance(z), time,
+                                               vehicle_name=vehicle_name)
+
+
+def move_by_velocity(client: airsim.MultirotorClient, vx, vy, vz, duration: float = 1, body_frame: bool = True,
+                     vehicle_name: str = "") -> Future:
+    """
+    Fly at a real-world velocity. Needs no pose read, since the simulator applies the frame.
+
+    :param client: The multirotor client.
+    :param vx: x velocity in real-world (meters per second).
+    :param vy: y velocity in real-world (meters per second).
+    :param vz: z velocity in real-world (meters per second).
+    :param duration: Time (in seconds) to execute this call.
+    :param body_frame: True for the drone's frame (x forward, y right, z down), False for the world frame.
+     The drone's frame needs a simulator with moveByVelocityBodyFrame (AirSim 1.4 and later).
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
+    :return: The future of the command.
+    """
+    vx = world_to_airsim.distance(vx)
+    vy = world_to_airsim.distance(vy)
+    vz = world_to_airsim.distance(vz)
+
+    if body_frame:
+        # airsim 1.3's client doesn't wrap it, so call it the way later clients do.
+        return client.client.call_async("moveByVelocityBodyFrame", vx, vy, vz, duration,
+                                        airsim.DrivetrainType.MaxDegreeOfFreedom, airsim.YawMode(), vehicle_name)
+    return client.moveByVelocityAsync(vx, vy, vz, duration, vehicle_name=vehicle_name)
+
+
+def rotate_by_yaw_rate(client: airsim.MultirotorClient, yaw_rate, duration: float = 1,
+                       vehicle_name: str = "") -> Future:
+    """
+    Turn at a yaw-rate, keeping the position. Needs no pose read.
+
+    :param client: The multirotor client.
+    :param yaw_rate: yaw-rate in real-world (degrees per second).
+    :param duration: Time (in seconds) to execute this call.
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
+    :return: what client.rotateByYawRateAsync returns.
+    """
+    return client.rotateByYawRateAsync(yaw_rate, duration, vehicle_name=vehicle_name)
@@ -1,72 +1,189 @@
 import airsim
-from typing import Dict, Optional
+from msgpackrpc.future import Future
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from . import airsim_to_world, world_to_airsim, tools, airsim_lidars
 from . import global_vars
 
 
-def orientation(client: airsim.MultirotorClient) -> Dict[str, float]:
+def _orientation(ori: airsim.Quaternionr) -> Dict[str, float]:
+    roll, pitch, yaw = tools.quaternion_to_euler(ori)
+    return {"roll": tools.radians_to_degrees(roll),
+            "pitch": tools.radians_to_degrees(pitch),
+            "yaw": tools.radians_to_degrees(yaw)}
+
+
+def _position(pos: airsim.Vector3r) -> Dict[str, float]:
+    return {"x": airsim_to_world.distance(pos.x_val),
+            "y": airsim_to_world.distance(pos.y_val),
+            "z": airsim_to_world.distance(pos.z_val)}
+
+
+def _velocity(kinematics: airsim.KinematicsState, yaw: float) -> Dict[str, float]:
+    linear_velocity = kinematics.linear_velocity
+    angular_velocity = kinematics.angular_velocity
+
+    x, y, z = tools.global_to_relative_velocity(airsim_to_world.distance(linear_velocity.x_val),
+                                                airsim_to_world.distance(linear_velocity.y_val),
+                                                airsim_to_world.distance(linear_velocity.z_val),
+                                                yaw)
+    # x = distance(linear_velocity.x_val)
+    # y = distance(linear_velocity.y_val)
+    # z = distance(linear_velocity.z_val)
+    roll = tools.radians_to_degrees(angular_velocity.x_val)
+    pitch = tools.radians_to_degrees(angular_velocity.y_val)
+    yaw = tools.radians_to_degrees(angular_velocity.z_val)
+
+    return {'x': x, 'y': y, 'z': z, 'roll': roll, 'pitch': pitch, 'yaw': yaw}
+
+
+def _collision(collision: airsim.CollisionInfo) -> Dict[str, Any]:
+    return {"has_collided": collision.has_collided,
+            "object_name": collision.object_name,
+            "penetration_depth": airsim_to_world.distance(collision.penetration_depth)}
+
+
+def orientation(client: airsim.MultirotorClient, vehicle_name: str = "") -> Dict[str, float]:
     """
 
     :param client: The multirotor client.
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
     :return: A dictionary of the orientation {"roll", "pitch", "yaw"} in real-world
     """
 
-    ori = client.simGetVehiclePose().orientation
-    roll, pitch, yaw = tools.quaternion_to_euler(ori)
-    return {"roll": tools.radians_to_degrees(roll),
-            "pitch": tools.radians_to_degrees(pitch),
-            "yaw": tools.radians_to_degrees(yaw)}
+    return _orientation(client.simGetVehiclePose(vehicle_name).orientation)
 
 
-def position(client: airsim.MultirotorClient) -> Dict[str, float]:
+def position(client: airsim.MultirotorClient, vehicle_name: str = "") -> Dict[str, float]:
     """
 
     :param client: The multirotor client.
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
     :return: A dictionary of the position {"front", "right", "up"} in real-world
     """
-    pos = client.simGetVehiclePose().position
-    return {"x": airsim_to_world.distance(pos.x_val),
-            "y": airsim_to_world.distance(pos.y_val),
-            "z": airsim_to_world.distance(pos.z_val)}
+    return _position(client.simGetVehiclePose(vehicle_name).position)
 
 
-def lidars(client: airsim.MultirotorClient, lidar_names: Dict[str, str]) -> Dict[str, Optional[float]]:
+def pose(client: airsim.MultirotorClient, vehicle_name: str = "") -> Tuple[Dict[str, float], Dict[str, float]]:
     """
+    Read the position and the orientation in a single call to the simulator.
+
     :param client: The multirotor client.
-    :param lidar_names: The name dictionary of the lidars.
-    :return: A dictionary of the lidars in real-world (meters).
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
+    :return: The position and the orientation (see position and orientation).
     """
-    lid = airsim_lidars.get(client, lidar_names)
+    vehicle_pose = client.simGetVehiclePose(vehicle_name)
+    return _position(vehicle_pose.position), _orientation(vehicle_pose.orientation)
+
+
+def _lidars_to_world(lid: Dict[str, Optional[float]], lidar_names: Dict[str, str],
+                     reductions: Optional[Dict[str, Union[str, airsim_lidars.Reduction]]]
+                     ) -> Dict[str, Optional[float]]:
+    unitless = {lidar_names[name] for name, reduction in (reductions or {}).items()
+                if reduction in airsim_lidars.UNITLESS_REDUCTIONS}
     ret = {}
     for k in lid:
-        if lid[k] is None:
-            ret[k] = None
+        if lid[k] is None or k in unitless:
+            ret[k] = lid[k]
         else:
             ret[k] = airsim_to_world.distance(lid[k])
 
     return ret
 
 
-def velocity(client: airsim.MultirotorClient) -> Dict[str, float]:
+def lidars(client: airsim.MultirotorClient, lidar_names: Dict[str, str],
+           reductions: Optional[Dict[str, Union[str, airsim_lidars.Reduction]]] = None,
+           vehicle_name: str = "") -> Dict[str, Optional[float]]:
+    """
+    :param client: The multirotor client.
+    :param lidar_names: The name dictionary of the lidars.
+    :param reductions: The reduction of each lidar (see airsim_lidars.get). Leave 'None' for default.
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
+    :return: A dictionary of the lidars in real-world (meters).
+    """
+    return _lidars_to_world(airsim_lidars.get(client, lidar_names, reductions, vehicle_name), lidar_names, reductions)
+
+
+def velocity(client: airsim.MultirotorClient, vehicle_name: str = "") -> Dict[str, float]:
     """
 
     :param client: The multirotor client.
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
     :return: A dictionary of the velocities of the drone in x, y, z, roll, pitch, yaw.
     """
-    kinematics_estimated = client.getMultirotorState().kinematics_estimated
-    linear_velocity = kinematics_estimated.linear_velocity
-    angular_velocity = kinematics_estimated.angular_velocity
+    kinematics_estimated = client.getMultirotorState(vehicle_name).kinematics_estimated
 
-    x, y, z = tools.global_to_relative_velocity(airsim_to_world.distance(linear_velocity.x_val),
-                                                airsim_to_world.distance(linear_velocity.y_val),
-                                                airsim_to_world.distance(linear_velocity.z_val),
-                                                orientation(client)['yaw'])
-    # x = distance(linear_velocity.x_val)
-    # y = distance(linear_velocity.y_val)
-    # z = distance(linear_velocity.z_val)
-    roll = tools.radians_to_degrees(angular_velocity.x_val)
-    pitch = tools.radians_to_degrees(angular_velocity.y_val)
-    yaw = tools.radians_to_degrees(angular_velocity.z_val)
+    # The state already carries the orientation, so there is no need for another round trip.
+    return _velocity(kinematics_estimated, _orientation(kinematics_estimated.orientation)['yaw'])
 
-    return {'x': x, 'y': y, 'z': z, 'roll': roll, 'pitch': pitch, 'yaw': yaw}
+
+def snapshot(client: airsim.MultirotorClient, lidar_names: Optional[Dict[str, str]] = None,
+             reductions: Optional[Dict[str, Union[str, airsim_lidars.Reduction]]] = None,
+             vehicle_name: str = "") -> Dict[str, Any]:
+    """
+    Read the position, orientation, velocity, timestamp and collision state using a single call to the simulator.
+    If lidar_names is given, the lidars are requested together with the state, so everything costs one round trip.
+
+    :param client: The multirotor client.
+    :param lidar_names: The name dictionary of the lidars to read as well. Leave 'None' to skip the lidars.
+    :param reductions: The reduction of each lidar (see airsim_lidars.get). Leave 'None' for default.
+    :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
+    :return: A dictionary of "timestamp" (in seconds), "position", "orientation", "velocity", "collision"
+     and "lidars" (None if lidar_names is None), each in the same format as the matching function in this module,
+     in real-world.
+    """
+    return snapshots(client, [vehicle_name], lidar_names, reductions)[0]
+
+
+def snapshots(client: airsim.MultirotorClient, vehicle_names: Iterable[str],
+              lidar_names: Optional[Dict[str, str]] = None,
+              reductions: Optional[Dict[str, Union[str, airsim_lidars.Reduction]]] = None) -> List[Dict[str, Any]]:
+    """
+    Read the snapshots of several vehicles. All the requests are sent before waiting for any of the responses,
+    so the whole fleet costs about one round trip.
+
+    :param client: The multirotor client.
+    :param vehicle_names: The names of the vehicles in airsim.
+    :param lidar_names: The name dictionary of the lidars to read as well. Leave 'None' to skip the lidars.
+    :param reductions: The reduction of each lidar (see airsim_lidars.get). Leave 'None' for default.
+    :return: The snapshot of each vehicle (see snapshot), in the same order as vehicle_names.
+    """
+    return [_gather_snapshot(futures, lidar_names, reductions)
+            for futures in [_request_snapshot(client, vehicle_name, lidar_names) for vehicle_name in vehicle_names]]
+
+
+def _request_snapshot(client: airsim.MultirotorClient, vehicle_name: str,
+                      lidar_names: Optional[Dict[str, str]]) -> Tuple[Future, Optional[List[Future]]]:
+    state_future = client.client.call_async("getMultirotorState", vehicle_name)
+    lidar_futures = None
+    if lidar_names is not None:
+        # noinspection PyProtectedMember
+        lidar_futures = airsim_lidars._request_many(client, lidar_names.keys(), vehicle_name)
+
+    return state_future, lidar_futures
+
+
+def _gather_snapshot(futures: Tuple[Future, Optional[List[Future]]], lidar_names: Optional[Dict[str, str]],
+                     reductions: Optional[Dict[str, Union[str, airsim_lidars.Reduction]]]) -> Dict[str, Any]:
+    state_future, lidar_futures = futures
+    state = airsim.MultirotorState.from_msgpack(state_future.get())
+
+    lid = None
+    if lidar_futures is not None:
+        # noinspection PyProtectedMember
+        lid = _lidars_to_world(airsim_lidars._reduce_all(lidar_names, airsim_lidars._gather(lidar_futures),
+                                                         reductions),
+                               lidar_names, reductions)
+
+    return _snapshot(state, lid)
+
+
+def _snapshot(state: airsim.MultirotorState, lid: Optional[Dict[str, Optional[float]]]) -> Dict[str, Any]:
+    kinematics_estimated = state.kinematics_estimated
+    ori = _orientation(kinematics_estimated.orientation)
+    return {"timestamp": state.timestamp / 1e9,
+            "position": _position(kinematics_estimated.position),
+            "orientation": ori,
+            "velocity": _velocity(kinematics_estimated, ori['yaw']),
+            "collision": _collision(state.collision),
+            "lidars": lid}
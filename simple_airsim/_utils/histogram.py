@@ -0,0 +1,61 @@
+import math
+from typing import Any, Dict
+
+# The resolution of the histograms: the buckets grow by 10 ** (1 / BUCKETS_PER_DECADE) (about 12%).
+BUCKETS_PER_DECADE = 20
+# Values below this fall in the first bucket.
+MIN_VALUE = 1e-6  # seconds
+
+
+class Histogram:
+    """
+    Counts positive values (e.g. latencies, in seconds) in logarithmic buckets,
+    so any number of values takes the same memory.
+    """
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        bucket = int(math.log10(max(value, MIN_VALUE) / MIN_VALUE) * BUCKETS_PER_DECADE)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @staticmethod
+    def _value(bucket: int) -> float:
+        """
+        The middle of a bucket (on a log scale).
+        """
+        return MIN_VALUE * 10 ** ((bucket + 0.5) / BUCKETS_PER_DECADE)
+
+    def percentile(self, q: float) -> float:
+        """
+
+        :param q: The percentile, between 0 and 100.
+        :return: The value, within half a bucket (about 6%). 0 if there are no values.
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._value(bucket), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count,
+                "total": self.total,
+                "mean": self.total / self.count if self.count else 0.0,
+                "p50": self.percentile(50),
+                "p95": self.percentile(95),
+                "p99": self.percentile(99),
+                "max": self.max,
+                "histogram": {"%.3g" % self._value(bucket): count for bucket, count in sorted(self.counts.items())}}
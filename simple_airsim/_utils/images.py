@@ -0,0 +1,88 @@
+import airsim
+import cv2
+import numpy as np
+from typing import Optional
+
+
+def decode(raw_image: bytes, return_type, default_alpha: int = 128) -> np.ndarray:
+    """
+    Decode a compressed image from simGetImage.
+
+    :param raw_image: The compressed image.
+    :param return_type: A camera_config.ReturnType.
+    :param default_alpha: The alpha to add to images without alpha, if the return type has alpha.
+    :return: A numpy array of the image (in the shape (x, y, color)).
+    """
+    im: np.ndarray = cv2.imdecode(np.frombuffer(raw_image, dtype=np.uint8),
+                                  cv2.IMREAD_UNCHANGED if return_type.with_alpha else cv2.IMREAD_COLOR)
+
+    if return_type.with_alpha:
+        if im.ndim == 2:  # A single channel image, e.g. from the depth camera.
+            im = cv2.cvtColor(im, cv2.COLOR_GRAY2BGR)
+        if im.shape[2] == 3:  # If image does not contain alpha, add alpha.
+            im = np.dstack((im, np.full((im.shape[0], im.shape[1]), default_alpha, dtype=im.dtype)))
+
+        if return_type.format == "RGB":
+            return cv2.cvtColor(im, cv2.COLOR_BGRA2RGBA)
+        elif return_type.format == "BGR":
+            return im
+    else:
+        if return_type.format == "RGB":
+            return cv2.cvtColor(im, cv2.COLOR_BGR2RGB)
+        elif return_type.format == "BGR":
+            return im
+
+
+def request(image_request) -> airsim.ImageRequest:
+    """
+
+    :param image_request: A camera_config.ImageRequest.
+    :return: The matching uncompressed request for simGetImages.
+    """
+    return airsim.ImageRequest(str(image_request.camera_id), image_request.image_type.airsim_val,
+                               image_request.as_float, False)
+
+
+def to_array(response: airsim.ImageResponse, image_request, default_alpha: int = 128,
+             out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Turn an uncompressed image from simGetImages into a numpy array. The buffer is reshaped, not decoded.
+
+    :param response: The response of simGetImages.
+    :param image_request: The camera_config.ImageRequest of the response.
+    :param default_alpha: The alpha to add to images without alpha, if the return type has alpha.
+    :param out: An array of the right shape and dtype to write the image into, to reuse it between frames.
+     Leave 'None' for a new array. Note: without out, a BGR image is a read-only view of the response.
+    :return: A numpy array of the image, in the shape (y, x, color), or (y, x) of float32 for float images.
+    """
+    if response.width == 0 or response.height == 0:
+        raise ValueError("Camera %s returned an empty image: %s" % (image_request.camera_id, response.message))
+
+    if image_request.as_float:
+        if out is None:
+            return np.asarray(response.image_data_float, dtype=np.float32).reshape(response.height, response.width)
+        out.reshape(-1)[:] = response.image_data_float
+        return out
+
+    # Uncompressed images are BGR (like the compressed ones decoded by cv2), with or without alpha.
+    im = np.frombuffer(response.image_data_uint8, dtype=np.uint8).reshape(response.height, response.width, -1)
+    return_type = image_request.return_type
+    channels = 4 if return_type.with_alpha else 3
+
+    if out is None:
+        if return_type.format == "BGR" and im.shape[2] == channels:
+            return im
+        out = np.empty((response.height, response.width, channels), dtype=np.uint8)
+
+    if return_type.format == "RGB" and out.shape == im.shape == (response.height, response.width, 3) \
+            and out.flags.c_contiguous:
+        # cv2 swaps the channels several times faster than a reversed numpy view. It writes into out in place,
+        # since out is contiguous and of the image's shape.
+        cv2.cvtColor(im, cv2.COLOR_BGR2RGB, dst=out)
+        return out
+
+    colors = im[:, :, :3]
+    out[:, :, :3] = colors[:, :, ::-1] if return_type.format == "RGB" else colors
+    if return_type.with_alpha:
+        out[:, :, 3] = im[:, :, 3] if im.shape[2] == 4 else default_alpha
+    return out
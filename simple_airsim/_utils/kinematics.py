@@ -0,0 +1,238 @@
+import math
+from typing import Any, Dict, Optional, Tuple
+
+# The limits of the model, in airsim's units (meters, seconds, radians).
+MAX_ACCELERATION = 5.0
+MAX_VERTICAL_SPEED = 3.0
+MAX_YAW_RATE = math.radians(180)
+GRAVITY = 9.81
+# How fast the velocity follows a velocity command, and the drag under attitude commands.
+VELOCITY_TIME_CONSTANT = 0.25
+DRAG = 0.5
+# The gains that turn a position, altitude or yaw error into a velocity.
+POSITION_GAIN = 1.0
+ALTITUDE_GAIN = 2.0
+YAW_GAIN = 4.0
+
+# The height a takeoff climbs to, and how close to a target a command counts as done.
+TAKEOFF_HEIGHT = 3.0
+POSITION_TOLERANCE = 0.05
+YAW_TOLERANCE = math.radians(1)
+
+# The modes of the model.
+IDLE = "idle"
+HOVER = "hover"
+VELOCITY = "velocity"
+POSITION = "position"
+ATTITUDE = "attitude"
+LAND = "land"
+
+
+class MultirotorModel:
+    """
+    A kinematic model of a multirotor, in airsim's NED coordinates: the velocity follows the commanded velocity
+    (with limited acceleration), and the drone stops at the ground. Commands set a mode and its targets,
+    and step advances the model by a fixed time.
+    """
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, yaw: float = 0.0):
+        """
+
+        :param x: The position to start from, in meters.
+        :param y:
+        :param z: The height of the ground, too. The drone starts landed.
+        :param yaw: The yaw to start from, in radians.
+        """
+        self.x, self.y, self.z = x, y, z
+        self.vx = self.vy = self.vz = 0.0
+        self.ax = self.ay = self.az = 0.0
+        self.roll = self.pitch = 0.0
+        self.yaw = yaw
+        self.yaw_rate = 0.0
+        self.ground_z = z
+        self.has_collided = False
+
+        self.mode = IDLE
+        # The targets of the mode. Any target that is None is not controlled.
+        self.velocity: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+        self.target: Optional[Tuple[float, float, float]] = None
+        self.speed = 0.0
+        self.hold_z: Optional[float] = None
+        self.yaw_target: Optional[float] = None
+        self.yaw_rate_command = 0.0
+        self.tilt: Tuple[float, float] = (0.0, 0.0)
+
+    # Commands
+
+    def hover(self):
+        self._set_mode(HOVER, hold_z=self.z if not self.landed else None)
+
+    def move_by_velocity(self, vx: float, vy: float, vz: float, yaw_mode: Optional[Dict[str, Any]] = None,
+                         body_frame: bool = False):
+        if body_frame:
+            cos, sin = math.cos(self.yaw), math.sin(self.yaw)
+            vx, vy = vx * cos - vy * sin, vx * sin + vy * cos
+        self._set_mode(VELOCITY, velocity=(vx, vy, vz))
+        self._set_yaw_mode(yaw_mode)
+
+    def move_by_velocity_z(self, vx: float, vy: float, z: float, yaw_mode: Optional[Dict[str, Any]] = None):
+        self._set_mode(VELOCITY, velocity=(vx, vy, 0.0), hold_z=z)
+        self._set_yaw_mode(yaw_mode)
+
+    def move_to_position(self, x: float, y: float, z: float, speed: float,
+                         yaw_mode: Optional[Dict[str, Any]] = None):
+        self._set_mode(POSITION, target=(x, y, z), speed=speed)
+        self._set_yaw_mode(yaw_mode)
+
+    def move_by_roll_pitch_yaw_rate_z(self, roll: float, pitch: float, yaw_rate: float, z: float):
+        self._set_mode(ATTITUDE, tilt=(roll, pitch), hold_z=z)
+        self.yaw_rate_command = yaw_rate
+
+    def rotate_by_yaw_rate(self, yaw_rate: float):
+        self._set_mode(HOVER, hold_z=self.z)
+        self.yaw_rate_command = yaw_rate
+
+    def takeoff(self):
+        self._set_mode(POSITION, target=(self.x, self.y, self.ground_z - TAKEOFF_HEIGHT), speed=MAX_VERTICAL_SPEED)
+
+    def land(self):
+        self._set_mode(LAND)
+
+    def set_pose(self, x: float, y: float, z: float, yaw: float):
+        self.x, self.y, self.z, self.yaw = x, y, z, yaw
+        self.vx = self.vy = self.vz = 0.0
+        self.hover()
+
+    def _set_mode(self, mode: str, velocity=(0.0, 0.0, 0.0), target=None, speed=0.0, hold_z=None, tilt=(0.0, 0.0)):
+        self.mode = mode
+        self.velocity = velocity
+        self.target = target
+        self.speed = speed
+        self.hold_z = hold_z
+        self.tilt = tilt
+        self.yaw_target = None
+        self.yaw_rate_command = 0.0
+
+    def _set_yaw_mode(self, yaw_mode: Optional[Dict[str, Any]]):
+        """
+        :param yaw_mode: airsim's YawMode, as sent over the RPC: 'is_rate', and 'yaw_or_rate' in degrees.
+        """
+        if yaw_mode is None:
+            return
+        if yaw_mode.get("is_rate", True):
+            self.yaw_rate_command = math.radians(yaw_mode.get("yaw_or_rate", 0.0))
+        else:
+            self.yaw_target = math.radians(yaw_mode.get("yaw_or_rate", 0.0))
+
+    # State
+
+    @property
+    def landed(self) -> bool:
+        return self.z >= self.ground_z and abs(self.vx) + abs(self.vy) + abs(self.vz) < 1e-3
+
+    def reached(self) -> bool:
+        """
+        :return: True if the drone reached the target of its mode (for the commands that end there).
+        """
+        if self.mode == POSITION:
+            x, y, z = self.target
+            return (self.x - x) ** 2 + (self.y - y) ** 2 + (self.z - z) ** 2 <= POSITION_TOLERANCE ** 2
+        if self.mode == LAND:
+            return self.landed
+        return False
+
+    def orientation(self) -> Tuple[float, float, float, float]:
+        """
+        :return: The orientation as a quaternion: w, x, y, z.
+        """
+        cy, sy = math.cos(self.yaw / 2), math.sin(self.yaw / 2)
+        cr, sr = math.cos(self.roll / 2), math.sin(self.roll / 2)
+        cp, sp = math.cos(self.pitch / 2), math.sin(self.pitch / 2)
+        return (cy * cr * cp + sy * sr * sp,
+                cy * sr * cp - sy * cr * sp,
+                cy * cr * sp + sy * sr * cp,
+                sy * cr * cp - cy * sr * sp)
+
+    # Physics
+
+    def step(self, dt: float):
+        """
+        Advance the model.
+        :param dt: The time to advance by, in seconds.
+        """
+        if self.mode == ATTITUDE:
+            roll, pitch = self.tilt
+            cos, sin = math.cos(self.yaw), math.sin(self.yaw)
+            forward, right = -GRAVITY * math.tan(pitch), GRAVITY * math.tan(roll)
+            ax = forward * cos - right * sin - DRAG * self.vx
+            ay = forward * sin + right * cos - DRAG * self.vy
+            az = (self._hold_z_speed() - self.vz) / VELOCITY_TIME_CONSTANT
+        elif self.mode == IDLE:
+            ax, ay, az = -self.vx / VELOCITY_TIME_CONSTANT, -self.vy / VELOCITY_TIME_CONSTANT, 0.0
+            if not self.landed:
+                az = GRAVITY - DRAG * self.vz
+        else:
+            vx, vy, vz = self._velocity_command()
+            ax = (vx - self.vx) / VELOCITY_TIME_CONSTANT
+            ay = (vy - self.vy) / VELOCITY_TIME_CONSTANT
+            az = (vz - self.vz) / VELOCITY_TIME_CONSTANT
+
+        # Limit the acceleration, keeping its direction.
+        norm = math.sqrt(ax * ax + ay * ay + az * az)
+        if norm > MAX_ACCELERATION and self.mode != IDLE:
+            scale = MAX_ACCELERATION / norm
+            ax, ay, az = ax * scale, ay * scale, az * scale
+
+        self.ax, self.ay, self.az = ax, ay, az
+        self.vx += ax * dt
+        self.vy += ay * dt
+        self.vz += az * dt
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.z += self.vz * dt
+
+        if self.z >= self.ground_z:  # On the ground.
+            self.z = self.ground_z
+            self.vz = min(self.vz, 0.0)
+            if self.mode in (IDLE, LAND):
+                self.vx = self.vy = self.vz = 0.0
+
+        # Lean with the horizontal acceleration, for a plausible attitude.
+        cos, sin = math.cos(self.yaw), math.sin(self.yaw)
+        self.pitch = -math.atan((ax * cos + ay * sin) / GRAVITY)
+        self.roll = math.atan((-ax * sin + ay * cos) / GRAVITY)
+
+        self.yaw_rate = self._yaw_rate_command()
+        self.yaw = math.atan2(math.sin(self.yaw + self.yaw_rate * dt), math.cos(self.yaw + self.yaw_rate * dt))
+
+    def _velocity_command(self) -> Tuple[float, float, float]:
+        if self.mode == POSITION:
+            dx, dy, dz = self.target[0] - self.x, self.target[1] - self.y, self.target[2] - self.z
+            distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+            if distance < 1e-9:
+                return 0.0, 0.0, 0.0
+            speed = min(self.speed, distance * POSITION_GAIN) / distance
+            return dx * speed, dy * speed, _clip(dz * speed, MAX_VERTICAL_SPEED)
+        if self.mode == LAND:
+            return 0.0, 0.0, MAX_VERTICAL_SPEED / 3
+        vx, vy, vz = self.velocity
+        if self.hold_z is not None:
+            vz = self._hold_z_speed()
+        return vx, vy, vz
+
+    def _hold_z_speed(self) -> float:
+        if self.hold_z is None:
+            return 0.0
+        return _clip((self.hold_z - self.z) * ALTITUDE_GAIN, MAX_VERTICAL_SPEED)
+
+    def _yaw_rate_command(self) -> float:
+        if self.yaw_target is None:
+            return _clip(self.yaw_rate_command, MAX_YAW_RATE)
+        error = math.atan2(math.sin(self.yaw_target - self.yaw), math.cos(self.yaw_target - self.yaw))
+        if abs(error) < YAW_TOLERANCE:
+            return 0.0
+        return _clip(error * YAW_GAIN, MAX_YAW_RATE)
+
+
+def _clip(value: float, limit: float) -> float:
+    return max(-limit, min(limit, value))
@@ -0,0 +1,326 @@
+import datetime
+import time
+from typing import Any, Callable, ContextManager, Dict, Optional, Tuple
+
+import msgpackrpc
+from msgpackrpc import message
+from msgpackrpc.future import Future
+
+# The longest time a waiting thread holds the lock of the client at once.
+WAIT_SLICE = 0.005  # seconds
+# The time a waiting thread gives other threads to take the lock between slices.
+WAIT_YIELD = 0.001  # seconds
+# The time spent reading responses when checking if a future is done.
+POLL_TIME = 0.001  # seconds
+
+
+def is_done(future: Future) -> bool:
+    """
+    Note: a future is only marked as done when some thread reads the responses of its client.
+    :param future: A future returned by an async call.
+    :return: True if the response of the call arrived.
+    """
+    # noinspection PyProtectedMember
+    return future._set_flag
+
+
+def _read_responses(future: Future, seconds: float):
+    """
+    Read responses from the client of the future until one arrives, or until the time is up.
+    """
+    # noinspection PyProtectedMember
+    loop = future._loop
+    # noinspection PyProtectedMember
+    ioloop = loop._ioloop
+    handle = ioloop.add_timeout(datetime.timedelta(seconds=seconds), loop.stop)
+    try:
+        loop.start()
+    finally:
+        ioloop.remove_timeout(handle)
+
+
+def wait(future: Future, lock: ContextManager, timeout: Optional[float] = None,
+         interrupted: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Wait for a future, holding the lock of its client only in short slices,
+    so other threads can use the client while the call is in progress.
+    :param future: A future returned by an async call.
+    :param lock: The lock that guards the client.
+    :param timeout: The maximal time to wait, in seconds. Leave 'None' to wait until the call is done.
+    :param interrupted: Checked between the slices; the wait stops as soon as it returns True.
+    :return: True if the call is done, False if the time is up or the wait was interrupted.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while not is_done(future):
+        if interrupted is not None and interrupted():
+            return False
+
+        seconds = WAIT_SLICE
+        if deadline is not None:
+            seconds = min(seconds, deadline - time.monotonic())
+            if seconds <= 0:
+                return False
+
+        with lock:
+            if is_done(future):
+                break
+            _read_responses(future, seconds)
+        time.sleep(WAIT_YIELD)
+
+    return True
+
+
+def poll(future: Future, lock) -> bool:
+    """
+    Check if a future is done without waiting for it.
+    If the lock is free, the responses that already arrived are read first (which takes up to POLL_TIME).
+    :param future: A future returned by an async call.
+    :param lock: The lock that guards the client.
+    :return: True if the call is done.
+    """
+    if is_done(future):
+        return True
+
+    # If the lock is taken, whoever holds it is reading the responses anyway.
+    if lock.acquire(blocking=False):
+        try:
+            if not is_done(future):
+                _read_responses(future, POLL_TIME)
+        finally:
+            lock.release()
+
+    return is_done(future)
+
+
+def set_nodelay(session: msgpackrpc.Client):
+    """
+    Send every message right away (TCP_NODELAY) on the connections of a client.
+    Otherwise, a call that follows a command on the same connection can wait for the acknowledgement of the
+    command (up to 40 ms on Linux), since the requests are small.
+    :param session: The msgpack-rpc client (e.g. airsim's client.client).
+    """
+    # noinspection PyProtectedMember
+    transport = session._transport
+    on_connect = transport.on_connect
+
+    def nodelay_on_connect(sock):
+        # noinspection PyProtectedMember
+        sock._stream.set_nodelay(True)
+        on_connect(sock)
+
+    transport.on_connect = nodelay_on_connect
+    # noinspection PyProtectedMember
+    for connected in transport._sockets:
+        # noinspection PyProtectedMember
+        connected._stream.set_nodelay(True)
+
+
+def set_read_chunk_size(session: msgpackrpc.Client, size: int):
+    """
+    Read up to size bytes at once from the connections of a client (64 KB by default).
+    The pure-Python msgpack unpacker parses a message again from its start every time more of it arrives, so a large
+    response (e.g. uncompressed images) read in 64 KB chunks is parsed dozens of times.
+    :param session: The msgpack-rpc client (e.g. airsim's client.client).
+    :param size: The largest read, in bytes.
+    """
+    # noinspection PyProtectedMember
+    transport = session._transport
+    on_connect = transport.on_connect
+
+    def sized_on_connect(sock):
+        # noinspection PyProtectedMember
+        sock._stream.read_chunk_size = size
+        on_connect(sock)
+
+    transport.on_connect = sized_on_connect
+    # noinspection PyProtectedMember
+    for connected in transport._sockets:
+        # noinspection PyProtectedMember
+        connected._stream.read_chunk_size = size
+
+
+# A function that is called after every call with its method, latency (in seconds), the sizes of the request and the
+# response (in bytes), and whether it failed.
+CallRecorder = Callable[[str, float, int, int, bool], None]
+
+
+class _MeasuredPacker:
+    """
+    Wraps the packer of a connection, to note the size of each request it sends.
+    """
+
+    def __init__(self, packer, sizes: Dict[int, int]):
+        self._packer = packer
+        self._sizes = sizes
+
+    def pack(self, msg) -> bytes:
+        data = self._packer.pack(msg)
+        if msg[0] == message.REQUEST:
+            self._sizes[msg[1]] = len(data)
+        return data
+
+
+class _MeasuredUnpacker:
+    """
+    Wraps the unpacker of a connection, to note the size of each response it reads.
+    """
+
+    def __init__(self, unpacker, sizes: Dict[int, int]):
+        self._unpacker = unpacker
+        self._sizes = sizes
+        self._position = unpacker.tell()
+
+    def feed(self, data: bytes):
+        self._unpacker.feed(data)
+
+    def __iter__(self) -> "_MeasuredUnpacker":
+        return self
+
+    def __next__(self):
+        msg = next(self._unpacker)
+        position = self._unpacker.tell()
+        if msg[0] == message.RESPONSE:
+            self._sizes[msg[1]] = position - self._position
+        self._position = position
+        return msg
+
+
+def instrument(session: msgpackrpc.Client, record: CallRecorder) -> Callable[[], None]:
+    """
+    Measure every call of a client (e.g. airsim's client.client), until the returned function is called.
+    The hooks are set on this client only, so clients that aren't measured pay nothing.
+    A call is measured from sending the request until some thread reads its response.
+    :param session: The msgpack-rpc client.
+    :param record: Called with the measurements of every call.
+    :return: A function that removes the hooks.
+    """
+    # noinspection PyProtectedMember
+    transport = session._transport
+    # The method and the start time of every call in progress, and the sizes of its messages, by message id.
+    started: Dict[int, Tuple[str, float]] = {}
+    sent: Dict[int, int] = {}
+    received: Dict[int, int] = {}
+
+    send_message = transport.send_message
+    on_connect = transport.on_connect
+    on_response = session.on_response
+
+    def measure_socket(sock):
+        # noinspection PyProtectedMember
+        if not isinstance(sock._packer, _MeasuredPacker):
+            sock._packer = _MeasuredPacker(sock._packer, sent)
+            sock._unpacker = _MeasuredUnpacker(sock._unpacker, received)
+
+    def measured_send_message(msg, callback=None):
+        if msg[0] == message.REQUEST:
+            started[msg[1]] = (msg[2], time.perf_counter())
+        send_message(msg, callback)
+
+    def measured_on_connect(sock):
+        measure_socket(sock)  # Before the requests that waited for the connection are sent.
+        on_connect(sock)
+
+    def measured_on_response(msgid, error, result):
+        call = started.pop(msgid, None)
+        if call is not None:
+            record(call[0], time.perf_counter() - call[1], sent.pop(msgid, 0), received.pop(msgid, 0),
+                   error is not None)
+        on_response(msgid, error, result)
+
+    transport.send_message = measured_send_message
+    transport.on_connect = measured_on_connect
+    session.on_response = measured_on_response
+    # noinspection PyProtectedMember
+    for connected in transport._sockets:
+        measure_socket(connected)
+
+    def remove():
+        transport.send_message = send_message
+        transport.on_connect = on_connect
+        session.on_response = on_response
+        # noinspection PyProtectedMember
+        for connected in transport._sockets:
+            # noinspection PyProtectedMember
+            if isinstance(connected._packer, _MeasuredPacker):
+                # noinspection PyProtectedMember
+                connected._packer = connected._packer._packer
+                # noinspection PyProtectedMember
+                connected._unpacker = connected._unpacker._unpacker
+
+    return remove
+
+
+# A function that is called after every call with its method, its arguments, the times (time.perf_counter) it was sent
+# and its response was read, and the error and the result of the response.
+CallTracer = Callable[[str, Any, float, float, Any, Any], None]
+
+
+def trace(session: msgpackrpc.Client, record: CallTracer) -> Callable[[], None]:
+    """
+    Pass every call of a client (e.g. airsim's client.client) and its response to record, until the returned
+    function is called. Like instrument, the hooks are set on this client only.
+    :param session: The msgpack-rpc client.
+    :param record: Called with every call and its response, before the caller gets the response.
+    :return: A function that removes the hooks.
+    """
+    # noinspection PyProtectedMember
+    transport = session._transport
+    # The method, the arguments and the start time of every call in progress, by message id.
+    started: Dict[int, Tuple[str, Any, float]] = {}
+
+    send_message = transport.send_message
+    on_response = session.on_response
+
+    def traced_send_message(msg, callback=None):
+        if msg[0] == message.REQUEST:
+            started[msg[1]] = (msg[2], msg[3], time.perf_counter())
+        send_message(msg, callback)
+
+    def traced_on_response(msgid, error, result):
+        call = started.pop(msgid, None)
+        if call is not None:
+            record(call[0], call[1], call[2], time.perf_counter(), error, result)
+        on_response(msgid, error, result)
+
+    transport.send_message = traced_send_message
+    session.on_response = traced_on_response
+
+    def remove():
+        transport.send_message = send_message
+        session.on_response = on_response
+
+    return remove
+
+
+class TimedLock:
+    """
+    Wraps a lock, to measure how long callers wait for it. It is the same lock: the wrapper and the wrapped lock
+    exclude each other, so code that kept the wrapped lock stays correct.
+    """
+
+    def __init__(self, lock, record: Callable[[float], None]):
+        """
+
+        :param lock: The lock (e.g. an RLock).
+        :param record: Called with the time (in seconds) every blocking acquire waited.
+        """
+        self.lock = lock
+        self._record = record
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not blocking:
+            return self.lock.acquire(False)
+
+        start = time.perf_counter()
+        acquired = self.lock.acquire(True, timeout)
+        self._record(time.perf_counter() - start)
+        return acquired
+
+    def release(self):
+        self.lock.release()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *args):
+        self.release()
@@ -2,6 +2,7 @@ import math
 from typing import Dict, Tuple
 
 import airsim
+import numpy as np
 from .global_vars import *
 
 
@@ -68,11 +69,13 @@ def range_degrees(degree: float, with_negative: bool = True) -> float:
     :param with_negative:
     :return:
     """
-    while degree < 0:
-        degree += 360
-
-    while degree > 360:
-        degree -= 360
+    # The same as adding 360 while negative, and subtracting 360 while above 360, in constant time.
+    if degree < 0:
+        degree %= 360
+    elif degree > 360:
+        degree %= 360
+        if degree == 0:
+            degree = 360
 
     if with_negative:
         degree -= 180
@@ -106,3 +109,77 @@ def quaternion_to_euler(q: airsim.Quaternionr):
     # yaw = radians_to_degrees(yaw)
 
     return roll, pitch, yaw
+
+
+# Batch versions, for arrays of samples (e.g. logs). Each is equivalent to the matching scalar function.
+
+
+def relative_to_global_batch(positions: np.ndarray, yaws: np.ndarray, moves: np.ndarray) -> np.ndarray:
+    """
+
+    :param positions: An array of shape (N, 3) of the x, y, z of the positions.
+    :param yaws: An array of shape (N,) of the yaws, in degrees.
+    :param moves: An array of shape (N, 3) of the relative x, y, z.
+    :return: An array of shape (N, 3) of the global x, y, z.
+    """
+    positions = np.asarray(positions, dtype=float)
+    moves = np.asarray(moves, dtype=float)
+    rad_yaws = np.radians(yaws)
+    cos, sin = np.cos(rad_yaws), np.sin(rad_yaws)
+
+    ret = positions.copy()
+    ret[:, 0] += moves[:, 0] * cos - moves[:, 1] * sin
+    ret[:, 1] += moves[:, 0] * sin + moves[:, 1] * cos
+    ret[:, 2] += moves[:, 2]
+    return ret
+
+
+def global_to_relative_velocity_batch(velocities: np.ndarray, yaws: np.ndarray) -> np.ndarray:
+    """
+
+    :param velocities: An array of shape (N, 3) of the global vx, vy, vz.
+    :param yaws: An array of shape (N,) of the yaws, in degrees.
+    :return: An array of shape (N, 3) of the relative vx, vy, vz.
+    """
+    velocities = np.asarray(velocities, dtype=float)
+    rad_yaws = np.radians(yaws)
+    cos, sin = np.cos(rad_yaws), np.sin(rad_yaws)
+
+    ret = velocities.copy()
+    ret[:, 0] = velocities[:, 0] * cos + velocities[:, 1] * sin
+    ret[:, 1] = velocities[:, 0] * -sin + velocities[:, 1] * cos
+    return ret
+
+
+def range_degrees_batch(degrees: np.ndarray, with_negative: bool = True) -> np.ndarray:
+    """
+
+    :param degrees: An array of angles, in degrees.
+    :param with_negative:
+    :return: An array of the angles, ranged like range_degrees.
+    """
+    degrees = np.asarray(degrees, dtype=float)
+    wrapped = np.mod(degrees, 360)
+    # Positive multiples of 360 stay 360, like in range_degrees.
+    ret = np.where(degrees < 0, wrapped, np.where(degrees > 360, np.where(wrapped == 0, 360, wrapped), degrees))
+
+    if with_negative:
+        ret -= 180
+
+    return ret
+
+
+def quaternion_to_euler_batch(w: np.ndarray, x: np.ndarray, y: np.ndarray,
+                              z: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The same as quaternion_to_euler, for arrays of the components of the quaternions.
+    :return: Arrays of the roll, pitch, yaw, in radians.
+    """
+    w, x, y, z = (np.asarray(v, dtype=float) for v in (w, x, y, z))
+
+    roll = np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    sinp = 2 * (w * y - z * x)
+    pitch = np.where(np.abs(sinp) >= 1, np.copysign(math.pi / 2, sinp), np.arcsin(np.clip(sinp, -1, 1)))
+    yaw = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+
+    return roll, pitch, yaw
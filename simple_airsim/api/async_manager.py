@@ -0,0 +1,189 @@
+import asyncio
+from typing import Callable, Any, Awaitable, Dict, Iterable, Optional
+
+from . import coordinate_system
+from .async_sim_drone import AsyncSimDrone
+from .._utils.async_rpc import AsyncClient
+from .snapshot import Snapshot
+
+
+class AsyncManager:
+    """
+    The asyncio version of Manager: the algorithm is a coroutine function that runs as a task on the event loop.
+    """
+    class _PauseDrone(AsyncSimDrone):
+        """
+
+        """
+        _run_event: asyncio.Event
+
+        def __init__(self, system: coordinate_system.CoordinateSystem, lidar_names: Dict[str, str] = None,
+                     client: AsyncClient = None, lidar_reductions: Dict[str, Any] = None, vehicle_name: str = ""):
+            super().__init__(system, lidar_names, client, lidar_reductions, vehicle_name)
+            self._run_event = None
+
+        @property
+        def run_event(self) -> asyncio.Event:
+            # Created lazily, so it belongs to the loop that runs the algorithm.
+            if self._run_event is None:
+                self._run_event = asyncio.Event()
+                self._run_event.set()
+            return self._run_event
+
+        async def _pause_handler(self):
+            await super()._pause_handler()
+            await self.run_event.wait()
+
+        def pause(self):
+            self.run_event.clear()
+
+        def resume(self):
+            self.run_event.set()
+
+        def is_paused(self):
+            return not self.run_event.is_set()
+
+    _drone: _PauseDrone
+    algo_task: Optional[asyncio.Future]
+    algo_started: bool
+
+    def __init__(self, system: coordinate_system.CoordinateSystem, lidar_names: Optional[Dict[str, str]] = None,
+                 client: Optional[AsyncClient] = None,
+                 method: Optional[Callable[..., Awaitable]] = None, default_args: Optional[Iterable] = None,
+                 lidar_reductions: Optional[Dict[str, Any]] = None, vehicle_name: str = ""):
+        """
+
+        :param system:
+        :param lidar_names:
+        :param client:
+        :param method: A coroutine function that receives the drone (and the args).
+        :param default_args:
+        :param lidar_reductions: How to reduce the point cloud of each lidar (see SimDrone).
+        :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
+        """
+        self.default_args = default_args
+        self.method = method
+        self._drone = self._PauseDrone(system, lidar_names, client, lidar_reductions, vehicle_name)
+        self.algo_started = False
+        self.algo_task = None
+
+    def start_algo(self, new_args: Optional[Iterable] = None):
+        """
+        Must be called from the event loop.
+        :return:
+        """
+        args = [self._drone]
+        if new_args is None:
+            if self.default_args is not None:
+                args += self.default_args
+        else:
+            args += new_args
+
+        if self.algo_task is None or self.algo_task.done():
+            self.algo_task = asyncio.ensure_future(self.method(*args))
+            self.algo_started = True
+
+        if self._drone.is_paused():
+            self._drone.resume()
+
+    def pause_algo(self):
+        """
+
+        :return:
+        """
+        self._drone.pause()
+
+    def resume_algo(self):
+        """
+
+        :return:
+        """
+        self._drone.resume()
+
+    async def terminate_algo(self):
+        """
+        Cancel the algorithm's task, even in the middle of a call, and wait for it to end.
+        The command it was waiting for is cancelled in the simulator as well.
+        :return:
+        """
+        if self.algo_task is not None and not self.algo_task.done():
+            self.algo_task.cancel()
+            self.algo_started = False
+            try:
+                await self.algo_task
+            except asyncio.CancelledError:
+                pass
+            self._drone.resume()
+            # noinspection PyProtectedMember
+            await self._drone._cancel_last_command()
+
+    # Getters
+
+    def get_algo_state(self):
+        """
+
+        :return: 'running', 'paused' or 'terminated'
+        """
+        if self.algo_started and self.algo_task is not None and not self.algo_task.done():
+            if self._drone.is_paused():
+                return 'paused'
+            else:
+                return 'running'
+        else:
+            return 'stopped'
+
+    def get_airsim_client(self) -> AsyncClient:
+        """
+
+        :return:
+        """
+        return self._drone.client
+
+    async def enable_api_control(self, is_enabled: bool):
+        """
+        Switch between control through the api (the algorithm) and manual control.
+        :param is_enabled: True for the api, False for manual.
+        """
+        await self._drone.enable_api_control(is_enabled)
+
+    # The getters of the manager are not paused with the algorithm.
+
+    # noinspection PyProtectedMember
+    async def get_position(self):
+        return (await self._drone._read_snapshot(False)).position
+
+    # noinspection PyProtectedMember
+    async def get_orientation(self):
+        return (await self._drone._read_snapshot(False)).orientation
+
+    # noinspection PyProtectedMember
+    async def get_velocity(self):
+        return (await self._drone._read_snapshot(False)).velocity
+
+    # noinspection PyProtectedMember
+    async def get_lidars(self):
+        return await self._drone._read_lidars()
+
+    # noinspection PyProtectedMember
+    async def get_snapshot(self, with_lidars: bool = False) -> Snapshot:
+        return await self._drone._read_snapshot(with_lidars)
+
+    async def __aenter__(self):
+        """
+
+        :return:
+        """
+        await self._drone.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        """
+        Only a client that the manager created is closed, a client that was passed in belongs to the caller.
+        :param args:
+        :return:
+        """
+        await self.terminate_algo()
+        await self.enable_api_control(False)
+        # noinspection PyProtectedMember
+        if self._drone._own_client:
+            self._drone.client.close()
@@ -0,0 +1,309 @@
+import asyncio
+from typing import Dict, List, Optional, Sequence, Union
+
+import airsim
+import numpy as np
+
+from .._utils import get_state, do_action, airsim_lidars, images
+from .._utils.async_rpc import AsyncClient, REQUESTS
+from . import coordinate_system, camera_config
+from .sim_drone import SimDrone, _DEFAULT_LIDAR_NAMES
+from .snapshot import Snapshot
+
+
+class AsyncSimDrone:
+    """
+    A drone for asyncio: every getter and command is a coroutine.
+    All calls go over a single connection without threads, so one event loop can run many calls
+    (and many drones) at once, e.g. with asyncio.gather.
+    Commands return when they finish. To keep working while a command runs, wrap it in a task:
+        move = asyncio.ensure_future(drone.move_by(5, 0, 0))
+    """
+    client: AsyncClient
+
+    def __init__(self, system: coordinate_system.CoordinateSystem,
+                 lidar_names: Dict[str, str] = None,
+                 client: AsyncClient = None,
+                 lidar_reductions: Dict[str, Union[str, airsim_lidars.Reduction]] = None,
+                 vehicle_name: str = ""):
+        """
+        Initialize a drone. Call connect() (or any other method) from the event loop to connect.
+        :param system: The coordinate system to use.
+        :param lidar_names: The names of the lidar sensors in airsim and in code. Leave 'None' for default.
+        :param client: The async client. Leave 'None' for default.
+        :param lidar_reductions: How to reduce the point cloud of each lidar (see SimDrone).
+        :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
+        """
+        self.system = system
+        self.lidar_names = lidar_names
+        if lidar_names is None:
+            self.lidar_names = _DEFAULT_LIDAR_NAMES
+        self.lidar_reductions = lidar_reductions
+        self.vehicle_name = vehicle_name
+
+        self._own_client = client is None
+        self.client = client
+        if self.client is None:
+            self.client = AsyncClient()
+
+    # The conversions only depend on the coordinate system, so they are shared with SimDrone.
+    _convert_position = SimDrone._convert_position
+    _convert_orientation = SimDrone._convert_orientation
+    _convert_velocity = SimDrone._convert_velocity
+    _convert_snapshot = SimDrone._convert_snapshot
+
+    async def connect(self):
+        """
+        Connect to the simulator, and enable api control if the client was created by this drone.
+        """
+        await self.client.connect()
+        if self._own_client:
+            await self.client.send(REQUESTS.enableApiControl(True, self.vehicle_name))
+
+    async def _pause_handler(self):
+        """
+
+        :return:
+        """
+        pass
+
+    async def _cancel_last_command(self):
+        """
+        Cancel the last command in the simulator. Cancelling the coroutine that waits for a command only stops the
+        waiting, the simulator keeps running the command.
+        """
+        await self.client.send(REQUESTS.cancelLastTask(self.vehicle_name))
+
+    # One-line functions
+
+    async def takeoff(self) -> None:
+        """
+        Takeoff, and return when done.
+        """
+        await self._pause_handler()
+        await self.client.send(REQUESTS.takeoffAsync(vehicle_name=self.vehicle_name))
+
+    async def hover(self) -> None:
+        """
+        Hover, and return when done.
+        """
+        await self._pause_handler()
+        await self.client.send(REQUESTS.hoverAsync(vehicle_name=self.vehicle_name))
+
+    async def land(self) -> None:
+        """
+        Land, and return when done.
+        """
+        await self._pause_handler()
+        await self.client.send(REQUESTS.landAsync(vehicle_name=self.vehicle_name))
+
+    # Complex functions
+
+    async def _read_pose(self) -> airsim.Pose:
+        return airsim.Pose.from_msgpack(await self.client.send(REQUESTS.simGetVehiclePose(self.vehicle_name)))
+
+    async def move_by(self, x: float, y: float, z: float) -> None:
+        """
+        Move a specific amount of meters in every axis, and return when done.
+        Note: directions are defined by the coordinate system.
+        :param x: The number of meters to move in parallel to the x axis.
+        :param y: The number of meters to move in parallel to the y axis.
+        :param z: The number of meters to move in parallel to the z axis.
+        """
+        await self._pause_handler()
+
+        x, y, z = self.system.ta_dir(x, y, z)
+
+        pose = await self._read_pose()
+        # noinspection PyProtectedMember
+        await self.client.send(do_action._move_by(REQUESTS, get_state._position(pose.position),
+                                                  get_state._orientation(pose.orientation)['yaw'], x, y, z,
+                                                  self.vehicle_name))
+
+    async def turn_by(self, roll: float, pitch: float, yaw: float) -> None:
+        """
+        Turn a specific amount of degrees in every axis, and return when done.
+        Note: directions are defined by the coordinate system.
+        :param roll: The number of degrees to rotate the roll (rotate around the x axis).
+        :param pitch: The number of degrees to rotate the pitch (rotate around the y axis).
+        :param yaw: The number of degrees to rotate the yaw (rotate around the z axis).
+        """
+        await self._pause_handler()
+
+        roll, pitch, yaw = self.system.ta_ori(roll, pitch, yaw)
+
+        pose = await self._read_pose()
+        # noinspection PyProtectedMember
+        await self.client.send(do_action._turn_by(REQUESTS, get_state._position(pose.position)['z'],
+                                                  get_state._orientation(pose.orientation)['yaw'], roll, pitch, yaw,
+                                                  self.vehicle_name))
+
+    async def move_by_velocity(self, x: float, y: float, z: float, duration: float = 1,
+                               body_frame: bool = True) -> None:
+        """
+        Fly at a specific velocity, and return when done. Doesn't read the pose (see SimDrone.move_by_velocity).
+        Note: directions are defined by the coordinate system.
+        :param x: The velocity in parallel to the x axis, in meters per second.
+        :param y: The velocity in parallel to the y axis, in meters per second.
+        :param z: The velocity in parallel to the z axis, in meters per second.
+        :param duration: Time (in seconds) to execute this call.
+        :param body_frame: True for axes that turn with the drone, False for the world's.
+        """
+        await self._pause_handler()
+
+        x, y, z = self.system.ta_dir(x, y, z)
+
+        await self.client.send(do_action.move_by_velocity(REQUESTS, x, y, z, duration, body_frame, self.vehicle_name))
+
+    async def turn_at_rate(self, yaw_rate: float, duration: float = 1) -> None:
+        """
+        Turn at a specific speed in yaw, keeping the position, and return when done. Doesn't read the pose.
+        Note: directions are defined by the coordinate system.
+        :param yaw_rate: The yaw speed in degrees per second.
+        :param duration: Time (in seconds) to execute this call.
+        """
+        await self._pause_handler()
+
+        _, _, yaw_rate = self.system.ta_ori(0, 0, yaw_rate)
+
+        await self.client.send(do_action.rotate_by_yaw_rate(REQUESTS, yaw_rate, duration, self.vehicle_name))
+
+    async def command(self, roll: float, pitch: float, yaw_rate: float, z: float, duration: float = 0.1) -> None:
+        """
+        Target a specific roll, pitch, and z, with a specific speed in yaw, and return when done.
+        Note: directions are defined by the coordinate system.
+        :param roll: The target roll in degrees.
+        :param pitch: The target pitch in degrees.
+        :param yaw_rate: The yaw speed in degrees per second.
+        :param z: The target height.
+        :param duration: Time (in seconds) to execute this call.
+         This will be overridden if a different api function is called during this time.
+        """
+        await self._pause_handler()
+
+        roll, pitch, yaw_rate = self.system.ta_ori(roll, pitch, yaw_rate)
+        x, y, z = self.system.ta_pos(0, 0, z)
+
+        await self.client.send(do_action.move_roll_pitch_yaw_rate_z(REQUESTS, roll, pitch, yaw_rate, z, duration,
+                                                                    self.vehicle_name))
+
+    # Getters
+
+    async def get_position(self) -> Dict[str, float]:
+        """
+
+        :return: A dictionary of 'x', 'y', 'z' and their values in meters.
+        """
+        await self._pause_handler()
+
+        # noinspection PyProtectedMember
+        return self._convert_position(get_state._position((await self._read_pose()).position))
+
+    async def get_orientation(self) -> Dict[str, float]:
+        """
+
+        :return: A dictionary of 'roll', 'pitch', 'yaw' and their values in degrees.
+        """
+        await self._pause_handler()
+
+        # noinspection PyProtectedMember
+        return self._convert_orientation(get_state._orientation((await self._read_pose()).orientation))
+
+    async def get_velocity(self) -> Dict[str, float]:
+        """
+
+        :return: A dictionary of 'x', 'y', 'z', 'roll', 'pitch', 'yaw' and the velocity (linear or angular) in each.
+        """
+        await self._pause_handler()
+
+        return (await self._read_snapshot(False)).velocity
+
+    async def get_lidars(self) -> Dict[str, Optional[float]]:
+        """
+
+        :return: A dictionary of the lidars as defined in 'self.lidar_names' and their values.
+        """
+        await self._pause_handler()
+
+        return await self._read_lidars()
+
+    async def get_snapshot(self, with_lidars: bool = False) -> Snapshot:
+        """
+
+        :param with_lidars: Should the lidars be read as well (at the same time)?
+        :return: A Snapshot of the position, orientation, velocity, timestamp and collision state.
+        """
+        await self._pause_handler()
+
+        return await self._read_snapshot(with_lidars)
+
+    async def _read_lidars(self) -> Dict[str, Optional[float]]:
+        results = await asyncio.gather(*(self.client.send(REQUESTS.getLidarData(name, self.vehicle_name))
+                                         for name in self.lidar_names))
+        data = [airsim.LidarData.from_msgpack(result) for result in results]
+        # noinspection PyProtectedMember
+        return get_state._lidars_to_world(airsim_lidars._reduce_all(self.lidar_names, data, self.lidar_reductions),
+                                          self.lidar_names, self.lidar_reductions)
+
+    async def _read_snapshot(self, with_lidars: bool) -> Snapshot:
+        # The state and the lidars are requested at once, so they are read at the same time.
+        reads = [self.client.send(REQUESTS.getMultirotorState(self.vehicle_name))]
+        if with_lidars:
+            reads.append(self._read_lidars())
+
+        results = await asyncio.gather(*reads)
+        state = airsim.MultirotorState.from_msgpack(results[0])
+        lid = results[1] if with_lidars else None
+
+        # noinspection PyProtectedMember
+        snapshot = get_state._snapshot(state, lid)
+        if not with_lidars:
+            snapshot['lidars'] = None
+        return self._convert_snapshot(snapshot)
+
+    async def get_image(self, camera_id: int, cam_type: camera_config.ImageType,
+                        return_type: camera_config.ReturnType, default_alpha: int = 128) -> np.ndarray:
+        """
+        The image is decoded in the default executor, so the event loop keeps running meanwhile.
+        :return: A numpy array of the image (in the shape (x, y, color)).
+        """
+        await self._pause_handler()
+
+        raw_image = await self.client.send(REQUESTS.simGetImage(str(camera_id), cam_type.airsim_val, self.vehicle_name))
+        return await asyncio.get_event_loop().run_in_executor(None, images.decode, raw_image, return_type,
+                                                              default_alpha)
+
+    async def get_images(self, requests: Sequence[camera_config.ImageRequest], default_alpha: int = 128,
+                         out: Optional[Sequence[Optional[np.ndarray]]] = None) -> List[np.ndarray]:
+        """
+        Get several images in a single call (see SimDrone.get_images).
+        """
+        await self._pause_handler()
+
+        raw_responses = await self.client.send(REQUESTS.simGetImages([images.request(request) for request in requests],
+                                                                     self.vehicle_name))
+        if out is None:
+            out = [None] * len(requests)
+        return [images.to_array(airsim.ImageResponse.from_msgpack(response), request, default_alpha, buffer)
+                for response, request, buffer in zip(raw_responses, requests, out)]
+
+    # Sim only
+
+    async def pause_sim(self):
+        await self.client.send(REQUESTS.simPause(True))
+
+    async def resume_sim(self):
+        await self.client.send(REQUESTS.simPause(False))
+
+    async def pause_sim_state(self) -> bool:
+        return await self.client.send(REQUESTS.simIsPause())
+
+    async def continue_for_time(self, seconds):
+        await self.client.send(REQUESTS.simContinueForTime(seconds))
+
+    async def enable_api_control(self, is_enabled: bool):
+        """
+        Enable or disable control through the api (i.e. switch between the algorithm and manual control).
+        :param is_enabled: True for the api, False for manual.
+        """
+        await self.client.send(REQUESTS.enableApiControl(is_enabled, self.vehicle_name))
@@ -0,0 +1,154 @@
+import json
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+MAGIC = b"SALOG01\n"
+
+DEFAULT_DTYPE = "<f8"
+
+_LENGTH = struct.Struct("<I")
+
+
+def _row_dtype(columns: Sequence[str], dtypes: Optional[Dict[str, str]] = None) -> np.dtype:
+    if dtypes is None:
+        dtypes = {}
+    return np.dtype([(name, np.dtype(dtypes.get(name, DEFAULT_DTYPE)).newbyteorder("<")) for name in columns])
+
+
+def _header(row_dtype: np.dtype) -> bytes:
+    schema = json.dumps({"columns": [[name, row_dtype[name].str] for name in row_dtype.names]}).encode("utf-8")
+    padding = -(len(MAGIC) + _LENGTH.size + len(schema)) % 8
+    schema += b" " * padding
+    return MAGIC + _LENGTH.pack(len(schema)) + schema
+
+
+def _read_header(file: BinaryIO) -> np.dtype:
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("'%s' is not a binary log." % file.name)
+    length, = _LENGTH.unpack(file.read(_LENGTH.size))
+    schema = json.loads(file.read(length).decode("utf-8"))
+    return np.dtype([(name, dtype) for name, dtype in schema["columns"]])
+
+
+def _header_size(row_dtype: np.dtype) -> int:
+    return len(_header(row_dtype))
+
+
+class BinaryLogFile:
+    """
+    Appends rows to a binary log.
+
+    The file starts with a header that describes the schema, followed by fixed-size rows that are appended in chunks.
+    Every column has a fixed dtype, so the file can be memory-mapped and each column read without parsing (see read).
+
+    Layout:
+        MAGIC (8 bytes)
+        header length (uint32, little endian)
+        header (JSON: {"columns": [[name, dtype], ...]}, padded with spaces to a multiple of 8 bytes)
+        rows (packed records of the columns, in order)
+    """
+    file: Optional[BinaryIO]
+
+    def __init__(self, filename: str, columns: Sequence[str], dtypes: Optional[Dict[str, str]] = None):
+        """
+        Open (or create) a binary log. An existing log must have the same columns.
+        :param filename: The file to write to.
+        :param columns: The names of the columns, in order.
+        :param dtypes: The dtype of the columns that are not float64, by name (e.g. {"count": "i4"}).
+        """
+        self.filename = filename
+        self.row_dtype = _row_dtype(columns, dtypes)
+
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            with open(filename, "rb") as file:
+                existing = _read_header(file)
+            if existing != self.row_dtype:
+                raise ValueError("'%s' was written with different columns: %s" % (filename, existing))
+            self.file = open(filename, "ab")
+        else:
+            self.file = open(filename, "ab")
+            self.file.write(_header(self.row_dtype))
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]):
+        """
+        Append a chunk of rows. A value of None is written as NaN.
+        :param rows: The rows, each with a value for every column (in order).
+        """
+        chunk = np.array([tuple(np.nan if x is None else x for x in row) for row in rows], dtype=self.row_dtype)
+        self.file.write(chunk.tobytes())
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> "BinaryLogFile":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read(filename: str) -> Dict[str, np.ndarray]:
+    """
+    Memory-map a binary log. Nothing is parsed, and the data is only read from the disk when it is accessed.
+    :param filename: The binary log.
+    :return: A dictionary of the column names and their values. The arrays are read-only views of the file.
+    """
+    with open(filename, "rb") as file:
+        row_dtype = _read_header(file)
+
+    offset = _header_size(row_dtype)
+    # A row that was cut in the middle (e.g. if the writer crashed) is ignored.
+    count = (os.path.getsize(filename) - offset) // row_dtype.itemsize
+    if count == 0:
+        return {name: np.empty(0, dtype=row_dtype[name]) for name in row_dtype.names}
+
+    rows = np.memmap(filename, dtype=row_dtype, mode="r", offset=offset, shape=(count,))
+    return {name: rows[name] for name in row_dtype.names}
+
+
+def _csv_value(value: str) -> float:
+    value = value.strip()
+    return np.nan if value == "None" else float(value)
+
+
+def csv_to_binary(csv_filename: str, binary_filename: str, dtypes: Optional[Dict[str, str]] = None,
+                  chunk_size: int = 10000):
+    """
+    Convert a log written by LogWriter as CSV to a binary log.
+    :param csv_filename: The CSV log.
+    :param binary_filename: The binary log to write. Must not exist, or have the same columns.
+    :param dtypes: The dtype of the columns that are not float64, by name.
+    :param chunk_size: The number of rows to convert at once.
+    """
+    with open(csv_filename, "r") as csv_file:
+        columns = [name.strip() for name in csv_file.readline().split(",")]
+        with BinaryLogFile(binary_filename, columns, dtypes) as binary_file:
+            chunk: List[List[float]] = []
+            for line in csv_file:
+                if not line.strip():
+                    continue
+                chunk.append([_csv_value(x) for x in line.split(",")])
+                if len(chunk) == chunk_size:
+                    binary_file.write_rows(chunk)
+                    chunk = []
+            if chunk:
+                binary_file.write_rows(chunk)
+
+
+def binary_to_csv(binary_filename: str, csv_filename: str):
+    """
+    Convert a binary log to the CSV layout written by LogWriter. NaN is written as None.
+    :param binary_filename: The binary log.
+    :param csv_filename: The CSV log to write.
+    """
+    columns = read(binary_filename)
+    with open(csv_filename, "w") as csv_file:
+        csv_file.write(", ".join(columns.keys()) + "\n")
+        for row in zip(*(column.tolist() for column in columns.values())):
+            csv_file.write(", ".join("None" if x != x else str(x) for x in row) + "\n")
@@ -1,4 +1,5 @@
 import enum
+from typing import NamedTuple, Union
 
 import airsim
 
@@ -8,6 +9,10 @@ class ImageType(enum.Enum):
         self.airsim_val = airsim_val
 
     DEPTH = (airsim.ImageType.DepthVis,)
+    # Float images of the distance from the camera, in meters (get them with as_float=True).
+    DEPTH_PERSPECTIVE = (airsim.ImageType.DepthPerspective,)
+    # Float images of the distance from the camera's plane, in meters (get them with as_float=True).
+    DEPTH_PLANAR = (airsim.ImageType.DepthPlanner,)
     SEGMENTATION = (airsim.ImageType.Segmentation,)
     VISUAL = (airsim.ImageType.Scene,)
     DISPARITY = (airsim.ImageType.DisparityNormalized,)
@@ -24,3 +29,17 @@ class ReturnType(enum.Enum):
     RGB = (2, "RGB", False)
     BGR_A = (3, "BGR", True)
     BGR = (4, "BGR", False)
+
+
+class ImageRequest(NamedTuple):
+    """
+    An image to get with Drone.get_images.
+    """
+    # The id of the camera.
+    camera_id: Union[int, str]
+    # The type of the image (e.g. depth, segmentation etc.).
+    image_type: ImageType
+    # The return format i.e. RGB or BGR, and with / without alpha. Ignored for float images.
+    return_type: ReturnType = ReturnType.RGB
+    # Get a float image of shape (height, width) instead, e.g. for depth in meters.
+    as_float: bool = False
@@ -0,0 +1,215 @@
+import collections
+import time
+from threading import Condition, Thread
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from . import camera_config
+from .sim_drone import SimDrone
+
+# The number of recent frames that the FPS and latency are measured over.
+STATS_WINDOW = 100
+# The time to wait after a failed capture before the next one, when capturing as fast as possible.
+ERROR_BACKOFF = 0.1  # seconds
+
+
+class Frame(NamedTuple):
+    # The number of the frame since the stream started.
+    index: int
+    # The simulator's time of the frame, in seconds (the same clock as Snapshot.timestamp).
+    timestamp: float
+    # The time.monotonic() when the frame was ready.
+    capture_time: float
+    # The time from the request to the frame being ready, in seconds.
+    latency: float
+    # An image for each request of the stream. Owned by the stream: valid until ring_size newer frames are captured.
+    images: List[np.ndarray]
+
+
+class CameraStream:
+    """
+    Captures images on its own thread, into a fixed ring of preallocated arrays.
+    Readers get the frames without copying, so a frame is only valid until the stream reuses its arrays,
+    ring_size - 1 frames later. Copy the images to keep them longer, or check is_valid(frame) after using them.
+    """
+    run: bool
+    _thread: Optional[Thread]
+    _frames: List[Optional[Frame]]
+    _capture_times: Deque[float]
+    _latencies: Deque[float]
+
+    def __init__(self, drone: SimDrone, requests: Sequence[camera_config.ImageRequest], rate: Optional[float] = None,
+                 ring_size: int = 3, default_alpha: int = 128):
+        """
+
+        :param drone: The drone to capture from.
+        :param requests: The images of each frame (see SimDrone.get_images).
+        :param rate: The number of frames per second. Leave 'None' to capture as fast as possible.
+        :param ring_size: The number of frames kept. At least 2, so the latest frame is never being written.
+        :param default_alpha: The alpha to add to images without alpha, if the return type has alpha.
+        """
+        if ring_size < 2:
+            raise ValueError("ring_size must be at least 2.")
+
+        self.drone = drone
+        self.requests = list(requests)
+        self.period = None if rate is None else 1 / rate
+        self.ring_size = ring_size
+        self.default_alpha = default_alpha
+        self.run = False
+        # The error of the latest capture, raised by the readers until a capture succeeds.
+        self.error: Optional[Exception] = None
+
+        self._thread = None
+        self._condition = Condition()
+        self._frames = [None] * ring_size
+        self._buffers: Optional[List[List[np.ndarray]]] = None
+        # The index of the frame that is being written (or the next one).
+        self._writing = 0
+        self._dropped = 0
+        self._capture_times = collections.deque(maxlen=STATS_WINDOW)
+        self._latencies = collections.deque(maxlen=STATS_WINDOW)
+
+    def start(self):
+        """
+        Start capturing in the background. Does nothing if already running.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self.run = True
+        self.error = None
+        self._thread = Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop capturing and wait for the background thread to finish.
+        """
+        self.run = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_valid(self, frame: Frame) -> bool:
+        """
+
+        :param frame: A frame from this stream.
+        :return: True if the arrays of the frame weren't reused for a newer frame (yet).
+        """
+        return frame.index > self._writing - self.ring_size
+
+    def latest(self) -> Optional[Frame]:
+        """
+        Never blocks.
+        If the latest capture failed, its error is raised, as if the simulator was read directly.
+        :return: The latest frame, or None if nothing was captured yet.
+        """
+        error = self.error
+        if error is not None:
+            raise error
+        if self._writing == 0:
+            return None
+        return self._frames[(self._writing - 1) % self.ring_size]
+
+    def at_or_after(self, timestamp: float, timeout: Optional[float] = None) -> Frame:
+        """
+        Get the oldest kept frame from the given simulator time or later, waiting for it if needed.
+        If the latest capture failed (or fails while waiting), its error is raised.
+        :param timestamp: The simulator's time, in seconds (e.g. Snapshot.timestamp).
+        :param timeout: The maximal time (in seconds) to wait. Leave 'None' to wait forever.
+        :return: The frame.
+        """
+        found: List[Frame] = []
+
+        def find() -> bool:
+            frames = [frame for frame in self._frames
+                      if frame is not None and frame.timestamp >= timestamp and self.is_valid(frame)]
+            if frames:
+                found.append(min(frames, key=lambda frame: frame.index))
+            return bool(frames)
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.error is not None or find(), timeout):
+                raise TimeoutError("No frame from %s or later within %s seconds." % (timestamp, timeout))
+            if self.error is not None:
+                raise self.error
+        return found[0]
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+
+        :return: A dictionary of 'frames' (captured), 'dropped' (frames missed because a capture took longer than
+         the period), 'fps' (achieved over the recent frames), and 'latency' and 'max_latency' (of the recent
+         captures, in seconds).
+        """
+        capture_times = list(self._capture_times)
+        latencies = list(self._latencies)
+
+        fps = 0.0
+        if len(capture_times) > 1 and capture_times[-1] > capture_times[0]:
+            fps = (len(capture_times) - 1) / (capture_times[-1] - capture_times[0])
+
+        return {"frames": self._writing,
+                "dropped": self._dropped,
+                "fps": fps,
+                "latency": sum(latencies) / len(latencies) if latencies else 0.0,
+                "max_latency": max(latencies) if latencies else 0.0}
+
+    def _capture(self):
+        index = self._writing
+        slot = index % self.ring_size
+
+        start = time.monotonic()
+        if self._buffers is None:
+            # The shapes are only known after the first capture.
+            # noinspection PyProtectedMember
+            timestamp, ims = self.drone._read_images(self.requests, self.default_alpha)
+            self._buffers = [[np.array(im) for im in ims] for _ in range(self.ring_size)]
+        else:
+            # noinspection PyProtectedMember
+            timestamp, _ = self.drone._read_images(self.requests, self.default_alpha, self._buffers[slot])
+        end = time.monotonic()
+
+        with self._condition:
+            self._frames[slot] = Frame(index, timestamp, end, end - start, self._buffers[slot])
+            self._writing = index + 1
+            self._capture_times.append(end)
+            self._latencies.append(end - start)
+            self.error = None
+            self._condition.notify_all()
+
+    def _capture_loop(self):
+        next_time = time.monotonic()
+        while self.run:
+            try:
+                self._capture()
+            except Exception as e:
+                with self._condition:
+                    self.error = e
+                    self._condition.notify_all()
+                if self.period is None:  # Don't retry a failing simulator in a busy loop.
+                    time.sleep(ERROR_BACKOFF)
+                    continue
+
+            if self.period is None:
+                continue
+
+            next_time += self.period
+            now = time.monotonic()
+            if next_time < now:  # The capture took longer than the period, skip the missed frames.
+                missed = int((now - next_time) / self.period) + 1
+                self._dropped += missed
+                next_time += missed * self.period
+            time.sleep(next_time - now)
+
+    def __enter__(self) -> "CameraStream":
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,144 @@
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+from msgpackrpc.future import Future
+
+from .._utils import rpc
+
+
+class CommandHandle:
+    """
+    A command that was sent to the drone.
+    Use it to wait for the command to finish, check if it finished, cancel it, or run code when it finishes.
+    """
+    _callbacks: List[Callable[["CommandHandle"], Any]]
+    _watcher: Optional[threading.Thread]
+
+    def __init__(self, future: Future, lock, cancel: Callable[["CommandHandle"], bool],
+                 interrupted: Optional[Callable[[], bool]] = None,
+                 on_interrupt: Optional[Callable[["CommandHandle"], None]] = None):
+        """
+
+        :param future: The future of the async call that sent the command.
+        :param lock: The lock that guards the client.
+        :param cancel: A function that cancels the command in the simulator, and returns True if it did.
+        :param interrupted: Checked while waiting. When it returns True (e.g. on pause or terminate),
+         wait calls on_interrupt.
+        :param on_interrupt: Handles an interrupted wait, e.g. cancels the command and blocks until it may go on
+         (then sends the command again, with _resume), or raises to stop the waiting thread.
+        """
+        self._future = future
+        self._lock = lock
+        self._cancel = cancel
+        self._interrupted = interrupted
+        self._on_interrupt = on_interrupt
+        self._cancelled = False
+        # While an interrupted wait is handled, the cancelled call doesn't count as the command finishing.
+        self._interrupting = False
+
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+        self._callbacks_done = False
+        self._watcher = None
+
+    def done(self) -> bool:
+        """
+        Never waits for the command.
+        :return: True if the command finished (or was cancelled).
+        """
+        if self._interrupting or not rpc.poll(self._future, self._lock):
+            return False
+
+        self._run_callbacks()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the command to finish. Other calls to the drone can be made while waiting.
+        :param timeout: The maximal time to wait, in seconds. Leave 'None' to wait until the command finishes.
+        :return: True if the command finished, False if the time is up.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not rpc.wait(self._future, self._lock, _remaining(deadline), self._interrupted):
+            if self._interrupted is None or not self._interrupted():
+                return False  # The time is up.
+            self._interrupting = True
+            try:
+                self._on_interrupt(self)
+            finally:
+                self._interrupting = False
+            if deadline is not None and time.monotonic() >= deadline and not rpc.is_done(self._future):
+                return False
+
+        self._run_callbacks()
+        self._future.get()  # Raise the error of the command, if any.
+        return True
+
+    def cancel(self) -> bool:
+        """
+        Cancel the command, if it is still running.
+        Only the last command sent to the drone can be cancelled, since a new command replaces the previous one anyway.
+        :return: True if the command was cancelled.
+        """
+        if self.done():
+            return False
+
+        self._cancelled = self._cancel(self)
+        return self._cancelled
+
+    def cancelled(self) -> bool:
+        """
+
+        :return: True if the command was cancelled using cancel().
+        """
+        return self._cancelled
+
+    def _resume(self, future: Future):
+        """
+        Continue an interrupted command with a new call that sent it again.
+        :param future: The future of the new call.
+        """
+        self._future = future
+        self._cancelled = False
+
+    def add_done_callback(self, callback: Callable[["CommandHandle"], Any]):
+        """
+        Call a function when the command finishes. If it already finished, the function is called immediately.
+        The function is called on a background thread (or on the thread that noticed the command finished),
+        and may send new commands, e.g. to chain moves.
+        :param callback: A function that receives this handle.
+        """
+        with self._callbacks_lock:
+            if not self._callbacks_done:
+                self._callbacks.append(callback)
+                if self._watcher is None:
+                    self._watcher = threading.Thread(target=self._watch, daemon=True)
+                    self._watcher.start()
+                return
+
+        callback(self)
+
+    def _watch(self):
+        while True:
+            future = self._future
+            rpc.wait(future, self._lock)
+            while self._interrupting:
+                time.sleep(rpc.WAIT_SLICE)
+            if self._future is future:  # Otherwise, the command was sent again after an interrupted wait.
+                break
+        self._run_callbacks()
+
+    def _run_callbacks(self):
+        with self._callbacks_lock:
+            if self._callbacks_done:
+                return
+            self._callbacks_done = True
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            callback(self)
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
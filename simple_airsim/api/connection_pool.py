@@ -0,0 +1,213 @@
+import functools
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+import airsim
+
+from .._utils import rpc
+from .rpc_stats import RpcStats
+
+# Commands, and anything else that should never wait behind a slow call.
+CONTROL = "control"
+# The state of the drone (position, orientation, velocity, lidars).
+TELEMETRY = "telemetry"
+# Large transfers, such as images and point clouds.
+BULK = "bulk"
+
+LANES = (CONTROL, TELEMETRY, BULK)
+
+# The time to wait for a response to a health check.
+HEALTH_CHECK_TIMEOUT = 1  # seconds
+# The largest read from the bulk lane's connection, so a frame of uncompressed images is read in a few chunks.
+BULK_READ_CHUNK_SIZE = 1024 * 1024  # bytes
+
+
+class Lane:
+    """
+    A connection to the simulator and the lock that guards it.
+    The connection is made on first use, and made again after a failed health check.
+    """
+    _client: Optional[airsim.MultirotorClient]
+    _stats: Optional[RpcStats]
+    _remove_hooks: Optional[Callable[[], None]]
+
+    def __init__(self, ip: str = "", port: int = 41451, client: Optional[airsim.MultirotorClient] = None,
+                 lock: Optional[threading.RLock] = None, name: str = CONTROL, read_chunk_size: Optional[int] = None):
+        """
+
+        :param ip: The ip of the simulator. Leave empty for localhost.
+        :param port: The port of the simulator.
+        :param client: An existing client to use. Leave 'None' to connect on first use.
+        :param lock: The lock of the client, if it is already shared. Leave 'None' for a lock of its own.
+        :param name: The name of the lane, in the stats.
+        :param read_chunk_size: The largest read from the connection, in bytes (see rpc.set_read_chunk_size).
+         Leave 'None' for the default, 64 KB.
+        """
+        self.ip = ip
+        self.port = port
+        self.name = name
+        self.read_chunk_size = read_chunk_size
+        self._client = client
+        self.lock = lock
+        if self.lock is None:
+            self.lock = threading.RLock()
+
+        # Nothing is measured (and nothing is wrapped) until enable_stats.
+        self._stats = None
+        self._raw_lock = self.lock
+        self._remove_hooks = None
+
+    @property
+    def client(self) -> airsim.MultirotorClient:
+        """
+
+        :return: The client of the lane, connecting if needed.
+        """
+        if self._client is None:
+            with self.lock:
+                if self._client is None:
+                    self._client = airsim.MultirotorClient(self.ip, self.port)
+                    rpc.set_nodelay(self._client.client)
+                    if self.read_chunk_size is not None:
+                        rpc.set_read_chunk_size(self._client.client, self.read_chunk_size)
+                    if self._stats is not None:
+                        self._remove_hooks = rpc.instrument(self._client.client, self._stats.record_call)
+        return self._client
+
+    def is_connected(self) -> bool:
+        return self._client is not None
+
+    def check_health(self, timeout: float = HEALTH_CHECK_TIMEOUT) -> bool:
+        """
+        Ping the simulator. Other calls on the lane can be made while waiting for the response.
+        If there is no response in time, the lane is disconnected, and reconnects on its next use.
+        :param timeout: The maximal time to wait for the response, in seconds.
+        :return: True if the simulator responded in time.
+        """
+        client = self.client
+        try:
+            with self.lock:
+                future = client.client.call_async("ping")
+            healthy = rpc.wait(future, self.lock, timeout) and future.get() is True
+        except Exception:
+            healthy = False
+
+        if not healthy:
+            self.disconnect()
+        return healthy
+
+    def disconnect(self):
+        with self.lock:
+            if self._client is not None:
+                try:
+                    self._client.client.close()
+                except Exception:
+                    pass
+                self._client = None
+                self._remove_hooks = None
+
+    def enable_stats(self, stats: RpcStats):
+        """
+        Record every call of the lane, and the waits for its lock, in stats.
+        :param stats: The stats to record in.
+        """
+        with self._raw_lock:
+            self.disable_stats()
+            self._stats = stats
+            self.lock = rpc.TimedLock(self._raw_lock, functools.partial(stats.record_lock_wait, self.name))
+            if self._client is not None:
+                self._remove_hooks = rpc.instrument(self._client.client, stats.record_call)
+
+    def disable_stats(self):
+        """
+        Stop recording, and remove the wrappers, so the lane costs what it did before enable_stats.
+        """
+        with self._raw_lock:
+            if self._remove_hooks is not None:
+                self._remove_hooks()
+                self._remove_hooks = None
+            self._stats = None
+            self.lock = self._raw_lock
+
+
+class ConnectionPool:
+    """
+    Separate connections to the simulator for separate kinds of calls, so a heavy read (e.g. a 200 ms image)
+    doesn't delay the next command. Each lane has its own lock, and connects on first use.
+    """
+    lanes: Dict[str, Lane]
+    stats: Optional[RpcStats]
+
+    def __init__(self, ip: str = "", port: int = 41451, lanes: Iterable[str] = LANES):
+        """
+
+        :param ip: The ip of the simulator. Leave empty for localhost.
+        :param port: The port of the simulator.
+        :param lanes: The names of the lanes. The lanes that are asked for but aren't here use the control lane.
+        """
+        self.lanes = {name: Lane(ip, port, name=name, read_chunk_size=BULK_READ_CHUNK_SIZE if name == BULK else None)
+                      for name in lanes}
+        if CONTROL not in self.lanes:
+            self.lanes[CONTROL] = Lane(ip, port)
+        self.stats = None
+
+    @classmethod
+    def from_client(cls, client: airsim.MultirotorClient, lock: Optional[threading.RLock] = None) -> "ConnectionPool":
+        """
+        A pool with a single lane that uses an existing client, for code that already has one.
+        :param client: The client.
+        :param lock: The lock of the client, if it is already shared.
+        :return: The pool.
+        """
+        pool = cls(lanes=())
+        pool.lanes[CONTROL] = Lane(client=client, lock=lock)
+        return pool
+
+    def lane(self, name: str) -> Lane:
+        """
+
+        :param name: CONTROL, TELEMETRY, BULK or another lane given to the constructor.
+        :return: The lane, or the control lane if the pool has no such lane.
+        """
+        return self.lanes.get(name, self.lanes[CONTROL])
+
+    @property
+    def control(self) -> Lane:
+        return self.lane(CONTROL)
+
+    @property
+    def telemetry(self) -> Lane:
+        return self.lane(TELEMETRY)
+
+    @property
+    def bulk(self) -> Lane:
+        return self.lane(BULK)
+
+    def check_health(self, timeout: float = HEALTH_CHECK_TIMEOUT) -> Dict[str, bool]:
+        """
+        Ping the simulator on every connected lane (see Lane.check_health).
+        :param timeout: The maximal time to wait for each response, in seconds.
+        :return: A dictionary of whether each lane is healthy, by its name. Lanes that never connected are skipped.
+        """
+        return {name: lane.check_health(timeout) for name, lane in self.lanes.items() if lane.is_connected()}
+
+    def enable_stats(self, stats: Optional[RpcStats] = None) -> RpcStats:
+        """
+        Record the calls of every lane (see Lane.enable_stats). Does nothing if already recording.
+        :param stats: The stats to record in, e.g. to share them between pools. Leave 'None' for new stats.
+        :return: The stats that the pool records in.
+        """
+        if self.stats is None:
+            self.stats = stats if stats is not None else RpcStats()
+            for lane in self.lanes.values():
+                lane.enable_stats(self.stats)
+        return self.stats
+
+    def disable_stats(self):
+        for lane in self.lanes.values():
+            lane.disable_stats()
+        self.stats = None
+
+    def close(self):
+        for lane in self.lanes.values():
+            lane.disconnect()
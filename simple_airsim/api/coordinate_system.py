@@ -1,17 +1,168 @@
-from abc import ABC, abstractmethod
-from enum import Enum
+from typing import Callable, Dict, FrozenSet, Optional, Sequence, Tuple
 
-from typing import Tuple
+import numpy as np
 
+# The scalar methods a subclass may define its system with, instead of the matrices.
+_SCALAR_METHODS = ("fa_pos", "fa_ori", "ta_pos", "ta_ori")
 
-class CoordinateSystem(ABC):
+_Rows = Tuple[Tuple[float, float, float], Tuple[float, float, float], Tuple[float, float, float]]
+
+
+class CoordinateSystem:
     """
     A class that defines a coordinate system.
     The default coordinate system is Airsim (see: "Coordinate System.md").
     This class then translates it into other coordinate systems.
+
+    A system is defined by linear maps from airsim's coordinates to its own:
+    positions are p = pos_matrix @ p_airsim + pos_offset, where pos_matrix is a rotation or a sign/permutation matrix,
+    and orientations (roll, pitch, yaw) are o = ori_matrix @ o_airsim, where ori_matrix is a sign/permutation matrix.
+    Every method has a batch version that converts arrays of shape (N, 3) at once.
+
+    A subclass can still define its system by overriding fa_pos, fa_ori, ta_pos and ta_ori (as before the matrices):
+    the batch and direction methods then call the overridden methods (point by point), and to() isn't supported.
     """
+    # The scalar methods that the class overrides (see __init_subclass__).
+    _overridden: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._overridden = frozenset(name for name in _SCALAR_METHODS
+                                    if getattr(cls, name) is not getattr(CoordinateSystem, name))
+
+    def __init__(self, pos_matrix: Optional[Sequence[Sequence[float]]] = None,
+                 pos_offset: Optional[Sequence[float]] = None,
+                 ori_matrix: Optional[Sequence[Sequence[float]]] = None,
+                 base: Optional["CoordinateSystem"] = None, name: str = "CoordinateSystem"):
+        """
+
+        :param pos_matrix: The 3x3 matrix from airsim's (or the base's) position axes to this system's.
+         Leave 'None' for the same axes.
+        :param pos_offset: The position of airsim's (or the base's) origin in this system, in meters.
+         Leave 'None' for the same origin.
+        :param ori_matrix: The 3x3 matrix from airsim's (or the base's) roll, pitch, yaw to this system's.
+         Leave 'None' for the same angles.
+        :param base: Define this system relative to another system instead of airsim.
+         The transforms are composed once, here.
+        :param name: The name of the system.
+        """
+        pos_matrix = np.eye(3) if pos_matrix is None else np.array(pos_matrix, dtype=float)
+        pos_offset = np.zeros(3) if pos_offset is None else np.array(pos_offset, dtype=float)
+        ori_matrix = np.eye(3) if ori_matrix is None else np.array(ori_matrix, dtype=float)
+
+        if base is not None:
+            pos_offset = pos_matrix @ base.pos_offset + pos_offset
+            pos_matrix = pos_matrix @ base.pos_matrix
+            ori_matrix = ori_matrix @ base.ori_matrix
+
+        self.pos_matrix = pos_matrix
+        self.pos_offset = pos_offset
+        self.ori_matrix = ori_matrix
+        self.name = name
+
+        # Row vectors are converted with p @ M.T, so keep the transposed matrices (and their inverses) ready.
+        self._fa_pos_t = pos_matrix.T
+        self._ta_pos_t = np.linalg.inv(pos_matrix).T
+        self._fa_ori_t = ori_matrix.T
+        self._ta_ori_t = np.linalg.inv(ori_matrix).T
+        # The same maps as plain tuples, for the scalar methods: a single point is much cheaper without numpy.
+        # ta_pos is p = inv(pos_matrix) @ p_current - inv(pos_matrix) @ pos_offset.
+        self._fa_pos_rows = _rows(pos_matrix)
+        self._ta_pos_rows = _rows(self._ta_pos_t.T)
+        self._fa_pos_offset = tuple(pos_offset.tolist())
+        self._ta_pos_offset = tuple((-(self._ta_pos_t.T @ pos_offset)).tolist())
+        self._fa_ori_rows = _rows(ori_matrix)
+        self._ta_ori_rows = _rows(self._ta_ori_t.T)
+        self._to_cache: Dict[int, Tuple["CoordinateSystem", "CoordinateSystem"]] = {}
+
+    def __repr__(self) -> str:
+        return self.name
+
+    # Batch
+
+    def fa_pos_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Translate positions from airsim coordinate system to this one.
+        :param points: An array of shape (N, 3) of x, y, z in airsim coordinates, in meters.
+        :return: An array of shape (N, 3) of x, y, z in current coordinates.
+        """
+        if "fa_pos" in self._overridden:
+            return _each(self.fa_pos, points)
+        return np.asarray(points) @ self._fa_pos_t + self.pos_offset
+
+    def ta_pos_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Translate positions from current coordinate system to airsim.
+        :param points: An array of shape (N, 3) of x, y, z in current coordinates, in meters.
+        :return: An array of shape (N, 3) of x, y, z in airsim coordinates.
+        """
+        if "ta_pos" in self._overridden:
+            return _each(self.ta_pos, points)
+        return (np.asarray(points) - self.pos_offset) @ self._ta_pos_t
+
+    def fa_dir_batch(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Translate directions (e.g. velocities or relative moves) from airsim coordinate system to this one.
+        Like fa_pos_batch, without the offset.
+        :param vectors: An array of shape (N, 3) of x, y, z in airsim coordinates.
+        :return: An array of shape (N, 3) of x, y, z in current coordinates.
+        """
+        if "fa_pos" in self._overridden:
+            return _each(self.fa_pos, vectors) - self.fa_pos(0, 0, 0)
+        return np.asarray(vectors) @ self._fa_pos_t
+
+    def ta_dir_batch(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Translate directions (e.g. velocities or relative moves) from current coordinate system to airsim.
+        Like ta_pos_batch, without the offset.
+        :param vectors: An array of shape (N, 3) of x, y, z in current coordinates.
+        :return: An array of shape (N, 3) of x, y, z in airsim coordinates.
+        """
+        if "ta_pos" in self._overridden:
+            return _each(self.ta_pos, vectors) - self.ta_pos(0, 0, 0)
+        return np.asarray(vectors) @ self._ta_pos_t
+
+    def fa_ori_batch(self, angles: np.ndarray) -> np.ndarray:
+        """
+        Translate orientations from airsim coordinate system to this one.
+        :param angles: An array of shape (N, 3) of roll, pitch, yaw in airsim coordinates, in degrees.
+        :return: An array of shape (N, 3) of roll, pitch, yaw in current coordinates.
+        """
+        if "fa_ori" in self._overridden:
+            return _each(self.fa_ori, angles)
+        return np.asarray(angles) @ self._fa_ori_t
+
+    def ta_ori_batch(self, angles: np.ndarray) -> np.ndarray:
+        """
+        Translate orientations from current coordinate system to airsim.
+        :param angles: An array of shape (N, 3) of roll, pitch, yaw in current coordinates, in degrees.
+        :return: An array of shape (N, 3) of roll, pitch, yaw in airsim coordinates.
+        """
+        if "ta_ori" in self._overridden:
+            return _each(self.ta_ori, angles)
+        return np.asarray(angles) @ self._ta_ori_t
+
+    def to(self, other: "CoordinateSystem") -> "CoordinateSystem":
+        """
+        The transform from this system to another, as a system whose fa_* methods take this system's coordinates.
+        Cached, so converting many batches between the same two systems composes the matrices once.
+        :param other: The target system.
+        :return: The transform.
+        """
+        if self._overridden or other._overridden:
+            raise NotImplementedError("to() needs systems defined by matrices, not by overridden methods.")
+        cached = self._to_cache.get(id(other))
+        if cached is None or cached[0] is not other:
+            pos_matrix = other.pos_matrix @ np.linalg.inv(self.pos_matrix)
+            transform = CoordinateSystem(pos_matrix, other.pos_offset - pos_matrix @ self.pos_offset,
+                                         other.ori_matrix @ np.linalg.inv(self.ori_matrix),
+                                         name="%s to %s" % (self.name, other.name))
+            cached = (other, transform)
+            self._to_cache[id(other)] = cached
+        return cached[1]
+
+    # Scalar
 
-    @abstractmethod
     def fa_pos(self, x, y, z) -> Tuple[float, float, float]:
         """
         Translate position from airsim coordinate system to this one.
@@ -20,9 +171,8 @@ class CoordinateSystem(ABC):
         :param z: z in airsim coordinates, in meters.
         :return: x, y, z tuple in current coordinates.
         """
-        pass
+        return _apply(self._fa_pos_rows, self._fa_pos_offset, x, y, z)
 
-    @abstractmethod
     def fa_ori(self, r, p, y) -> Tuple[float, float, float]:
         """
         Translate orientation from airsim coordinate system to this one.
@@ -31,9 +181,8 @@ class CoordinateSystem(ABC):
         :param y: yaw in airsim coordinates, in degrees.
         :return: roll, pitch, yaw tuple in current coordinates.
         """
-        pass
+        return _apply(self._fa_ori_rows, _ZERO, r, p, y)
 
-    @abstractmethod
     def ta_pos(self, x, y, z) -> Tuple[float, float, float]:
         """
         Translate position from current coordinate system to airsim.
@@ -42,9 +191,8 @@ class CoordinateSystem(ABC):
         :param z: z in current coordinates, in meters.
         :return: x, y, z tuple in airsim coordinates.
         """
-        pass
+        return _apply(self._ta_pos_rows, self._ta_pos_offset, x, y, z)
 
-    @abstractmethod
     def ta_ori(self, r, p, y) -> Tuple[float, float, float]:
         """
         Translate orientation from current coordinate system to airsim.
@@ -53,21 +201,63 @@ class CoordinateSystem(ABC):
         :param y: yaw in current coordinates, in degrees.
         :return: roll, pitch, yaw tuple in airsim coordinates.
         """
-        pass
+        return _apply(self._ta_ori_rows, _ZERO, r, p, y)
+
+    def fa_dir(self, x, y, z) -> Tuple[float, float, float]:
+        """
+        Translate a direction (e.g. a velocity) from airsim coordinate system to this one.
+        :return: x, y, z tuple in current coordinates.
+        """
+        if "fa_pos" in self._overridden:
+            return _difference(self.fa_pos, x, y, z)
+        return _apply(self._fa_pos_rows, _ZERO, x, y, z)
+
+    def ta_dir(self, x, y, z) -> Tuple[float, float, float]:
+        """
+        Translate a direction (e.g. a relative move) from current coordinate system to airsim.
+        :return: x, y, z tuple in airsim coordinates.
+        """
+        if "ta_pos" in self._overridden:
+            return _difference(self.ta_pos, x, y, z)
+        return _apply(self._ta_pos_rows, _ZERO, x, y, z)
+
+
+_ZERO = (0.0, 0.0, 0.0)
+
+
+def _rows(matrix: np.ndarray) -> _Rows:
+    (a, b, c), (d, e, f), (g, h, i) = matrix.tolist()
+    return (a, b, c), (d, e, f), (g, h, i)
+
+
+def _apply(rows: _Rows, offset: Tuple[float, float, float], a, b, c) -> Tuple[float, float, float]:
+    """
+    :return: rows @ (a, b, c) + offset, without numpy.
+    """
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = rows
+    return (m00 * a + m01 * b + m02 * c + offset[0],
+            m10 * a + m11 * b + m12 * c + offset[1],
+            m20 * a + m21 * b + m22 * c + offset[2])
+
+
+def _each(method: Callable, rows: np.ndarray) -> np.ndarray:
+    """
+    :return: The results of a scalar method for every row of an array of shape (N, 3), as an array of shape (N, 3).
+    """
+    return np.array([method(a, b, c) for a, b, c in np.asarray(rows).tolist()], dtype=float).reshape(-1, 3)
+
+
+def _difference(method: Callable, a, b, c) -> Tuple[float, float, float]:
+    """
+    :return: method(a, b, c) - method(0, 0, 0): the direction, of a position transform.
+    """
+    x, y, z = method(a, b, c)
+    x0, y0, z0 = method(0, 0, 0)
+    return x - x0, y - y0, z - z0
 
 
 # airsim coordinate system (see: "Coordinate System.md").
-AIRSIM = type("AIRSIM_COORDINATE_SYSTEM_TYPE", (CoordinateSystem, object),
-              {"fa_pos": lambda s, x, y, z: (x, y, z),
-               "fa_ori": lambda s, r, p, y: (r, p, y),
-               "ta_pos": lambda s, x, y, z: (x, y, z),
-               "ta_ori": lambda s, r, p, y: (r, p, y),
-               '__doc__': "Airsim coordinate system (see: 'Coordinate System.md')."})()
+AIRSIM = CoordinateSystem(name="AIRSIM")
 
 # dji coordinate system (see: "Coordinate System.md").
-DJI = type("DJI_COORDINATE_SYSTEM_TYPE", (CoordinateSystem, object),
-           {"fa_pos": lambda s, x, y, z: (x, y, z),
-            "fa_ori": lambda s, r, p, y: (r, -p, -y),
-            "ta_pos": lambda s, x, y, z: (x, y, z),
-            "ta_ori": lambda s, r, p, y: (r, -p, -y),
-            '__doc__': "DJI coordinate system (see: 'Coordinate System.md')."})()
+DJI = CoordinateSystem(ori_matrix=np.diag([1, -1, -1]), name="DJI")
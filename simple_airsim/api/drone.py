@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence
 
 import numpy as np
 
 from . import camera_config
+from .command_handle import CommandHandle
+from .snapshot import Snapshot
 
 
 class Drone(ABC):
@@ -17,31 +19,34 @@ class Drone(ABC):
         pass
 
     @abstractmethod
-    def takeoff(self, wait) -> None:
+    def takeoff(self, wait=False) -> CommandHandle:
         """
         Takeoff.
         :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
         """
         pass
 
     @abstractmethod
-    def hover(self, wait) -> None:
+    def hover(self, wait=False) -> CommandHandle:
         """
         Hover.
         :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
         """
         pass
 
     @abstractmethod
-    def land(self, wait) -> None:
+    def land(self, wait=False) -> CommandHandle:
         """
         Land.
         :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
         """
         pass
 
     @abstractmethod
-    def move_by(self, x, y, z, wait) -> None:
+    def move_by(self, x, y, z, wait=False) -> CommandHandle:
         """
         Move a specific amount of meters in every axis.
         Note: directions are defined by the coordinate system.
@@ -49,11 +54,12 @@ class Drone(ABC):
         :param y: The number of meters to move in parallel to the y axis.
         :param z: The number of meters to move in parallel to the z axis.
         :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
         """
         pass
 
     @abstractmethod
-    def turn_by(self, roll, pitch, yaw, wait) -> None:
+    def turn_by(self, roll, pitch, yaw, wait=False) -> CommandHandle:
         """
         Turn a specific amount of degrees in every axis.
         Note: directions are defined by the coordinate system.
@@ -61,11 +67,39 @@ class Drone(ABC):
         :param pitch: The number of degrees to rotate the pitch (rotate around the y axis).
         :param yaw: The number of degrees to rotate the yaw (rotate around the z axis).
         :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
         """
         pass
 
     @abstractmethod
-    def command(self, roll, pitch, yaw_rate, z, wait=False, duration=0.1) -> None:
+    def move_by_velocity(self, x, y, z, duration=1, body_frame=True, wait=False) -> CommandHandle:
+        """
+        Fly at a specific velocity, without reading the pose first.
+        Note: directions are defined by the coordinate system.
+        :param x: The velocity in parallel to the x axis, in meters per second.
+        :param y: The velocity in parallel to the y axis, in meters per second.
+        :param z: The velocity in parallel to the z axis, in meters per second.
+        :param duration: Time (in seconds) to execute this call.
+        :param body_frame: True for axes that turn with the drone, False for the world's.
+        :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
+        """
+        pass
+
+    @abstractmethod
+    def turn_at_rate(self, yaw_rate, duration=1, wait=False) -> CommandHandle:
+        """
+        Turn at a specific speed in yaw, without reading the pose first.
+        Note: directions are defined by the coordinate system.
+        :param yaw_rate: The yaw speed in degrees per second.
+        :param duration: Time (in seconds) to execute this call.
+        :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
+        """
+        pass
+
+    @abstractmethod
+    def command(self, roll, pitch, yaw_rate, z, wait=False, duration=0.1) -> CommandHandle:
         """
         Target a specific roll, pitch, and z, with a specific speed in yaw.
         Note: directions are defined by the coordinate system.
@@ -76,6 +110,7 @@ class Drone(ABC):
         :param wait: Should we wait for the command to finish, or return immediately?
         :param duration: Time (in seconds) to execute this call.
          This will be overridden if a different api function is called during this time.
+        :return: The handle of the command.
         """
         pass
 
@@ -116,6 +151,15 @@ class Drone(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_snapshot(self, with_lidars: bool = False) -> Snapshot:
+        """
+        Get the position, orientation, velocity, timestamp and collision state using a single call to the simulator.
+        :param with_lidars: Should the lidars be read as well (in the same round trip)?
+        :return: A Snapshot of the drone's state.
+        """
+        pass
+
     @abstractmethod
     def get_lidars(self) -> Dict[str, Optional[float]]:
         """
@@ -134,3 +178,12 @@ class Drone(ABC):
         :return: A numpy array of the image (in the shape (x, y, color)).
         """
         pass
+
+    @abstractmethod
+    def get_images(self, requests: Sequence[camera_config.ImageRequest]) -> List[np.ndarray]:
+        """
+        Get several images from the drone at once.
+        :param requests: The camera, type and return format of each image.
+        :return: A numpy array of each image, in the order of the requests.
+        """
+        pass
@@ -0,0 +1,219 @@
+import json
+import math
+import os
+from typing import Callable, Any, Dict, Iterable, List, Optional, Union
+
+from .._utils import get_state
+from . import coordinate_system
+from .connection_pool import ConnectionPool
+from .manager import TERMINATE_TIMEOUT, Manager
+from .snapshot import Snapshot
+
+# The settings file that airsim reads by default.
+DEFAULT_SETTINGS_PATH = os.path.join(os.path.expanduser("~"), "Documents", "AirSim", "settings.json")
+# The number of vehicles that share a connection pool when the number of connections isn't given.
+VEHICLES_PER_CONNECTION = 8
+
+
+def read_vehicle_names(settings_path: Optional[str] = None) -> List[str]:
+    """
+
+    :param settings_path: The path of airsim's settings.json. Leave 'None' for the default path.
+    :return: The names of the vehicles in the settings, in order.
+    """
+    if settings_path is None:
+        settings_path = DEFAULT_SETTINGS_PATH
+
+    with open(settings_path) as f:
+        settings = json.load(f)
+    return list(settings.get("Vehicles", {}).keys())
+
+
+class FleetManager:
+    """
+    Manages several vehicles in the same simulation, with an algorithm (and a Manager) for each.
+    The vehicles share a few connections to the simulator, and their state can be read in one batch.
+    """
+    managers: Dict[str, Manager]
+    pools: List[ConnectionPool]
+
+    def __init__(self, system: coordinate_system.CoordinateSystem, vehicle_names: Optional[Iterable[str]] = None,
+                 settings_path: Optional[str] = None,
+                 method: Union[None, Callable[..., Any], Dict[str, Callable[..., Any]]] = None,
+                 default_args: Optional[Iterable] = None, lidar_names: Optional[Dict[str, str]] = None,
+                 lidar_reductions: Optional[Dict[str, Any]] = None, connections: Optional[int] = None,
+                 ip: str = "", port: int = 41451):
+        """
+
+        :param system: The coordinate system to use for all the vehicles.
+        :param vehicle_names: The names of the vehicles in airsim. Leave 'None' for all the vehicles in settings.json.
+        :param settings_path: The path of airsim's settings.json. Leave 'None' for the default path.
+        :param method: The algorithm of every vehicle, or a dictionary of the algorithm of each vehicle by its name.
+         Each algorithm receives its own drone, like in Manager.
+        :param default_args:
+        :param lidar_names:
+        :param lidar_reductions: How to reduce the point cloud of each lidar (see SimDrone).
+        :param connections: The number of connection pools (see ConnectionPool), shared evenly between the vehicles.
+         Leave 'None' for one pool per VEHICLES_PER_CONNECTION vehicles.
+        :param ip: The ip of the simulator. Leave empty for localhost.
+        :param port: The port of the simulator.
+        """
+        if vehicle_names is None:
+            vehicle_names = read_vehicle_names(settings_path)
+        self.vehicle_names = list(vehicle_names)
+
+        if connections is None:
+            connections = math.ceil(len(self.vehicle_names) / VEHICLES_PER_CONNECTION)
+        connections = max(1, min(connections, len(self.vehicle_names)))
+
+        self.pools = [ConnectionPool(ip, port) for _ in range(connections)]
+
+        # The vehicles of each pool, in the order of self.pools.
+        self._vehicles_of = [self.vehicle_names[i::connections] for i in range(connections)]
+
+        self.managers = {}
+        for i, names in enumerate(self._vehicles_of):
+            for name in names:
+                vehicle_method = method.get(name) if isinstance(method, dict) else method
+                self.managers[name] = Manager(system, lidar_names, None, vehicle_method, default_args,
+                                              lidar_reductions, vehicle_name=name, pool=self.pools[i])
+
+    def __getitem__(self, vehicle_name: str) -> Manager:
+        """
+
+        :param vehicle_name: The name of the vehicle in airsim.
+        :return: The Manager of the vehicle (e.g. to pass to GUIManager).
+        """
+        return self.managers[vehicle_name]
+
+    def _selected(self, vehicle_names: Optional[Iterable[str]]) -> List[Manager]:
+        if vehicle_names is None:
+            vehicle_names = self.vehicle_names
+        return [self.managers[name] for name in vehicle_names]
+
+    def start_algo(self, vehicle_names: Optional[Iterable[str]] = None, new_args: Optional[Iterable] = None):
+        """
+
+        :param vehicle_names: The vehicles to start. Leave 'None' for all.
+        :param new_args:
+        :return:
+        """
+        for manager in self._selected(vehicle_names):
+            manager.start_algo(new_args)
+
+    def pause_algo(self, vehicle_names: Optional[Iterable[str]] = None):
+        """
+
+        :param vehicle_names: The vehicles to pause. Leave 'None' for all.
+        :return:
+        """
+        for manager in self._selected(vehicle_names):
+            manager.pause_algo()
+
+    def resume_algo(self, vehicle_names: Optional[Iterable[str]] = None):
+        """
+
+        :param vehicle_names: The vehicles to resume. Leave 'None' for all.
+        :return:
+        """
+        for manager in self._selected(vehicle_names):
+            manager.resume_algo()
+
+    def terminate_algo(self, vehicle_names: Optional[Iterable[str]] = None,
+                       timeout: Optional[float] = TERMINATE_TIMEOUT) -> bool:
+        """
+        Stop the algorithms (see Manager.terminate_algo).
+        :param vehicle_names: The vehicles to terminate. Leave 'None' for all.
+        :param timeout: The longest time to wait for each algorithm to stop, in seconds. Leave 'None' to wait until
+         they stop.
+        :return: True if all of them stopped.
+        """
+        managers = self._selected(vehicle_names)
+        # Signal all of them first, so they stop together instead of one after the other.
+        for manager in managers:
+            # noinspection PyProtectedMember
+            manager._signal_terminate()
+        # noinspection PyProtectedMember
+        return all([manager._join_algo(timeout) for manager in managers])
+
+    # Getters
+
+    def get_algo_states(self) -> Dict[str, str]:
+        """
+
+        :return: A dictionary of the state of each vehicle's algorithm (see Manager.get_algo_state) by its name.
+        """
+        return {name: manager.get_algo_state() for name, manager in self.managers.items()}
+
+    def get_snapshots(self, with_lidars: bool = False) -> Dict[str, Snapshot]:
+        """
+        Read the state of the whole fleet. The requests of all the vehicles are sent on all the connections
+        before waiting for any response, so the cost is about one round trip instead of one per vehicle.
+        :param with_lidars: Should the lidars be read as well?
+        :return: A dictionary of the Snapshot of each vehicle by its name.
+        """
+        lanes = [pool.telemetry for pool in self.pools]
+        # Always taken in the same order, so two batches can't deadlock.
+        for lane in lanes:
+            lane.lock.acquire()
+        try:
+            requests = []
+            for lane, names in zip(lanes, self._vehicles_of):
+                for name in names:
+                    # noinspection PyProtectedMember
+                    drone = self.managers[name]._drone
+                    lidar_names = drone.lidar_names if with_lidars else None
+                    # noinspection PyProtectedMember
+                    requests.append((drone, get_state._request_snapshot(lane.client, name, lidar_names)))
+
+            snapshots = {}
+            for drone, futures in requests:
+                lidar_names = drone.lidar_names if with_lidars else None
+                # noinspection PyProtectedMember
+                state = get_state._gather_snapshot(futures, lidar_names, drone.lidar_reductions)
+                # noinspection PyProtectedMember
+                snapshots[drone.vehicle_name] = drone._convert_snapshot(state)
+        finally:
+            for lane in reversed(lanes):
+                lane.lock.release()
+
+        return snapshots
+
+    def get_positions(self) -> Dict[str, Dict[str, float]]:
+        """
+
+        :return: A dictionary of the position of each vehicle by its name (read in one batch, see get_snapshots).
+        """
+        return {name: snapshot.position for name, snapshot in self.get_snapshots().items()}
+
+    def get_orientations(self) -> Dict[str, Dict[str, float]]:
+        """
+
+        :return: A dictionary of the orientation of each vehicle by its name (read in one batch, see get_snapshots).
+        """
+        return {name: snapshot.orientation for name, snapshot in self.get_snapshots().items()}
+
+    def enable_api_control(self, is_enabled: bool):
+        """
+        Switch all the vehicles between control through the api (the algorithms) and manual control.
+        :param is_enabled: True for the api, False for manual.
+        """
+        for manager in self.managers.values():
+            manager.enable_api_control(is_enabled)
+
+    def __enter__(self):
+        """
+
+        :return:
+        """
+        return self
+
+    def __exit__(self, *args):
+        """
+
+        :param args:
+        :return:
+        """
+        self.terminate_algo()
+        for manager in self.managers.values():
+            manager.__exit__(*args)
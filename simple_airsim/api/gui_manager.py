@@ -46,6 +46,7 @@ class GUIManager:
                 sg.Radio("Algorithm Mode", "-MODE-", key='-ALGO_MODE-', enable_events=True, default=True),
                 sg.Radio("Manual Mode", "-MODE-", key='-MANUAL_MODE-', enable_events=True, default=False)
             ],
+            [sg.Text(size=((label_x + value_x) * 3, 1), key='-TICK_STATS-')],
 
             [sg.Text('Information:', font=title_font)],
             [sg.Text(size=(label_x, y), key='-TEL-'), sg.Text(size=(value_x, y), key='-TEL_VAL-'),
@@ -138,6 +139,25 @@ class GUIManager:
         return (((self.format_str % x) if x is not None else 'None') for x in a)
         # return (F"{None if x is None else round(x, self.data_precision)}" for x in a)
 
+    @staticmethod
+    def _format_tick_stats(stats) -> str:
+        """
+
+        :param stats: The result of Manager.get_tick_stats.
+        :return: A single line of the rate and timing of the ticks, or an empty string if there are no ticks.
+        """
+        if not stats:
+            return ""
+        if "sim_wall_ratio" in stats:
+            return "Steps: %d    Sim / wall time: %.2fx    Tick: %.1f ms" % (
+                stats['steps'], stats['sim_wall_ratio'], stats['tick_time'] / max(1, stats['steps']) * 1000)
+
+        jitter = stats['jitter']
+        return ("Tick rate: %.1f / %.1f Hz    Jitter p50 / p95 / p99: %.1f / %.1f / %.1f ms    "
+                "Overruns: %d (skipped %d)") % (
+            stats['rate'], stats['target_rate'], jitter['p50'] * 1000, jitter['p95'] * 1000, jitter['p99'] * 1000,
+            stats['overruns'], stats['skipped'])
+
     # noinspection PyTypeChecker
     def _event_loop(self):
         while self.run:
@@ -150,7 +170,10 @@ class GUIManager:
                 break
 
             if event == '-ALGO_START-':
-                self.manager.start_algo()
+                try:
+                    self.manager.start_algo()
+                except RuntimeError:
+                    pass  # Still stopping: the state shows it, and Start works again once it stopped.
             if event == '-ALGO_PAUSE-':
                 self.manager.pause_algo()
             if event == '-ALGO_RESUME-':
@@ -159,12 +182,12 @@ class GUIManager:
                 self.manager.terminate_algo()
 
             if event == '-ALGO_MODE-':
-                self.manager.get_airsim_client().enableApiControl(True)
+                self.manager.enable_api_control(True)
                 if self.manual_algo_running:
                     self.manager.resume_algo()
 
             if event == '-MANUAL_MODE-':
-                self.manager.get_airsim_client().enableApiControl(False)
+                self.manager.enable_api_control(False)
                 self.manual_algo_running = self.manager.get_algo_state() == 'running'
                 if self.manual_algo_running:
                     self.manager.pause_algo()
@@ -182,6 +205,8 @@ class GUIManager:
 
             self.main_window['-ALGO_STATE-'].update("State: " + self.manager.get_algo_state())
 
+            self.main_window['-TICK_STATS-'].update(self._format_tick_stats(self.manager.get_tick_stats()))
+
             self.main_window['-ALGO_INFO-'].update(self.algo_info)
 
         # self._update_thread.join()
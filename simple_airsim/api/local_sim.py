@@ -0,0 +1,694 @@
+import argparse
+import json
+import math
+import threading
+import time
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import cv2
+import msgpack
+import msgpackrpc
+import numpy as np
+from msgpackrpc.server import AsyncResult
+from msgpackrpc.transport import tcp
+from tornado import ioloop
+
+from .._utils import depth
+from .._utils.kinematics import MultirotorModel
+from .world import World
+
+# The fixed time of a physics step, and how often the clock catches up with real time while running.
+PHYSICS_DT = 0.01  # seconds
+SYNC_INTERVAL = 0.005  # seconds
+
+# The depth of a ray that hits nothing.
+MAX_DEPTH = 1000.0  # meters
+# The distance at which scene images fade to black.
+SCENE_DEPTH = 100.0  # meters
+SKY_COLOR = (235, 206, 135)  # BGR
+GROUND_COLOR = (60, 120, 80)  # BGR
+
+DEFAULT_IMAGE_SIZE = (256, 144)
+DEFAULT_FOV = 90.0  # degrees
+
+# airsim's image types.
+SCENE = 0
+DEPTH_PLANAR = 1
+DEPTH_PERSPECTIVE = 2
+DEPTH_VIS = 3
+
+# airsim's default cameras: their position (meters) and roll, pitch, yaw (degrees) on the vehicle.
+_CAMERAS = {"front_center": ((0.25, 0.0, 0.0), (0.0, 0.0, 0.0)),
+            "front_right": ((0.25, 0.1, 0.0), (0.0, 0.0, 0.0)),
+            "front_left": ((0.25, -0.1, 0.0), (0.0, 0.0, 0.0)),
+            "bottom_center": ((0.0, 0.0, 0.1), (0.0, -90.0, 0.0)),
+            "back_center": ((-0.25, 0.0, 0.0), (0.0, 0.0, 180.0))}
+_CAMERA_IDS = {"0": "front_center", "1": "front_right", "2": "front_left", "3": "bottom_center", "4": "back_center"}
+
+# The lidars of the repository's settings.json, used when no settings are given.
+_DEFAULT_LIDARS = {name: {"SensorType": 6, "NumberOfChannels": 1, "Yaw": yaw, "Pitch": pitch, "Range": 21.4}
+                   for name, yaw, pitch in (("lidar_front", 0, 0), ("lidar_right", 90, 0), ("lidar_back", 180, 0),
+                                            ("lidar_left", 270, 0), ("lidar_down", 0, -90), ("lidar_up", 0, 90))}
+_LIDAR_SENSOR_TYPE = 6
+
+
+class LocalSim:
+    """
+    A stand-in for the AirSim simulator, for running algorithms, tests and benchmarks without Unreal.
+    It serves the subset of AirSim's RPC API that simple_airsim uses, on the same port, so SimDrone, Manager and
+    airsim.MultirotorClient work against it unchanged. Every vehicle is a kinematic model (see MultirotorModel) over
+    a flat ground. Its lidars and depth cameras measure the ground and the obstacles of a World, and its scene images
+    show them over the sky.
+    The clock runs at clock_speed times real time, and simContinueForTime steps a paused simulator right away,
+    as fast as the model can step.
+    """
+    _vehicles: Dict[str, "_Vehicle"]
+
+    def __init__(self, ip: str = "127.0.0.1", port: int = 41451, settings: Union[str, Dict[str, Any], None] = None,
+                 clock_speed: float = 1.0, physics_dt: float = PHYSICS_DT,
+                 image_size: Tuple[int, int] = DEFAULT_IMAGE_SIZE, paused: bool = False,
+                 world: Union[str, World, None] = None):
+        """
+
+        :param ip: The address to listen on.
+        :param port: The port to listen on (41451 is AirSim's). 0 picks a free port (see port after start).
+        :param settings: The path of AirSim's settings.json, or its content, for the vehicles (with their "X", "Y",
+         "Z" and "Yaw") and their lidars. Leave 'None' for a single vehicle, "Drone1", with the lidars of the
+         repository's settings.json.
+        :param clock_speed: How fast the simulator's clock runs, in multiples of real time (like AirSim's ClockSpeed).
+        :param physics_dt: The time of a physics step, in seconds.
+        :param image_size: The width and height of the camera images, in pixels.
+        :param paused: Should the simulator start paused?
+        :param world: The obstacles that the lidars and the cameras see, besides the ground:
+         a World, or the path of its file. Leave 'None' for the ground alone.
+        """
+        self.ip = ip
+        self.port = port
+        self.clock_speed = clock_speed
+        self.physics_dt = physics_dt
+        self.image_size = image_size
+        self.world = World.load(world) if isinstance(world, str) else world
+
+        self._vehicles = _load_vehicles(settings)
+        self._default_vehicle = next(iter(self._vehicles))
+        self._sim_time = 0.0
+        self._time_debt = 0.0
+        self._paused = paused
+        self._wall_time = time.monotonic()
+
+        self._loop: Optional[msgpackrpc.Loop] = None
+        self._server: Optional[msgpackrpc.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def sim_time(self) -> float:
+        """
+        The simulator's time since it started, in seconds.
+        """
+        return self._sim_time
+
+    def start(self) -> "LocalSim":
+        """
+        Start serving, on a thread of its own.
+        :return: The simulator itself.
+        """
+        self._thread = threading.Thread(target=self._serve, name="LocalSim", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self):
+        """
+        Stop serving, and close the port.
+        """
+        if self._thread is None:
+            return
+        self._loop._ioloop.add_callback(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    def _serve(self):
+        try:
+            # The loop is made here, since it becomes the current loop of the thread that makes it.
+            self._loop = msgpackrpc.Loop(ioloop.IOLoop())
+            self._server = msgpackrpc.Server(_Dispatcher(self), loop=self._loop, builder=_BUILDER,
+                                             unpack_encoding="utf-8")
+            self._server.listen(msgpackrpc.Address(self.ip, self.port))
+            # noinspection PyProtectedMember
+            self.port = self._server._listeners[0].port
+            self._loop.attach_periodic_callback(self._sync, SYNC_INTERVAL * 1000)
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            return
+
+        self._wall_time = time.monotonic()
+        self._ready.set()
+        self._loop.start()
+
+        self._loop.dettach_periodic_callback()
+        self._server.close()
+        self._loop._ioloop.close(all_fds=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    # The clock. Everything below runs on the thread of the server.
+
+    def _sync(self):
+        """
+        Advance the simulator to the current time, if it is running.
+        """
+        now = time.monotonic()
+        if not self._paused:
+            self._advance((now - self._wall_time) * self.clock_speed)
+        self._wall_time = now
+
+    def _advance(self, seconds: float):
+        """
+        Advance the simulator by whole physics steps. The remainder is kept for the next time.
+        """
+        self._time_debt += seconds
+        steps = int(self._time_debt / self.physics_dt + 1e-9)
+        self._time_debt -= steps * self.physics_dt
+        for _ in range(steps):
+            self._sim_time += self.physics_dt
+            for vehicle in self._vehicles.values():
+                vehicle.model.step(self.physics_dt)
+                vehicle.check_task(self._sim_time)
+
+    def _pause(self, is_paused: bool):
+        self._sync()
+        self._paused = is_paused
+
+    def _continue_for_time(self, seconds: float):
+        self._sync()
+        self._advance(seconds)
+        self._paused = True
+
+    def _vehicle(self, vehicle_name: str) -> "_Vehicle":
+        vehicle = self._vehicles.get(vehicle_name or self._default_vehicle)
+        if vehicle is None:
+            raise ValueError("Vehicle %r not found." % vehicle_name)
+        return vehicle
+
+    def _command(self, vehicle_name: str, apply: Callable[[MultirotorModel], None], duration: Optional[float] = None,
+                 until_reached: bool = False) -> AsyncResult:
+        """
+        Start a command, which replaces the one in progress.
+        :param apply: Sets the mode of the model.
+        :param duration: The time the command runs for (or its timeout, with until_reached), in seconds.
+         Leave 'None' to finish right away (or only when reached).
+        :param until_reached: Does the command end when the model reaches its target?
+        :return: The result of the RPC: True when the command ends, False if it was replaced or cancelled.
+        """
+        self._sync()
+        vehicle = self._vehicle(vehicle_name)
+        vehicle.finish_task(False)
+        apply(vehicle.model)
+        vehicle.task = AsyncResult()
+        vehicle.task_end = None if duration is None else self._sim_time + duration
+        vehicle.until_reached = until_reached
+        result = vehicle.task
+        if duration is None and not until_reached:
+            vehicle.finish_task(True)
+        return result
+
+    # Sensors
+
+    def _cast(self, origins: np.ndarray, directions: np.ndarray, max_range: float = np.inf) -> np.ndarray:
+        """
+        Cast a batch of rays against the ground and the world.
+        :param origins: The start of every ray, an array of shape (N, 3) in airsim's coordinates.
+        :param directions: The unit direction of every ray, of shape (N, 3).
+        :param max_range: Hits farther than this are ignored.
+        :return: The distance along every ray to its hit, or inf where it hits nothing.
+        """
+        ground_z = next(iter(self._vehicles.values())).model.ground_z
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distances = (ground_z - origins[:, 2]) / directions[:, 2]
+        distances = np.where((directions[:, 2] > 0) & (distances >= 0) & (distances <= max_range), distances, np.inf)
+        if self.world is not None:
+            np.minimum(distances, self.world.cast(origins, directions, max_range), out=distances)
+        return distances
+
+    def _lidar_scan(self, vehicle: "_Vehicle") -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Cast the rays of all the lidars of a vehicle in a single batch. The scan is kept until the vehicle moves,
+        so the reads of all its lidars at a step share it.
+        :return: For every lidar, its position, its rotation matrix, and the distance along each of its rays.
+        """
+        model = vehicle.model
+        pose = (model.x, model.y, model.z, model.roll, model.pitch, model.yaw)
+        if vehicle.scan is not None and vehicle.scan[0] == pose:
+            return vehicle.scan[1]
+
+        position, rotation = vehicle.position(), vehicle.rotation()
+        sensors = {name: (position + rotation @ lidar.offset, rotation @ lidar.rotation)
+                   for name, lidar in vehicle.lidars.items()}
+        origins, directions = [], []
+        for name, (origin, sensor_rotation) in sensors.items():
+            rays = vehicle.lidars[name].rays
+            origins.append(np.broadcast_to(origin, rays.shape))
+            directions.append(rays @ sensor_rotation.T)
+
+        distances = []
+        if sensors:
+            max_range = max(lidar.range for lidar in vehicle.lidars.values())
+            distances = np.split(self._cast(np.concatenate(origins), np.concatenate(directions), max_range),
+                                 np.cumsum([len(d) for d in directions])[:-1])
+        scan = {name: sensor + (ranges,) for (name, sensor), ranges in zip(sensors.items(), distances)}
+        vehicle.scan = (pose, scan)
+        return scan
+
+    def _lidar_data(self, lidar_name: str, vehicle_name: str) -> Dict[str, Any]:
+        vehicle = self._vehicle(vehicle_name)
+        lidar = vehicle.lidars.get(lidar_name)
+        if lidar is None:
+            raise ValueError("Lidar %r not found on vehicle %r." % (lidar_name, vehicle.name))
+
+        origin, sensor_rotation, distances = self._lidar_scan(vehicle)[lidar_name]
+        hits = distances <= lidar.range
+        points = lidar.rays[hits] * distances[hits, None]
+        if not lidar.local_frame:
+            points = origin + points @ sensor_rotation.T
+        return {"point_cloud": points.astype(np.float32).ravel().tolist(),
+                "time_stamp": self._timestamp(),
+                "pose": _pose(origin, _quaternion(sensor_rotation))}
+
+    def _camera(self, camera_name: str, vehicle: "_Vehicle") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: The position and rotation matrix of a camera, in airsim's coordinates.
+        """
+        camera = _CAMERAS.get(_CAMERA_IDS.get(str(camera_name), str(camera_name)))
+        if camera is None:
+            raise ValueError("Camera %r not found." % camera_name)
+        offset, angles = camera
+        rotation = vehicle.rotation()
+        return vehicle.position() + rotation @ np.array(offset), rotation @ _rotation(*np.radians(angles))
+
+    def _images(self, requests: List[Tuple[str, int]], vehicle: "_Vehicle"
+                ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Render images, casting the rays of all their cameras in a single batch.
+        :param requests: The camera name and the image type of every image.
+        :return: For every request, the image (float32 depth, MAX_DEPTH where nothing is hit, or uint8 BGR),
+         and the camera's position and rotation.
+        """
+        width, height = self.image_size
+        rays = depth.ray_grid(width, height, DEFAULT_FOV, True)
+        cameras = {}
+        for camera_name, _ in requests:
+            if camera_name not in cameras:
+                cameras[camera_name] = self._camera(camera_name, vehicle)
+
+        origins = np.concatenate([np.broadcast_to(position, rays.shape) for position, _ in cameras.values()])
+        directions = np.concatenate([rays @ rotation.T for _, rotation in cameras.values()])
+        distances = np.minimum(self._cast(origins, directions, MAX_DEPTH), MAX_DEPTH)
+        depths = dict(zip(cameras, np.split(distances.reshape(-1, height, width), len(cameras))))
+
+        images = []
+        for camera_name, image_type in requests:
+            image = depths[camera_name][0]
+            if image_type == DEPTH_PLANAR:  # The distance along the camera's axis.
+                image = image * rays[:, 0].reshape(height, width)
+            images.append((_render(image.astype(np.float32), image_type),) + cameras[camera_name])
+        return images
+
+    def _timestamp(self) -> int:
+        return int(self._sim_time * 1e9)
+
+
+class _Vehicle:
+    """
+    A vehicle of the simulator: its model, its lidars, and the command in progress.
+    """
+
+    def __init__(self, name: str, spawn: Tuple[float, float, float, float], lidars: Dict[str, "_Lidar"]):
+        """
+
+        :param name: The name of the vehicle.
+        :param spawn: The position (x, y, z) and yaw (radians) it starts from.
+        :param lidars: The lidars of the vehicle, by their names.
+        """
+        self.name = name
+        self.spawn = spawn
+        self.model = MultirotorModel(*spawn)
+        self.lidars = lidars
+        self.api_control = False
+        self.task: Optional[AsyncResult] = None
+        self.task_end: Optional[float] = None
+        self.until_reached = False
+        # The latest scan of the lidars, with the pose it was cast from (see LocalSim._lidar_scan).
+        self.scan: Optional[Tuple[tuple, Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]]] = None
+
+    def position(self) -> np.ndarray:
+        return np.array((self.model.x, self.model.y, self.model.z))
+
+    def rotation(self) -> np.ndarray:
+        return _rotation(self.model.roll, self.model.pitch, self.model.yaw)
+
+    def check_task(self, sim_time: float):
+        if self.task is None:
+            return
+        if self.until_reached and self.model.reached():
+            self.finish_task(True)
+        elif self.task_end is not None and sim_time >= self.task_end - 1e-9:
+            self.finish_task(not self.until_reached)  # A timeout of a command that should have reached a target.
+            self.model.hover()
+
+    def finish_task(self, result: bool):
+        """
+        :param result: The result of the command's RPC.
+        """
+        if self.task is None:
+            return
+        if self.until_reached and self.model.reached():
+            # Stay at the target (or on the ground, after landing).
+            self.model.hover()
+        task, self.task, self.task_end = self.task, None, None
+        task.set_result(result)
+
+
+class _Lidar:
+    """
+    A lidar of a vehicle, from its settings in settings.json.
+    """
+
+    def __init__(self, settings: Dict[str, Any]):
+        self.offset = np.array([settings.get("X", 0.0), settings.get("Y", 0.0), settings.get("Z", 0.0)])
+        self.rotation = _rotation(*np.radians([settings.get("Roll", 0.0), settings.get("Pitch", 0.0),
+                                               settings.get("Yaw", 0.0)]))
+        self.range = settings.get("Range", 100.0)
+        self.local_frame = settings.get("DataFrame", "SensorLocalFrame") == "SensorLocalFrame"
+
+        # The direction of every ray in the sensor's frame: the channels spread over the vertical field of view,
+        # and a scan's points over the horizontal one.
+        channels = max(1, settings.get("NumberOfChannels", 16))
+        upper, lower = settings.get("VerticalFOVUpper", 0.0), settings.get("VerticalFOVLower", 0.0)
+        start, end = settings.get("HorizontalFOVStart", 0.0), settings.get("HorizontalFOVEnd", 0.0)
+        elevations = np.radians(np.linspace(upper, lower, channels) if channels > 1 else [upper])
+        azimuths = np.radians([start])
+        if end != start:
+            points = settings.get("PointsPerSecond", 100000) / max(1, settings.get("RotationsPerSecond", 10))
+            azimuths = np.radians(np.linspace(start, end, max(1, int(points / channels)), endpoint=False))
+
+        elevation, azimuth = np.meshgrid(elevations, azimuths, indexing="ij")
+        self.rays = np.stack((np.cos(elevation) * np.cos(azimuth), np.cos(elevation) * np.sin(azimuth),
+                              -np.sin(elevation)), axis=-1).reshape(-1, 3)
+
+
+class _Dispatcher:
+    """
+    The RPC methods, by their names in AirSim. They run on the thread of the server.
+    """
+
+    def __init__(self, sim: LocalSim):
+        self.sim = sim
+
+    # Connection
+
+    def ping(self):
+        return True
+
+    def getServerVersion(self):
+        return 1
+
+    def getMinRequiredClientVersion(self):
+        return 1
+
+    def enableApiControl(self, is_enabled: bool, vehicle_name: str = ""):
+        self.sim._vehicle(vehicle_name).api_control = is_enabled
+
+    def isApiControlEnabled(self, vehicle_name: str = ""):
+        return self.sim._vehicle(vehicle_name).api_control
+
+    def armDisarm(self, arm: bool, vehicle_name: str = ""):
+        return True
+
+    def reset(self):
+        for vehicle in self.sim._vehicles.values():
+            vehicle.finish_task(False)
+            vehicle.model = MultirotorModel(*vehicle.spawn)
+
+    # Clock
+
+    def simPause(self, is_paused: bool):
+        self.sim._pause(is_paused)
+
+    def simIsPaused(self):
+        return self.sim._paused
+
+    def simContinueForTime(self, seconds: float):
+        self.sim._continue_for_time(seconds)
+
+    # State
+
+    def simGetVehiclePose(self, vehicle_name: str = ""):
+        self.sim._sync()
+        model = self.sim._vehicle(vehicle_name).model
+        return _pose((model.x, model.y, model.z), model.orientation())
+
+    def simSetVehiclePose(self, pose: Dict[str, Any], ignore_collision: bool, vehicle_name: str = ""):
+        self.sim._sync()
+        position, orientation = pose["position"], pose["orientation"]
+        w, x, y, z = (orientation[k] for k in ("w_val", "x_val", "y_val", "z_val"))
+        self.sim._vehicle(vehicle_name).model.set_pose(position["x_val"], position["y_val"], position["z_val"],
+                                                       math.atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z)))
+
+    def getMultirotorState(self, vehicle_name: str = ""):
+        self.sim._sync()
+        model = self.sim._vehicle(vehicle_name).model
+        position = _vector(model.x, model.y, model.z)
+        return {"collision": {"has_collided": model.has_collided, "normal": _vector(), "impact_point": _vector(),
+                              "position": position, "penetration_depth": 0.0, "time_stamp": 0, "object_name": "",
+                              "object_id": -1},
+                "kinematics_estimated": {"position": position,
+                                         "orientation": _quaternion_dict(model.orientation()),
+                                         "linear_velocity": _vector(model.vx, model.vy, model.vz),
+                                         "angular_velocity": _vector(0.0, 0.0, model.yaw_rate),
+                                         "linear_acceleration": _vector(model.ax, model.ay, model.az),
+                                         "angular_acceleration": _vector()},
+                "gps_location": {"latitude": 0.0, "longitude": 0.0, "altitude": -model.z},
+                "timestamp": self.sim._timestamp(),
+                "landed_state": 0 if model.landed else 1,
+                "rc_data": {"timestamp": 0, "is_initialized": False, "is_valid": False},
+                "ready": True, "ready_message": "", "can_arm": True}
+
+    def getLidarData(self, lidar_name: str, vehicle_name: str = ""):
+        self.sim._sync()
+        return self.sim._lidar_data(lidar_name, vehicle_name)
+
+    # Images
+
+    def simGetCameraInfo(self, camera_name: str, vehicle_name: str = ""):
+        self.sim._sync()
+        position, rotation = self.sim._camera(camera_name, self.sim._vehicle(vehicle_name))
+        return {"pose": _pose(position, _quaternion(rotation)), "fov": DEFAULT_FOV, "proj_mat": {"matrix": []}}
+
+    def simGetImage(self, camera_name: str, image_type: int, vehicle_name: str = ""):
+        self.sim._sync()
+        (image, _, _), = self.sim._images([(str(camera_name), image_type)], self.sim._vehicle(vehicle_name))
+        return cv2.imencode(".png", _to_bgr(image))[1].tobytes()
+
+    def simGetImages(self, requests: List[Dict[str, Any]], vehicle_name: str = ""):
+        self.sim._sync()
+        images = self.sim._images([(str(request["camera_name"]), request["image_type"]) for request in requests],
+                                  self.sim._vehicle(vehicle_name))
+        return [self._image_response(request, *image) for request, image in zip(requests, images)]
+
+    def _image_response(self, request: Dict[str, Any], image: np.ndarray, position: np.ndarray,
+                        rotation: np.ndarray) -> Dict[str, Any]:
+        image_type = request["image_type"]
+        as_float = request.get("pixels_as_float", False)
+        data_uint8, data_float = b"", []
+        if as_float:
+            if image.dtype != np.float32:
+                image = image[..., 0].astype(np.float32)
+            data_float = image.ravel().tolist()
+        else:
+            image = _to_bgr(image)
+            data_uint8 = cv2.imencode(".png", image)[1].tobytes() if request.get("compress", True) else image.tobytes()
+        return {"image_data_uint8": data_uint8, "image_data_float": data_float,
+                "camera_position": _vector(*position), "camera_orientation": _quaternion_dict(_quaternion(rotation)),
+                "time_stamp": self.sim._timestamp(), "message": "", "pixels_as_float": as_float,
+                "compress": request.get("compress", True), "width": image.shape[1], "height": image.shape[0],
+                "image_type": image_type}
+
+    # Commands
+
+    def takeoff(self, timeout_sec: float = 20, vehicle_name: str = ""):
+        return self.sim._command(vehicle_name, MultirotorModel.takeoff, timeout_sec, until_reached=True)
+
+    def land(self, timeout_sec: float = 60, vehicle_name: str = ""):
+        return self.sim._command(vehicle_name, MultirotorModel.land, timeout_sec, until_reached=True)
+
+    def hover(self, vehicle_name: str = ""):
+        return self.sim._command(vehicle_name, MultirotorModel.hover)
+
+    def cancelLastTask(self, vehicle_name: str = ""):
+        self.sim._sync()
+        vehicle = self.sim._vehicle(vehicle_name)
+        if vehicle.task is not None:
+            vehicle.finish_task(False)
+            vehicle.model.hover()
+
+    def moveToPosition(self, x, y, z, velocity, timeout_sec=3e38, drivetrain=0, yaw_mode=None, lookahead=-1,
+                       adaptive_lookahead=1, vehicle_name=""):
+        return self.sim._command(vehicle_name, lambda m: m.move_to_position(x, y, z, velocity, yaw_mode),
+                                 timeout_sec, until_reached=True)
+
+    def moveByVelocity(self, vx, vy, vz, duration, drivetrain=0, yaw_mode=None, vehicle_name=""):
+        return self.sim._command(vehicle_name, lambda m: m.move_by_velocity(vx, vy, vz, yaw_mode), duration)
+
+    def moveByVelocityBodyFrame(self, vx, vy, vz, duration, drivetrain=0, yaw_mode=None, vehicle_name=""):
+        return self.sim._command(vehicle_name, lambda m: m.move_by_velocity(vx, vy, vz, yaw_mode, body_frame=True),
+                                 duration)
+
+    def moveByVelocityZ(self, vx, vy, z, duration, drivetrain=0, yaw_mode=None, vehicle_name=""):
+        return self.sim._command(vehicle_name, lambda m: m.move_by_velocity_z(vx, vy, z, yaw_mode), duration)
+
+    def moveByRollPitchYawrateZ(self, roll, pitch, yaw_rate, z, duration, vehicle_name=""):
+        return self.sim._command(vehicle_name, lambda m: m.move_by_roll_pitch_yaw_rate_z(roll, pitch, yaw_rate, z),
+                                 duration)
+
+    def rotateByYawRate(self, yaw_rate, duration, vehicle_name=""):
+        return self.sim._command(vehicle_name, lambda m: m.rotate_by_yaw_rate(math.radians(yaw_rate)), duration)
+
+
+# The server's sockets pack bytes as msgpack's bin type (like AirSim, so images arrive as bytes),
+# floats as single floats (AirSim's are 32 bit), and send without Nagle's delay.
+
+class _ServerSocket(tcp.ServerSocket):
+    def __init__(self, stream, transport, encodings):
+        stream.set_nodelay(True)
+        super().__init__(stream, transport, encodings)
+        self._packer = msgpack.Packer(encoding=encodings[0], use_bin_type=True, use_single_float=True)
+
+
+class _MessagePackServer(tcp.MessagePackServer):
+    def handle_stream(self, stream, address):
+        _ServerSocket(stream, self._transport, self._encodings)
+
+
+class _ServerTransport(tcp.ServerTransport):
+    def listen(self, server):
+        self._server = server
+        self._mp_server = _MessagePackServer(self, io_loop=server._loop._ioloop, encodings=self._encodings)
+        self._mp_server.listen(self._address.port, self._address.host)
+        # noinspection PyProtectedMember
+        self.port = next(iter(self._mp_server._sockets.values())).getsockname()[1]
+
+
+_BUILDER = types.SimpleNamespace(ServerTransport=_ServerTransport)
+
+
+def _load_vehicles(settings: Union[str, Dict[str, Any], None]) -> Dict[str, _Vehicle]:
+    if isinstance(settings, str):
+        with open(settings) as f:
+            settings = json.load(f)
+    vehicles = (settings or {}).get("Vehicles") or {"Drone1": {"Sensors": _DEFAULT_LIDARS}}
+
+    ret = {}
+    for name, vehicle in vehicles.items():
+        spawn = (vehicle.get("X", 0.0), vehicle.get("Y", 0.0), vehicle.get("Z", 0.0),
+                 math.radians(vehicle.get("Yaw", 0.0)))
+        lidars = {sensor: _Lidar(sensor_settings) for sensor, sensor_settings in vehicle.get("Sensors", {}).items()
+                  if sensor_settings.get("SensorType") == _LIDAR_SENSOR_TYPE and sensor_settings.get("Enabled", True)}
+        ret[name] = _Vehicle(name, spawn, lidars)
+    return ret
+
+
+def _render(image: np.ndarray, image_type: int) -> np.ndarray:
+    """
+    :param image: A depth image (float32).
+    :param image_type: airsim's image type.
+    :return: The depth image itself for the float depth types, or a uint8 BGR image for the others.
+    """
+    if image_type in (DEPTH_PLANAR, DEPTH_PERSPECTIVE):
+        return image
+    if image_type == DEPTH_VIS:
+        return _to_bgr(image)
+
+    # A scene: the hits shaded by their distance, over the sky.
+    shade = np.clip(1 - image / SCENE_DEPTH, 0.2, 1)[..., None]
+    scene = np.where(image[..., None] < MAX_DEPTH, shade * np.array(GROUND_COLOR), np.array(SKY_COLOR))
+    return scene.astype(np.uint8)
+
+
+def _to_bgr(image: np.ndarray) -> np.ndarray:
+    """
+    :return: A uint8 BGR image as is, or a depth image in AirSim's DepthVis style (as compressed depth images are).
+    """
+    if image.dtype != np.float32:
+        return image
+    gray = (np.minimum(image / SCENE_DEPTH, 1) * 255).astype(np.uint8)
+    return np.dstack((gray, gray, gray))
+
+
+def _rotation(roll: float, pitch: float, yaw: float) -> np.ndarray:
+    """
+    :return: The matrix that rotates from the rotated frame to the original one (yaw, then pitch, then roll).
+    """
+    cr, sr = math.cos(roll), math.sin(roll)
+    cp, sp = math.cos(pitch), math.sin(pitch)
+    cy, sy = math.cos(yaw), math.sin(yaw)
+    return np.array([[cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+                     [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+                     [-sp, cp * sr, cp * cr]])
+
+
+def _quaternion(rotation: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    :return: The quaternion (w, x, y, z) of a rotation matrix.
+    """
+    w = math.sqrt(max(0.0, 1 + rotation[0, 0] + rotation[1, 1] + rotation[2, 2])) / 2
+    x = math.copysign(math.sqrt(max(0.0, 1 + rotation[0, 0] - rotation[1, 1] - rotation[2, 2])) / 2,
+                      rotation[2, 1] - rotation[1, 2])
+    y = math.copysign(math.sqrt(max(0.0, 1 - rotation[0, 0] + rotation[1, 1] - rotation[2, 2])) / 2,
+                      rotation[0, 2] - rotation[2, 0])
+    z = math.copysign(math.sqrt(max(0.0, 1 - rotation[0, 0] - rotation[1, 1] + rotation[2, 2])) / 2,
+                      rotation[1, 0] - rotation[0, 1])
+    return w, x, y, z
+
+
+def _vector(x: float = 0.0, y: float = 0.0, z: float = 0.0) -> Dict[str, float]:
+    return {"x_val": float(x), "y_val": float(y), "z_val": float(z)}
+
+
+def _quaternion_dict(q: Tuple[float, float, float, float]) -> Dict[str, float]:
+    return {"w_val": float(q[0]), "x_val": float(q[1]), "y_val": float(q[2]), "z_val": float(q[3])}
+
+
+def _pose(position, orientation: Tuple[float, float, float, float]) -> Dict[str, Any]:
+    return {"position": _vector(*position), "orientation": _quaternion_dict(orientation)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the AirSim simulator.")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=41451)
+    parser.add_argument("--settings", help="The path of AirSim's settings.json.")
+    parser.add_argument("--clock-speed", type=float, default=1.0)
+    parser.add_argument("--world", help="The path of a world file (see World).")
+    args = parser.parse_args()
+
+    with LocalSim(args.ip, args.port, args.settings, args.clock_speed, world=args.world) as sim:
+        print("Serving on %s:%d" % (sim.ip, sim.port))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
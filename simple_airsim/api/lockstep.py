@@ -0,0 +1,109 @@
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .sim_drone import SimDrone
+from .snapshot import Snapshot
+
+# A function that runs an algorithm for a single step. It may send commands, but must not wait for them.
+# Returning False stops the run.
+Tick = Callable[[SimDrone, Snapshot], Any]
+
+# The time between checks if the simulator finished advancing.
+POLL_INTERVAL = 0.0005  # seconds
+# The longest time to wait for the simulator to advance by one step, in multiples of real time.
+STEP_TIMEOUT_FACTOR = 100
+
+
+class Lockstep:
+    """
+    Runs a tick function in lockstep with the simulator. The simulator stays paused while the function runs
+    against a snapshot, and then advances by exactly dt (with simContinueForTime).
+    Every tick sees the simulator at a fixed step, no matter how long the function takes,
+    and the run goes as fast as the simulator can step, which can be faster than real time.
+    """
+
+    def __init__(self, drone: SimDrone, tick: Tick, dt: float, with_lidars: bool = True):
+        """
+
+        :param drone: The drone to pass to the tick function.
+        :param tick: The function to run every step, with the drone and a Snapshot of its state.
+        :param dt: The simulator time of a step, in seconds.
+        :param with_lidars: Should the snapshots include the lidars?
+        """
+        self.drone = drone
+        self.tick = tick
+        self.dt = dt
+        self.with_lidars = with_lidars
+
+        self.steps = 0
+        # The simulator's time and the real time of the first and the latest snapshots.
+        self._first: Optional[Tuple[float, float]] = None
+        self._last: Optional[Tuple[float, float]] = None
+        self._tick_time = 0.0
+
+    def step(self) -> bool:
+        """
+        Run the tick function once, and advance the simulator by dt. The simulator must be paused.
+        :return: False if the tick function asked to stop.
+        """
+        # noinspection PyProtectedMember
+        snapshot = self.drone._read_snapshot(self.with_lidars)
+        self._last = (snapshot.timestamp, time.monotonic())
+        if self._first is None:
+            self._first = self._last
+
+        tick_start = time.monotonic()
+        keep_running = self.tick(self.drone, snapshot) is not False
+        self._tick_time += time.monotonic() - tick_start
+
+        if keep_running:
+            self.drone.continue_for_time(self.dt)
+            self._wait_for_pause()
+            self.steps += 1
+        return keep_running
+
+    def _wait_for_pause(self):
+        deadline = time.monotonic() + max(1.0, self.dt * STEP_TIMEOUT_FACTOR)
+        while not self.drone.pause_sim_state():
+            if time.monotonic() > deadline:
+                raise TimeoutError("The simulator didn't pause again after advancing by %s seconds." % self.dt)
+            time.sleep(POLL_INTERVAL)
+
+    def run(self, steps: Optional[int] = None, before_step: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+        """
+        Pause the simulator and step it until the tick function returns False (or for a number of steps).
+        The simulator is resumed at the end, unless it was paused to begin with.
+        :param steps: The number of steps to run. Leave 'None' to run until the tick function returns False.
+        :param before_step: A function to call before every step (e.g. to handle a pause request).
+        :return: The stats of the run (see get_stats).
+        """
+        was_paused = self.drone.pause_sim_state()
+        self.drone.pause_sim()
+        try:
+            while steps is None or self.steps < steps:
+                if before_step is not None:
+                    before_step()
+                if not self.step():
+                    break
+        finally:
+            if not was_paused:
+                self.drone.resume_sim()
+        return self.get_stats()
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+
+        :return: A dictionary of 'steps', 'sim_time' and 'wall_time' (the simulator time and the real time between the
+         first and the latest snapshots, in seconds), 'sim_wall_ratio' (sim_time / wall_time, above 1 is faster than
+         real time), and 'tick_time' (the real time spent in the tick function, in seconds).
+        """
+        sim_time, wall_time = 0.0, 0.0
+        if self._first is not None:
+            sim_time = self._last[0] - self._first[0]
+            wall_time = self._last[1] - self._first[1]
+
+        return {"steps": self.steps,
+                "sim_time": sim_time,
+                "wall_time": wall_time,
+                "sim_wall_ratio": sim_time / wall_time if wall_time > 0 else 0.0,
+                "tick_time": self._tick_time}
@@ -1,9 +1,39 @@
+import os
+import queue
 import time
 from threading import Thread
-from typing import Callable, Dict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TextIO, Union
 
+from . import binary_log
 from .manager import Manager
+from .snapshot import Snapshot
 
+# The columns of the log by default: every value is computed from the same Snapshot, so a row costs a single read of
+# the state. "time" is the wall-clock time of the row, and "sim_time" the simulator's.
+DEFAULT_SNAPSHOT_VALUES = {
+    "time": lambda snap: time.time(),
+    "x": lambda snap: snap.position['x'],
+    "y": lambda snap: snap.position['y'],
+    "z": lambda snap: snap.position['z'],
+
+    "pitch": lambda snap: snap.orientation['pitch'],
+    "roll": lambda snap: snap.orientation['roll'],
+    "yaw": lambda snap: snap.orientation['yaw'],
+
+    "vx": lambda snap: snap.velocity['x'],
+    "vy": lambda snap: snap.velocity['y'],
+    "vz": lambda snap: snap.velocity['z'],
+
+    "up": lambda snap: snap.lidars['up'],
+    "front": lambda snap: snap.lidars['front'],
+    "back": lambda snap: snap.lidars['back'],
+    "right": lambda snap: snap.lidars['right'],
+    "left": lambda snap: snap.lidars['left'],
+
+    "sim_time": lambda snap: snap.timestamp,
+}
+
+# The same columns (without "sim_time") as functions of the Manager, for values. Each getter reads the simulator.
 DEFAULT_VALUES = {
     "time": lambda man: time.time(),
     "x": lambda man: man.get_position()['x'],
@@ -25,81 +55,249 @@ DEFAULT_VALUES = {
     "left": lambda man: man.get_lidars()['left'],
 }
 
+# Queued after the last row, to stop the writing thread.
+_STOP = object()
+
+
+class _CsvFile:
+    file: Optional[TextIO]
+
+    def __init__(self, filename: str, columns: Sequence[str]):
+        self.file = open(filename, "a")
+        if self.file.tell() == 0:  # An existing log (e.g. started again after stop_thread) has a header.
+            self.file.write(', '.join(columns) + '\n')
+            self.file.flush()
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]):
+        self.file.write(''.join(', '.join(str(x) for x in row) + '\n' for row in rows))
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+_FILE_FORMATS = {
+    "csv": (_CsvFile, ".csv"),
+    "binary": (binary_log.BinaryLogFile, ".salog"),
+}
+
 
 class LogWriter:
     man: Manager
+    file: Optional[Union[_CsvFile, binary_log.BinaryLogFile]]
+    read_thread: Optional[Thread]
+    write_thread: Optional[Thread]
 
-    def __init__(self, man: Manager, values: Dict[str, Callable[[Manager], str]] = None, filename: str = None,
-                 use_thread=True, t_delta_time=0.1):
+    error: Optional[BaseException]
+
+    def __init__(self, man: Manager, values: Dict[str, Callable[[Manager], Any]] = None, filename: str = None,
+                 use_thread=True, t_delta_time=0.1, queue_size: int = 1000, batch_size: int = 100,
+                 file_format: str = "csv", snapshot_values: Dict[str, Callable[[Snapshot], Any]] = None):
         """
 
         :param man: The Manager object to read the values from.
-        :param values:
-        :param filename:
-        :param use_thread:
-        :param t_delta_time:
+        :param values: Columns of the log, as a dictionary of the column name and a function from the Manager to the
+         value (e.g. DEFAULT_VALUES). Each function reads what it needs from the Manager.
+        :param filename: Leave 'None' for a timestamped file in 'logs/'.
+        :param use_thread: Should rows be read and written in the background every t_delta_time?
+         If False, call write() for every row.
+        :param t_delta_time: The time (in seconds) between rows when using a thread.
+        :param queue_size: The maximal number of rows waiting to be written. Rows that don't fit are dropped.
+        :param batch_size: The maximal number of rows written to the file at once.
+        :param file_format: "csv" for text, or "binary" for a binary log of float64 columns that can be loaded
+         without parsing (see binary_log.read).
+        :param snapshot_values: Columns of the log, as a dictionary of the column name and a function from a Snapshot
+         (which includes the lidars) to the value. All of them share a single read of the state per row, and they come
+         before the columns of values. If both are 'None', DEFAULT_SNAPSHOT_VALUES is used.
         """
-        self.filename = filename
+        self.file_type, extension = _FILE_FORMATS[file_format]
 
         if filename is None:
-            filename = 'logs/Logs ' + time.strftime("%d%m%Y-%H%M%S") + '.csv'
+            filename = 'logs/Logs ' + time.strftime("%d%m%Y-%H%M%S") + extension
 
+        self.filename = filename
         self.t_delta_time = t_delta_time
+        self.batch_size = batch_size
         self.run = True
         self.use_thread = use_thread
         self.man = man
         self.values = values
+        self.snapshot_values = snapshot_values
 
-        if values is None:
-            self.values = DEFAULT_VALUES
+        if values is None and snapshot_values is None:
+            self.snapshot_values = DEFAULT_SNAPSHOT_VALUES
+        if self.values is None:
+            self.values = {}
+        if self.snapshot_values is None:
+            self.snapshot_values = {}
+        self.columns = list(self.snapshot_values.keys()) + list(self.values.keys())
 
-        if use_thread:
-            self.write_thread = Thread()
+        self.rows = queue.Queue(maxsize=queue_size)
+        # Rows that were not logged because the queue was full.
+        self.dropped = 0
+        # Rows that were read later than t_delta_time after the previous one.
+        self.delayed = 0
+        self.written = 0
+        # The first error of the reading or the writing thread, raised by stop_thread.
+        self.error = None
+
+        # Created by start, since a thread can only be started once.
+        self.read_thread = None
+        self.write_thread = None
 
         self.file = None
 
-    def _print_first_line(self):
+    def _open(self):
         """
 
         :return:
         """
-        with open(self.filename, "a") as file:
-            file.write(', '.join(self.values.keys()))
-            file.flush()
-            file.close()
+        directory = os.path.dirname(self.filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.file = self.file_type(self.filename, self.columns)
+
+    def _read_row(self) -> List[Any]:
+        row = []
+        if self.snapshot_values:
+            snapshot = self.man.get_snapshot(with_lidars=True)
+            row = [x(snapshot) for x in self.snapshot_values.values()]
+        return row + [x(self.man) for x in self.values.values()]
 
     def write(self):
         """
+        Read a row and log it.
+        When using a thread, the row is queued and written in the background.
 
         :return:
         """
-        with open(self.filename, "a") as file:
-            val = []
+        if self.file is None:
+            self._open()
 
-            for x in self.values.values():
-                val.append(x(self.man))
+        row = self._read_row()
+        if self.use_thread:
+            try:
+                self.rows.put_nowait(row)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            self._write_rows([row])
 
-            file.write(', '.join(val))
+    def _write_rows(self, rows: List[List[Any]]):
+        self.file.write_rows(rows)
+        self.written += len(rows)
 
-            # file.write(', '.join((x(self.man) for x in self.values.values())))
+    def _read_loop(self):
+        """
+        Read a row every t_delta_time until stopped, or until a read fails (see stop_thread).
 
-            file.flush()
-            file.close()
+        :return:
+        """
+        next_time = time.monotonic()
+        try:
+            while self.run:
+                self.write()
+
+                next_time += self.t_delta_time
+                now = time.monotonic()
+                if next_time < now:
+                    self.delayed += 1
+                    next_time = now
+                time.sleep(next_time - now)
+        except BaseException as e:
+            self._fail(e)
 
     def _write_loop(self):
         """
+        Write the queued rows in batches, until the stop marker (see stop_thread).
 
         :return:
         """
-        while self.run:
-            self.write()
-            time.sleep(self.t_delta_time)
+        try:
+            stopped = False
+            while not stopped:
+                rows = [self.rows.get()]
+                while len(rows) < self.batch_size:
+                    try:
+                        rows.append(self.rows.get_nowait())
+                    except queue.Empty:
+                        break
+
+                if rows[-1] is _STOP:  # Nothing is queued after the marker.
+                    rows.pop()
+                    stopped = True
+                if rows:
+                    self._write_rows(rows)
+        except BaseException as e:
+            self._fail(e)
+
+    def _fail(self, error: BaseException):
+        if self.error is None:
+            self.error = error
+
+    def start(self):
+        """
+        Open the file and start the background threads (if using a thread).
+        After stop_thread, the log can be started again, and appends to the same file.
+
+        :return:
+        """
+        if self.read_thread is not None and self.read_thread.is_alive():
+            raise RuntimeError("The log is already running; call stop_thread first.")
+
+        if self.file is None:
+            self._open()
+
+        if self.use_thread:
+            self.run = True
+            self.read_thread = Thread(target=self._read_loop, daemon=True)
+            self.write_thread = Thread(target=self._write_loop, daemon=True)
+            self.read_thread.start()
+            self.write_thread.start()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+
+        :return: A dictionary of the number of rows 'written', 'queued', 'dropped' and 'delayed'.
+        """
+        return {'written': self.written, 'queued': self.rows.qsize(), 'dropped': self.dropped,
+                'delayed': self.delayed}
 
     def stop_thread(self):
+        """
+        Stop reading rows, write the queued ones and close the file.
+        Raises the first error of the background threads, if any (the rows before it are still written).
+
+        :return:
+        """
         self.run = False
+        if self.read_thread is not None:
+            # The reader can be in the middle of a row: wait for it, so the row is queued before the stop marker.
+            if self.read_thread.is_alive():
+                self.read_thread.join()
+            while self.write_thread.is_alive():
+                try:
+                    self.rows.put(_STOP, timeout=self.t_delta_time)
+                    break
+                except queue.Full:
+                    continue
+            if self.write_thread.is_alive():
+                self.write_thread.join()
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
 
     def __enter__(self):
+        self.start()
         return self
 
     def __exit__(self, *args):
-        self.run = False
+        self.stop_thread()
@@ -1,12 +1,29 @@
-import sys
+from types import MappingProxyType
 from typing import Callable, Any, Dict, Iterable, Optional
 
 import airsim
 
 from . import coordinate_system
+from .connection_pool import ConnectionPool
+from .lockstep import Lockstep, Tick
+from .recording import ReplayFinished
+from .tick_scheduler import OVERRUN_POLICIES, SKIP, TickScheduler
 from .sim_drone import SimDrone
+from .snapshot import Snapshot
+from .telemetry_sampler import TelemetrySampler
 
-from threading import Event, Thread
+from threading import Event, RLock, Thread
+
+# The longest time terminate_algo waits for the algorithm to stop, in seconds.
+TERMINATE_TIMEOUT = 1.0
+
+
+class AlgorithmTerminated(BaseException):
+    """
+    Raised in the algorithm's thread to stop it, at its next call to the drone or while it waits for a command.
+    It derives from BaseException, so 'except Exception' in an algorithm doesn't keep it running.
+    Use 'finally' for cleanup.
+    """
 
 
 class Manager:
@@ -16,21 +33,55 @@ class Manager:
         """
         _run_event: Event
         _term: bool
+        sampler: Optional[TelemetrySampler]
 
         def __init__(self, system: coordinate_system.CoordinateSystem, lidar_names: Dict[str, str] = None,
-                     client: airsim.MultirotorClient = None):
-            super().__init__(system, lidar_names, client)
+                     client: airsim.MultirotorClient = None, lidar_reductions: Dict[str, Any] = None,
+                     vehicle_name: str = "", lock: Optional[RLock] = None, pool: Optional[ConnectionPool] = None,
+                     pose_max_age: Optional[float] = None):
+            super().__init__(system, lidar_names, client, lidar_reductions, vehicle_name, lock, pool, pose_max_age)
             self._run_event: Event = Event()
             self._run_event.set()
             self._term = False
+            self.sampler = None
+
+        # When there is a sampler, the getters share its readings instead of calling the simulator.
+
+        def _get_position(self):
+            if self.sampler is None:
+                return super()._get_position()
+            return dict(self.sampler.get().position)
+
+        def _get_orientation(self):
+            if self.sampler is None:
+                return super()._get_orientation()
+            return dict(self.sampler.get().orientation)
+
+        def _get_velocity(self):
+            if self.sampler is None:
+                return super()._get_velocity()
+            return dict(self.sampler.get().velocity)
+
+        def _get_lidars(self):
+            if self.sampler is None:
+                return super()._get_lidars()
+            return dict(self.sampler.get().lidars)
+
+        def _get_snapshot(self, with_lidars: bool = False):
+            if self.sampler is None:
+                return super()._get_snapshot(with_lidars)
+            return self.sampler.get()
 
         def _pause_handler(self):
             super()._pause_handler()
             if self._term:
-                sys.exit()
+                raise AlgorithmTerminated()
             self._run_event.wait()
             if self._term:
-                sys.exit()
+                raise AlgorithmTerminated()
+
+        def _is_interrupted(self):
+            return self._term or not self._run_event.is_set()
 
         def pause(self):
             self._run_event.clear()
@@ -45,16 +96,25 @@ class Manager:
         def is_paused(self):
             return not self._run_event.is_set()
 
+        def is_terminating(self):
+            return self._term
+
         def _determinate(self):
             self._term = False
 
     _drone: _PauseDrone
     algo_thread: Optional[Thread]
     algo_started: bool
+    lockstep: Optional[Lockstep]
+    scheduler: Optional[TickScheduler]
 
     def __init__(self, system: coordinate_system.CoordinateSystem, lidar_names: Optional[Dict[str, str]] = None,
                  client: Optional[airsim.MultirotorClient] = None,
-                 method: Optional[Callable[..., Any]] = None, default_args: Optional[Iterable] = None):
+                 method: Optional[Callable[..., Any]] = None, default_args: Optional[Iterable] = None,
+                 lidar_reductions: Optional[Dict[str, Any]] = None, sample_rate: Optional[float] = None,
+                 vehicle_name: str = "", lock: Optional[RLock] = None, pool: Optional[ConnectionPool] = None,
+                 pose_max_age: Optional[float] = None, collect_stats: bool = False, tick: Optional[Tick] = None,
+                 lockstep_dt: Optional[float] = None, tick_rate: Optional[float] = None, overrun_policy: str = SKIP):
         """
 
         :param system:
@@ -62,18 +122,63 @@ class Manager:
         :param client:
         :param method:
         :param default_args:
+        :param lidar_reductions: How to reduce the point cloud of each lidar (see SimDrone).
+        :param sample_rate: If set, the state is read this many times per second by a single TelemetrySampler,
+         and the algorithm, the GUI and the logs all share its readings. Leave 'None' to read on every call.
+        :param vehicle_name: The name of the vehicle in airsim. Leave empty for the default vehicle.
+        :param lock: The lock of the client, when it is shared with other drones (see SimDrone).
+        :param pool: The connections to use when client is 'None' (see SimDrone). The sampler uses the telemetry lane.
+        :param pose_max_age: Relative commands start from a reading no older than this, in seconds (see SimDrone).
+         With a sampler, a max age above its period means move_by and turn_by never wait for a pose read.
+        :param collect_stats: Record the count, bytes and latency of every call to the simulator, and the waits for
+         the connections, for get_stats. Off by default, since it measures every call.
+        :param tick: Instead of method, an algorithm that runs a single step: tick(drone, snapshot).
+         start_algo then calls it every step, and stops when it returns False.
+        :param lockstep_dt: Run tick in lockstep with the simulator (see Lockstep): the simulator stays paused
+         during every tick, and then advances by this many seconds. tick must not wait for commands.
+        :param tick_rate: Run tick this many times per second, in real time (see TickScheduler).
+        :param overrun_policy: What to do when a tick takes longer than 1 / tick_rate: tick_scheduler.SKIP the missed
+         ticks, or tick_scheduler.CATCH_UP by running them right away.
         """
+        if tick is not None and (lockstep_dt is None) == (tick_rate is None):
+            raise ValueError("A tick needs either a lockstep_dt or a tick_rate.")
+        if overrun_policy not in OVERRUN_POLICIES:
+            raise ValueError("overrun_policy must be one of %s, not %r." % (OVERRUN_POLICIES, overrun_policy))
+
         self.default_args = default_args
         self.method = method
-        self._drone = self._PauseDrone(system, lidar_names, client)
+        self.tick = tick
+        self.lockstep_dt = lockstep_dt
+        self.tick_rate = tick_rate
+        self.overrun_policy = overrun_policy
+        self.lockstep = None
+        self.scheduler = None
+        self._drone = self._PauseDrone(system, lidar_names, client, lidar_reductions, vehicle_name, lock, pool,
+                                      pose_max_age)
         self.algo_started = False
         self.algo_thread = None
 
+        self.stats = None
+        if collect_stats:
+            self.stats = self._drone.pool.enable_stats()
+
+        self.sampler = None
+        if sample_rate is not None:
+            # noinspection PyProtectedMember
+            self.sampler = TelemetrySampler(lambda: _freeze(self._drone._read_snapshot(True)), sample_rate)
+            self._drone.sampler = self.sampler
+            self.sampler.start()
+
     def start_algo(self, new_args: Optional[Iterable] = None):
         """
-
+        Raises RuntimeError if the previous run was terminated but didn't stop yet (terminate_algo timed out):
+        the new run would otherwise be terminated too. Wait for it with terminate_algo(None) first.
         :return:
         """
+        if self._is_stopping():
+            raise RuntimeError("The algorithm was terminated but is still running; "
+                               "wait for it to stop (terminate_algo(None)) before starting it again.")
+
         args = [self._drone]
         if new_args is None:
             if self.default_args is not None:
@@ -84,16 +189,43 @@ class Manager:
         if self.algo_thread is None or not self.algo_thread.is_alive():
             # noinspection PyProtectedMember
             self._drone._determinate()
-            self.algo_thread = Thread(target=self.method, args=args)
+            if self.tick is None:
+                self.algo_thread = Thread(target=self._run_method, args=args)
+            else:
+                self.algo_thread = Thread(target=self._run_ticks)
             self.algo_thread.start()
             self.algo_started = True
 
         if self._drone.is_paused():
             self._drone.resume()
 
+    def _run_method(self, *args):
+        try:
+            self.method(*args)
+        except (AlgorithmTerminated, ReplayFinished):
+            pass
+
+    def _is_stopping(self) -> bool:
+        return self.algo_thread is not None and self.algo_thread.is_alive() and self._drone.is_terminating()
+
+    def _run_ticks(self):
+        try:
+            if self.lockstep_dt is not None:
+                self.lockstep = Lockstep(self._drone, self.tick, self.lockstep_dt, with_lidars=True)
+                # noinspection PyProtectedMember
+                self.lockstep.run(before_step=self._drone._pause_handler)
+            else:
+                self.scheduler = TickScheduler(self._drone, self.tick, self.tick_rate, self.overrun_policy,
+                                               with_lidars=True)
+                # noinspection PyProtectedMember
+                self.scheduler.run(before_tick=self._drone._pause_handler)
+        except (AlgorithmTerminated, ReplayFinished):
+            pass
+
     def pause_algo(self):
         """
-
+        Pause the algorithm at its next call to the drone. A wait for a command is interrupted right away:
+        the command is cancelled in the simulator, and sent again on resume_algo.
         :return:
         """
         self._drone.pause()
@@ -105,24 +237,52 @@ class Manager:
         """
         self._drone.resume()
 
-    def terminate_algo(self):
+    def terminate_algo(self, timeout: Optional[float] = TERMINATE_TIMEOUT) -> bool:
+        """
+        Stop the algorithm: AlgorithmTerminated is raised at its next call to the drone, or within a few
+        milliseconds if it is waiting for a command (or paused). The last command is cancelled in the simulator.
+        The connections are kept, so start_algo can run it again right away.
+        :param timeout: The longest time to wait for the algorithm's thread to stop, in seconds.
+         Leave 'None' to wait until it stops (e.g. when it never calls the drone).
+        :return: True if the algorithm stopped (or wasn't running).
         """
+        self._signal_terminate()
+        return self._join_algo(timeout)
 
-        :return:
+    def _signal_terminate(self):
         """
-        if self.algo_thread is not None and self.algo_thread.is_alive():
+        The first half of terminate_algo, which doesn't wait: tell the algorithm to stop, and cancel the last command.
+        Also when the algorithm already ended by itself, since its last command may still be running.
+        """
+        if self.algo_thread is None or not (self.algo_started or self.algo_thread.is_alive()):
+            return
+
+        if self.algo_thread.is_alive():
             self._drone.terminate()
-            self.algo_started = False
-            self.algo_thread.join()
+        self.algo_started = False
+        # noinspection PyProtectedMember
+        self._drone._cancel_last_command()
+
+    def _join_algo(self, timeout: Optional[float] = TERMINATE_TIMEOUT) -> bool:
+        """
+        The second half of terminate_algo: wait for the algorithm's thread to stop.
+        :return: True if it stopped (or wasn't running).
+        """
+        if self.algo_thread is None:
+            return True
+        self.algo_thread.join(timeout)
+        return not self.algo_thread.is_alive()
 
     # Getters
 
     def get_algo_state(self):
         """
 
-        :return: 'running', 'paused' or 'terminated'
+        :return: 'running', 'paused', 'stopping' (terminated, but still running) or 'stopped' (also once it ended)
         """
-        if self.algo_started:
+        if self._is_stopping():
+            return 'stopping'
+        if self.algo_started and self.algo_thread is not None and self.algo_thread.is_alive():
             if self._drone.is_paused():
                 return 'paused'
             else:
@@ -130,13 +290,31 @@ class Manager:
         else:
             return 'stopped'
 
+    def get_tick_stats(self) -> Dict[str, float]:
+        """
+
+        :return: The stats of the latest run of tick (see Lockstep.get_stats and TickScheduler.get_stats),
+         or an empty dictionary if tick didn't run yet.
+        """
+        runner = self.lockstep if self.lockstep_dt is not None else self.scheduler
+        if runner is None:
+            return {}
+        return runner.get_stats()
+
     def get_airsim_client(self) -> airsim.MultirotorClient:
         """
 
-        :return:
+        :return: The client that sends the commands (the control lane of the pool).
         """
         return self._drone.client
 
+    def enable_api_control(self, is_enabled: bool):
+        """
+        Switch between control through the api (the algorithm) and manual control.
+        :param is_enabled: True for the api, False for manual.
+        """
+        self._drone.enable_api_control(is_enabled)
+
     # noinspection PyProtectedMember
     def get_position(self):
         return self._drone._get_position()
@@ -153,6 +331,38 @@ class Manager:
     def get_lidars(self):
         return self._drone._get_lidars()
 
+    # noinspection PyProtectedMember
+    def get_snapshot(self, max_age: Optional[float] = None, with_lidars: bool = False) -> Snapshot:
+        """
+
+        :param max_age: When sampling, the maximal age (in seconds) of the reading, waiting for a newer one if needed.
+         Leave 'None' to get the latest reading.
+        :param with_lidars: Should the lidars be read as well? They are always included when sampling.
+        :return: A Snapshot of the drone's state.
+        """
+        if self.sampler is None:
+            return self._drone._get_snapshot(with_lidars)
+        return self.sampler.get(max_age)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+
+        :return: The stats of the calls to the simulator (see RpcStats.to_dict), or an empty dictionary
+         if the manager was created without collect_stats.
+        """
+        if self.stats is None:
+            return {}
+        return self.stats.to_dict()
+
+    def save_stats(self, path: str):
+        """
+        Write the stats (see get_stats) to a JSON file.
+        :param path: The path of the file.
+        """
+        if self.stats is None:
+            raise RuntimeError("The manager doesn't collect stats (see collect_stats).")
+        self.stats.save(path)
+
     def __enter__(self):
         """
 
@@ -166,5 +376,14 @@ class Manager:
         :param args:
         :return:
         """
-        self.get_airsim_client().enableApiControl(False)
+        if self.sampler is not None:
+            self.sampler.stop()
+        self.enable_api_control(False)
         self.terminate_algo()
+
+
+def _freeze(snapshot: Snapshot) -> Snapshot:
+    """
+    Make the dictionaries of a snapshot read-only, so it can be shared between threads.
+    """
+    return Snapshot(*(MappingProxyType(x) if isinstance(x, dict) else x for x in snapshot))
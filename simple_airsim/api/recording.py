@@ -0,0 +1,241 @@
+import collections
+import datetime
+import time
+import types
+from typing import Any, BinaryIO, Deque, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import airsim
+import msgpack
+import msgpackrpc
+from msgpackrpc import message
+from msgpackrpc.error import RPCError
+
+from .._utils import rpc
+
+MAGIC = b"SAREC01\n"
+
+
+class ReplayFinished(RPCError):
+    """
+    Raised by a call to a ReplayClient that the recording has no (more) responses to.
+    Manager stops the algorithm when it is raised, as when the algorithm is terminated.
+    """
+
+    def __init__(self, method: str):
+        super().__init__("The recording has no more responses to '%s'." % method)
+        self.method = method
+
+
+class Call(NamedTuple):
+    """
+    A call to the simulator and its response, as recorded by RecordingClient.
+    """
+
+    # The times the request was sent and the response was read, in seconds from the start of the recording.
+    request_time: float
+    response_time: float
+    # The RPC method (e.g. "simGetVehiclePose").
+    method: str
+    # The arguments, packed with msgpack (msgpack.unpackb(args, raw=False) unpacks them).
+    args: bytes
+    # The error of the response, or None.
+    error: Any
+    # The result of the response, as the client read it.
+    result: Any
+
+
+def _to_msgpack(value: Any) -> Any:
+    return value.to_msgpack() if hasattr(value, "to_msgpack") else str(value)
+
+
+def _pack_args(args: Any) -> bytes:
+    return msgpack.packb(list(args), use_bin_type=True, default=_to_msgpack)
+
+
+class RecordingClient(airsim.MultirotorClient):
+    """
+    An airsim client that records every call it makes and its response to a file, to replay later (see ReplayClient).
+    Use it wherever a client goes, e.g. Manager(client=RecordingClient("run.rec")).
+
+    The file is a compact binary stream:
+        MAGIC (8 bytes)
+        calls (msgpack arrays: request time, response time, method, packed arguments, error, result)
+    Each call is written when its response is read, so a recording cut short (e.g. by a crash) keeps every call before.
+    """
+    file: Optional[BinaryIO]
+
+    def __init__(self, filename: str, ip: str = "", port: int = 41451, timeout_value: int = 3600):
+        """
+
+        :param filename: The file to record to. It is overwritten.
+        :param ip: The ip of the simulator. Leave empty for localhost.
+        :param port: The port of the simulator.
+        :param timeout_value: The timeout of a call, in seconds (see airsim's client).
+        """
+        super().__init__(ip, port, timeout_value)
+        self.filename = filename
+        self.file = open(filename, "wb")
+        self.file.write(MAGIC)
+        self.count = 0
+        self._packer = msgpack.Packer(use_bin_type=True, default=_to_msgpack)
+        self._start = time.perf_counter()
+        rpc.set_nodelay(self.client)
+        self._remove_hooks = rpc.trace(self.client, self._record)
+
+    def _record(self, method: str, args: Any, sent: float, received: float, error: Any, result: Any):
+        if self.file is None:
+            return
+        self.file.write(self._packer.pack([sent - self._start, received - self._start, method, _pack_args(args),
+                                           error, result]))
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        """
+        Stop recording, and close the connection.
+        """
+        if self.file is not None:
+            self._remove_hooks()
+            self.file.close()
+            self.file = None
+            self.client.close()
+
+    def __enter__(self) -> "RecordingClient":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read(filename: str) -> List[Call]:
+    """
+    Read a recording. A call that was cut in the middle (e.g. if the recording crashed) is ignored.
+    :param filename: The file written by RecordingClient.
+    :return: The calls, in the order their responses were read.
+    """
+    with open(filename, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("'%s' is not a recording." % filename)
+        return [Call(*call) for call in msgpack.Unpacker(file, raw=False)]
+
+
+class _ReplayTransport:
+    """
+    Stands in for the TCP transport of a msgpack-rpc client: requests go to the replay instead of a socket,
+    and the responses come back through the client's loop, as if read from a connection.
+    """
+
+    def __init__(self, session, address, reconnect_limit, encodings=("utf-8", None)):
+        self._session = session
+        self._address = address
+        # Nothing is ever connected, for the code that sets up the connections (e.g. rpc.instrument).
+        self._sockets = []
+        self.respond = None
+
+    def on_connect(self, sock):
+        pass
+
+    def send_message(self, msg, callback=None):
+        if msg[0] == message.REQUEST:
+            self.respond(msg[1], msg[2], msg[3])
+        if callback is not None:
+            callback()
+
+    def close(self):
+        pass
+
+
+_BUILDER = types.SimpleNamespace(ClientTransport=_ReplayTransport)
+
+
+class ReplayClient(airsim.MultirotorClient):
+    """
+    An airsim client that answers every call from a recording (see RecordingClient) instead of a simulator, e.g.
+    to run a changed algorithm against the same sensor readings: Manager(client=ReplayClient("run.rec", speed=None)).
+
+    The n-th call of a method with the same arguments gets the response of the n-th such call in the recording, so a
+    replay is deterministic. A call whose arguments weren't recorded (e.g. a command the changed algorithm sends
+    differently) gets the next recorded response of its method. A call that has no response left raises
+    ReplayFinished.
+
+    The responses come back no sooner than they did in the recording, counted from the first call, divided by speed:
+    1 replays in real time, 10 ten times faster, and None as fast as possible.
+    """
+    calls: List[Call]
+
+    # noinspection PyMissingConstructor
+    def __init__(self, recording: Union[str, List[Call]], speed: Optional[float] = 1.0, timeout_value: int = 3600):
+        """
+
+        :param recording: The file written by RecordingClient, or its calls (see read).
+        :param speed: How many times faster than the recording to replay. Leave 'None' for as fast as possible.
+        :param timeout_value: The timeout of a call, in seconds (see airsim's client).
+        """
+        self.ip, self.port, self.timeout_value = "", 0, timeout_value
+        self.calls = read(recording) if isinstance(recording, str) else list(recording)
+        self.speed = speed
+        self.client = msgpackrpc.Client(msgpackrpc.Address("127.0.0.1", 0), timeout=timeout_value, builder=_BUILDER,
+                                        pack_encoding="utf-8", unpack_encoding="utf-8")
+        # noinspection PyProtectedMember
+        self.client._transport.respond = self._respond
+
+        # The indices of the calls that are left, by method and arguments, and by method.
+        self._by_call: Dict[Tuple[str, bytes], Deque[int]] = {}
+        self._by_method: Dict[str, Deque[int]] = {}
+        for i, call in enumerate(self.calls):
+            self._by_call.setdefault((call.method, call.args), collections.deque()).append(i)
+            self._by_method.setdefault(call.method, collections.deque()).append(i)
+        self._used = bytearray(len(self.calls))
+        self._origin = min((call.request_time for call in self.calls), default=0.0)
+        self._start = None
+        self._stats = {"calls": 0, "matched": 0, "unmatched": 0, "missing": 0}
+
+    def _next(self, method: str, args: Any) -> Optional[Call]:
+        """
+        :return: The recorded call that answers a call, or None if there is none left.
+        """
+        for left, kind in ((self._by_call.get((method, _pack_args(args))), "matched"),
+                           (self._by_method.get(method), "unmatched")):
+            while left:
+                i = left.popleft()
+                if not self._used[i]:  # Calls that answered a call already are skipped.
+                    self._used[i] = True
+                    self._stats[kind] += 1
+                    return self.calls[i]
+        self._stats["missing"] += 1
+        return None
+
+    def _respond(self, msgid: int, method: str, args: Any):
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        self._stats["calls"] += 1
+
+        call = self._next(method, args)
+        if call is None:
+            error, result, delay = ReplayFinished(method), None, 0.0
+        else:
+            error, result = call.error, call.result
+            delay = 0.0
+            if self.speed is not None:
+                delay = self._start + (call.response_time - self._origin) / self.speed - now
+
+        if delay <= 0:
+            self.client.on_response(msgid, error, result)
+        else:
+            # Read like any other response: by whichever thread runs the client's loop once it is due.
+            # noinspection PyProtectedMember
+            self.client._loop._ioloop.add_timeout(datetime.timedelta(seconds=delay),
+                                                  lambda: self.client.on_response(msgid, error, result))
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+
+        :return: A dictionary of the number of 'calls' so far, how many got the response of a call with the same
+         arguments ('matched') or only the same method ('unmatched'), how many had none left ('missing'), and the
+         number of recorded calls that are 'left'.
+        """
+        return dict(self._stats, left=len(self._used) - sum(self._used))
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from typing import Any, Dict
+
+from .._utils.histogram import Histogram
+
+
+class RpcStats:
+    """
+    Statistics of the calls to the simulator: the count, bytes and latency of each RPC method,
+    and how long callers waited for the lock of each connection.
+    Filled by ConnectionPool.enable_stats (see Manager's collect_stats). All times are in seconds.
+    """
+    _methods: Dict[str, Dict[str, Any]]
+    _lock_waits: Dict[str, Histogram]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget everything recorded so far.
+        """
+        with self._lock:
+            self._methods = {}
+            self._lock_waits = {}
+            self._start = time.monotonic()
+
+    def record_call(self, method: str, seconds: float, bytes_sent: int, bytes_received: int, failed: bool):
+        """
+
+        :param method: The RPC method (e.g. "getMultirotorState").
+        :param seconds: The time from sending the request to reading the response.
+        :param bytes_sent: The size of the request.
+        :param bytes_received: The size of the response.
+        :param failed: True if the simulator returned an error.
+        """
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = {"latency": Histogram(), "bytes_sent": 0, "bytes_received": 0, "errors": 0}
+                self._methods[method] = stats
+            stats["latency"].add(seconds)
+            stats["bytes_sent"] += bytes_sent
+            stats["bytes_received"] += bytes_received
+            stats["errors"] += failed
+
+    def record_lock_wait(self, lane: str, seconds: float):
+        """
+
+        :param lane: The name of the connection (see connection_pool).
+        :param seconds: The time a caller waited for the lock of the connection.
+        """
+        with self._lock:
+            waits = self._lock_waits.get(lane)
+            if waits is None:
+                waits = Histogram()
+                self._lock_waits[lane] = waits
+            waits.add(seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+
+        :return: A dictionary of:
+         'elapsed' - the time since the stats were started or reset.
+         'rpc_time' - the total latency of all the calls (calls in parallel are all counted).
+         'methods' - for each RPC method, its 'count', 'errors', 'bytes_sent', 'bytes_received', and the 'total',
+          'mean', 'p50', 'p95', 'p99' and 'max' of its latency, with its 'histogram' (the count of each bucket,
+          by the bucket's middle).
+         'lock_waits' - for each connection, the same latency statistics of the waits for its lock.
+        """
+        with self._lock:
+            methods = {}
+            for method, stats in self._methods.items():
+                latency = stats["latency"].to_dict()
+                methods[method] = {"count": latency.pop("count"), "errors": stats["errors"],
+                                   "bytes_sent": stats["bytes_sent"], "bytes_received": stats["bytes_received"],
+                                   **latency}
+            return {"elapsed": time.monotonic() - self._start,
+                    "rpc_time": sum(stats["latency"].total for stats in self._methods.values()),
+                    "methods": methods,
+                    "lock_waits": {lane: waits.to_dict() for lane, waits in self._lock_waits.items()}}
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def save(self, path: str):
+        """
+        Write the stats (see to_dict) to a JSON file.
+        :param path: The path of the file.
+        """
+        with open(path, "w") as f:
+            f.write(self.to_json())
@@ -1,13 +1,18 @@
+import functools
 import threading
+import time
 
 import airsim
-import cv2
 import numpy as np
-from typing import Dict
+from msgpackrpc.future import Future
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from .._utils import get_state, do_action
+from .._utils import get_state, do_action, airsim_lidars, images, depth, airsim_to_world, world_to_airsim
 from . import coordinate_system, camera_config
+from .command_handle import CommandHandle
+from .connection_pool import ConnectionPool
 from .drone import Drone
+from .snapshot import Snapshot
 
 # _DEFAULT_LIDAR_NAMES = {"lidar_front": "front",
 #                         "lidar_front_left": "front_left",
@@ -46,28 +51,84 @@ def synchronized_with_attr(lock_name):
 
 
 class SimDrone(Drone):
-    client: airsim.MultirotorClient
+    pool: ConnectionPool
 
     def __init__(self, system: coordinate_system.CoordinateSystem,
                  lidar_names: Dict[str, str] = None,
-                 client: airsim.MultirotorClient = None):
+                 client: airsim.MultirotorClient = None,
+                 lidar_reductions: Dict[str, Union[str, airsim_lidars.Reduction]] = None,
+                 vehicle_name: str = "", lock: Optional[threading.RLock] = None,
+                 pool: Optional[ConnectionPool] = None, pose_max_age: Optional[float] = None):
         """
         Initialize a drone.
         :param system: The coordinate system to use.
         :param lidar_names: The names of the lidar sensors in airsim and in code. Leave 'None' for default.
-        :param client: The airsim client. Leave 'None' for default.
-        """
-        self.lock = threading.RLock()
+        :param client: The airsim client, used for all the calls. Leave 'None' to use a pool (see pool).
+        :param lidar_reductions: How to turn the point cloud of each lidar (by its name in airsim) into a single value.
+         Either "last" (the range of the last point), "nearest", "farthest", "mean", "median", "count",
+         or a function from a numpy array of the ranges of all the points to a value
+         (e.g. airsim_lidars.percentile(10)). Leave 'None' to use "last" for all.
+        :param vehicle_name: The name of the vehicle in airsim (as in settings.json). Leave empty for the default.
+        :param lock: The lock of client, when it is shared with other drones. Leave 'None' for a lock of its own.
+         Only with a client: the lanes of a pool have locks of their own.
+        :param pool: The connections to use for commands, telemetry and images. Only without a client.
+         Leave 'None' for a new pool. Either way, api control is enabled for the vehicle.
+        :param pose_max_age: Relative commands (move_by, turn_by) start from the pose of a reading
+         (e.g. get_snapshot) that is no older than this, in seconds, instead of reading the pose first.
+         The target is then off by the distance flown since the reading. Leave 'None' to always read the pose.
+        """
+        if client is not None and pool is not None:
+            raise ValueError("Pass either a client or a pool, not both.")
+        if lock is not None and client is None:
+            raise ValueError("A lock is only used with a client; the lanes of a pool have locks of their own.")
+
+        # Makes sure commands are sent one at a time.
+        self.command_lock = threading.RLock()
+        self._last_command: Optional[CommandHandle] = None
 
         self.system = system
+        self.lidar_names = lidar_names
         if lidar_names is None:
             self.lidar_names = _DEFAULT_LIDAR_NAMES
+        self.lidar_reductions = lidar_reductions
+        self.vehicle_name = vehicle_name
+        self._camera_fovs: Dict[str, float] = {}
+        self.pose_max_age = pose_max_age
+        # The time.monotonic() of the latest reading, with its position and yaw in airsim's coordinates.
+        self._last_pose: Optional[Tuple[float, Dict[str, float], float]] = None
+
+        # The lock of each lane guards its client. It is held only for the duration of a single call,
+        # never while waiting for a command to finish.
+        self.pool = pool
+        if client is not None:
+            self.pool = ConnectionPool.from_client(client, lock)
+        else:
+            # A new pool or a shared one: either way this vehicle has to be under api control to move.
+            if self.pool is None:
+                self.pool = ConnectionPool()
+            with self.lock:
+                if not self.pool.control.is_connected():  # The first drone on a pool checks the connection.
+                    self.client.confirmConnection()
+                self.client.enableApiControl(True, vehicle_name)
+
+    @property
+    def client(self) -> airsim.MultirotorClient:
+        """
+        The client of the control lane.
+        """
+        return self.pool.control.client
+
+    @property
+    def lock(self) -> threading.RLock:
+        return self.pool.control.lock
+
+    @property
+    def telemetry_client(self) -> airsim.MultirotorClient:
+        return self.pool.telemetry.client
 
-        self.client = client
-        if self.client is None:
-            self.client = airsim.MultirotorClient()
-            self.client.confirmConnection()
-            self.client.enableApiControl(True)
+    @property
+    def telemetry_lock(self) -> threading.RLock:
+        return self.pool.telemetry.lock
 
     def _pause_handler(self):
         """
@@ -76,51 +137,103 @@ class SimDrone(Drone):
         """
         pass
 
+    def _command(self, action: Callable[..., Future], *args, **kwargs) -> CommandHandle:
+        """
+        Send a command. Commands are sent one at a time, but are not waited for under any lock.
+        :param action: A function that sends the command and returns its future.
+        :return: The handle of the command.
+        """
+        with self.command_lock:
+            with self.lock:
+                future = action(*args, **kwargs)
+            self._last_command = CommandHandle(future, self.lock, self._cancel_command, self._is_interrupted,
+                                               functools.partial(self._interrupt_command, action, args, kwargs))
+            return self._last_command
+
+    def _cancel_command(self, handle: CommandHandle) -> bool:
+        with self.command_lock:
+            if handle is not self._last_command:
+                return False
+            with self.lock:
+                self.client.cancelLastTask(self.vehicle_name)
+            return True
+
+    def _cancel_last_command(self) -> bool:
+        """
+        Cancel the last command, if it is still running. Can be called from any thread.
+        :return: True if the command was cancelled.
+        """
+        handle = self._last_command
+        return handle is not None and handle.cancel()
+
+    def _is_interrupted(self) -> bool:
+        """
+        Checked by the handles while waiting for commands.
+        :return: True if the waits should stop and call _interrupt_command (e.g. on pause or terminate).
+        """
+        return False
+
+    def _interrupt_command(self, action: Callable[..., Future], args: tuple, kwargs: dict, handle: CommandHandle):
+        """
+        Handle a wait for a command that was interrupted: cancel the command in the simulator,
+        block in _pause_handler (which raises to stop the algorithm), and then send the command again.
+        Relative commands keep their original target, since it was computed when they were first sent.
+        :param action: The function that sent the command, with its args and kwargs (see _command).
+        :param handle: The handle of the command.
+        """
+        handle.cancel()
+        self._pause_handler()
+        with self.command_lock:
+            with self.lock:
+                future = action(*args, **kwargs)
+            # noinspection PyProtectedMember
+            handle._resume(future)
+            self._last_command = handle
+
     # One-line functions
 
-    @synchronized_with_attr("lock")
-    def takeoff(self, wait: bool) -> None:
+    def takeoff(self, wait: bool = False) -> CommandHandle:
         """
         Takeoff.
         :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
         """
         self._pause_handler()
 
+        handle = self._command(self.client.takeoffAsync, vehicle_name=self.vehicle_name)
         if wait:
-            self.client.takeoffAsync().join()
-        else:
-            self.client.takeoffAsync()
+            handle.wait()
+        return handle
 
-    @synchronized_with_attr("lock")
-    def hover(self, wait: bool) -> None:
+    def hover(self, wait: bool = False) -> CommandHandle:
         """
         Hover.
         :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
         """
         self._pause_handler()
 
+        handle = self._command(self.client.hoverAsync, vehicle_name=self.vehicle_name)
         if wait:
-            self.client.hoverAsync().join()
-        else:
-            self.client.hoverAsync()
+            handle.wait()
+        return handle
 
-    @synchronized_with_attr("lock")
-    def land(self, wait: bool) -> None:
+    def land(self, wait: bool = False) -> CommandHandle:
         """
         Land.
         :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
         """
         self._pause_handler()
 
+        handle = self._command(self.client.landAsync, vehicle_name=self.vehicle_name)
         if wait:
-            self.client.landAsync().join()
-        else:
-            self.client.landAsync()
+            handle.wait()
+        return handle
 
     # Complex functions
 
-    @synchronized_with_attr("lock")
-    def move_by(self, x: float, y: float, z: float, wait: bool) -> None:
+    def move_by(self, x: float, y: float, z: float, wait: bool = False) -> CommandHandle:
         """
         Move a specific amount of meters in every axis.
         Note: directions are defined by the coordinate system.
@@ -128,18 +241,20 @@ class SimDrone(Drone):
         :param y: The number of meters to move in parallel to the y axis.
         :param z: The number of meters to move in parallel to the z axis.
         :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
         """
         self._pause_handler()
 
-        x, y, z = self.system.ta_pos(x, y, z)
+        x, y, z = self.system.ta_dir(x, y, z)
+        pos, current_yaw = self._command_pose()
 
+        # noinspection PyProtectedMember
+        handle = self._command(do_action._move_by, self.client, pos, current_yaw, x, y, z, self.vehicle_name)
         if wait:
-            do_action.move_by(self.client, x, y, z).join()
-        else:
-            do_action.move_by(self.client, x, y, z)
+            handle.wait()
+        return handle
 
-    @synchronized_with_attr("lock")
-    def turn_by(self, roll: float, pitch: float, yaw: float, wait: bool) -> None:
+    def turn_by(self, roll: float, pitch: float, yaw: float, wait: bool = False) -> CommandHandle:
         """
         Turn a specific amount of degrees in every axis.
         Note: directions are defined by the coordinate system.
@@ -147,19 +262,81 @@ class SimDrone(Drone):
         :param pitch: The number of degrees to rotate the pitch (rotate around the y axis).
         :param yaw: The number of degrees to rotate the yaw (rotate around the z axis).
         :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
         """
         self._pause_handler()
 
         roll, pitch, yaw = self.system.ta_ori(roll, pitch, yaw)
+        pos, current_yaw = self._command_pose()
 
+        # noinspection PyProtectedMember
+        handle = self._command(do_action._turn_by, self.client, pos['z'], current_yaw, roll, pitch, yaw,
+                               self.vehicle_name)
         if wait:
-            do_action.turn_by(self.client, roll, pitch, yaw).join()
-        else:
-            do_action.turn_by(self.client, roll, pitch, yaw)
+            handle.wait()
+        return handle
+
+    def _command_pose(self) -> Tuple[Dict[str, float], float]:
+        """
+        The position and yaw (in airsim's coordinates) that a relative command starts from:
+        the latest reading if it is within pose_max_age, otherwise a single pose read.
+        """
+        last_pose = self._last_pose
+        if last_pose is not None and self.pose_max_age is not None \
+                and time.monotonic() - last_pose[0] <= self.pose_max_age:
+            return last_pose[1], last_pose[2]
+        return self._read_pose()
+
+    @synchronized_with_attr("telemetry_lock")
+    def _read_pose(self) -> Tuple[Dict[str, float], float]:
+        pos, ori = get_state.pose(self.telemetry_client, self.vehicle_name)
+        self._last_pose = (time.monotonic(), pos, ori['yaw'])
+        return pos, ori['yaw']
+
+    def move_by_velocity(self, x: float, y: float, z: float, duration: float = 1, body_frame: bool = True,
+                         wait: bool = False) -> CommandHandle:
+        """
+        Fly at a specific velocity. Doesn't read the pose, so it is sent right away.
+        Note: directions are defined by the coordinate system.
+        :param x: The velocity in parallel to the x axis, in meters per second.
+        :param y: The velocity in parallel to the y axis, in meters per second.
+        :param z: The velocity in parallel to the z axis, in meters per second.
+        :param duration: Time (in seconds) to execute this call.
+        :param body_frame: True for axes that turn with the drone (e.g. x is always forward), False for the world's.
+         The drone's axes need a simulator with moveByVelocityBodyFrame (AirSim 1.4 and later).
+        :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
+        """
+        self._pause_handler()
+
+        x, y, z = self.system.ta_dir(x, y, z)
+
+        handle = self._command(do_action.move_by_velocity, self.client, x, y, z, duration, body_frame,
+                               self.vehicle_name)
+        if wait:
+            handle.wait()
+        return handle
+
+    def turn_at_rate(self, yaw_rate: float, duration: float = 1, wait: bool = False) -> CommandHandle:
+        """
+        Turn at a specific speed in yaw, keeping the position. Doesn't read the pose, so it is sent right away.
+        Note: directions are defined by the coordinate system.
+        :param yaw_rate: The yaw speed in degrees per second.
+        :param duration: Time (in seconds) to execute this call.
+        :param wait: Should we wait for the command to finish, or return immediately?
+        :return: The handle of the command.
+        """
+        self._pause_handler()
+
+        _, _, yaw_rate = self.system.ta_ori(0, 0, yaw_rate)
+
+        handle = self._command(do_action.rotate_by_yaw_rate, self.client, yaw_rate, duration, self.vehicle_name)
+        if wait:
+            handle.wait()
+        return handle
 
-    @synchronized_with_attr("lock")
     def command(self, roll: float, pitch: float, yaw_rate: float, z: float,
-                wait: bool = False, duration: float = 0.1) -> None:
+                wait: bool = False, duration: float = 0.1) -> CommandHandle:
         """
         Target a specific roll, pitch, and z, with a specific speed in yaw.
         Note: directions are defined by the coordinate system.
@@ -170,18 +347,19 @@ class SimDrone(Drone):
         :param wait: Should we wait for the command to finish, or return immediately?
         :param duration: Time (in seconds) to execute this call.
          This will be overridden if a different api function is called during this time.
+        :return: The handle of the command.
         """
         self._pause_handler()
 
         roll, pitch, yaw_rate = self.system.ta_ori(roll, pitch, yaw_rate)
         x, y, z = self.system.ta_pos(0, 0, z)
 
+        handle = self._command(do_action.move_roll_pitch_yaw_rate_z, self.client, roll, pitch, yaw_rate, z, duration,
+                               self.vehicle_name)
         if wait:
-            do_action.move_roll_pitch_yaw_rate_z(self.client, roll, pitch, yaw_rate, z, duration).join()
-        else:
-            do_action.move_roll_pitch_yaw_rate_z(self.client, roll, pitch, yaw_rate, z, duration)
+            handle.wait()
+        return handle
 
-    @synchronized_with_attr("lock")
     def rc(self, right: float, forward: float, up: float, yaw: float):
         """
 
@@ -206,9 +384,11 @@ class SimDrone(Drone):
 
         return self._get_position()
 
-    @synchronized_with_attr("lock")
+    @synchronized_with_attr("telemetry_lock")
     def _get_position(self):
-        pos = get_state.position(self.client)
+        return self._convert_position(get_state.position(self.telemetry_client, self.vehicle_name))
+
+    def _convert_position(self, pos: Dict[str, float]) -> Dict[str, float]:
         x, y, z = self.system.fa_pos(pos['x'], pos['y'], pos['z'])
         return {'x': x, 'y': y, 'z': z}
 
@@ -221,9 +401,11 @@ class SimDrone(Drone):
 
         return self._get_orientation()
 
-    @synchronized_with_attr("lock")
+    @synchronized_with_attr("telemetry_lock")
     def _get_orientation(self):
-        ori = get_state.orientation(self.client)
+        return self._convert_orientation(get_state.orientation(self.telemetry_client, self.vehicle_name))
+
+    def _convert_orientation(self, ori: Dict[str, float]) -> Dict[str, float]:
         roll, pitch, yaw = self.system.fa_ori(ori['roll'], ori['pitch'], ori['yaw'])
         return {'roll': roll, 'pitch': pitch, 'yaw': yaw}
 
@@ -236,13 +418,47 @@ class SimDrone(Drone):
 
         return self._get_velocity()
 
-    @synchronized_with_attr("lock")
+    @synchronized_with_attr("telemetry_lock")
     def _get_velocity(self):
-        vel = get_state.velocity(self.client)
-        x, y, z = self.system.fa_pos(vel['x'], vel['y'], vel['z'])
+        return self._convert_velocity(get_state.velocity(self.telemetry_client, self.vehicle_name))
+
+    def _convert_velocity(self, vel: Dict[str, float]) -> Dict[str, float]:
+        x, y, z = self.system.fa_dir(vel['x'], vel['y'], vel['z'])
         roll, pitch, yaw = self.system.fa_ori(vel['roll'], vel['pitch'], vel['yaw'])
         return {'x': x, 'y': y, 'z': z, 'roll': roll, 'pitch': pitch, 'yaw': yaw}
 
+    def get_snapshot(self, with_lidars: bool = False) -> Snapshot:
+        """
+
+        :param with_lidars: Should the lidars be read as well (in the same round trip)?
+        :return: A Snapshot of the position, orientation, velocity, timestamp and collision state,
+         read using a single call to the simulator.
+        """
+        self._pause_handler()
+
+        return self._get_snapshot(with_lidars)
+
+    def _get_snapshot(self, with_lidars: bool = False) -> Snapshot:
+        return self._read_snapshot(with_lidars)
+
+    @synchronized_with_attr("telemetry_lock")
+    def _read_snapshot(self, with_lidars: bool) -> Snapshot:
+        """
+        Always reads from the simulator, even when a subclass serves the getters from elsewhere.
+        """
+        state = get_state.snapshot(self.telemetry_client, self.lidar_names if with_lidars else None,
+                                   self.lidar_reductions, self.vehicle_name)
+        self._last_pose = (time.monotonic(), state['position'], state['orientation']['yaw'])
+        return self._convert_snapshot(state)
+
+    def _convert_snapshot(self, state: Dict) -> Snapshot:
+        return Snapshot(timestamp=state['timestamp'],
+                        position=self._convert_position(state['position']),
+                        orientation=self._convert_orientation(state['orientation']),
+                        velocity=self._convert_velocity(state['velocity']),
+                        collision=state['collision'],
+                        lidars=state['lidars'])
+
     def get_lidars(self):
         """
 
@@ -252,34 +468,95 @@ class SimDrone(Drone):
 
         return self._get_lidars()
 
-    @synchronized_with_attr("lock")
+    @synchronized_with_attr("telemetry_lock")
     def _get_lidars(self):
-        return get_state.lidars(self.client, self.lidar_names)
+        return get_state.lidars(self.telemetry_client, self.lidar_names, self.lidar_reductions, self.vehicle_name)
 
-    @synchronized_with_attr("lock")
     def get_image(self, camera_id: int, cam_type: camera_config.ImageType,
                   return_type: camera_config.ReturnType, default_alpha: int = 128) -> np.ndarray:
         """
 
         :return:
         """
-        raw_image = self.client.simGetImage(str(camera_id), cam_type.airsim_val)
-        im: np.ndarray = cv2.imdecode(airsim.string_to_uint8_array(raw_image),
-                                      cv2.IMREAD_UNCHANGED if return_type.with_alpha else cv2.IMREAD_COLOR)
+        bulk = self.pool.bulk
+        with bulk.lock:
+            raw_image = bulk.client.simGetImage(str(camera_id), cam_type.airsim_val, self.vehicle_name)
 
-        if return_type.with_alpha:
-            if im.shape[3] == 3:  # If image does not contain alpha, add alpha.
-                np.dstack(im, np.full((im.shape[0], im.shape[1]), default_alpha, dtype=im.dtype))
+        # Decode outside of the lock, so a slow decode doesn't block other calls.
+        return images.decode(raw_image, return_type, default_alpha)
 
-            if return_type.format == "RGB":
-                return cv2.cvtColor(im, cv2.COLOR_BGRA2RGBA)
-            elif return_type.format == "BGR":
-                return im
-        else:
-            if return_type.format == "RGB":
-                return cv2.cvtColor(im, cv2.COLOR_BGR2RGB)
-            elif return_type.format == "BGR":
-                return im
+    def get_images(self, requests: Sequence[camera_config.ImageRequest], default_alpha: int = 128,
+                   out: Optional[Sequence[Optional[np.ndarray]]] = None) -> List[np.ndarray]:
+        """
+        Get several images (from several cameras, of several types) in a single call.
+        The images are uncompressed, so they are reshaped instead of decoded: about half the CPU time per frame of
+        get_image for each camera, but several times the bytes. Prefer it when the client's CPU is the bottleneck,
+        and get_image when the link to the simulator is (see benchmarks/image_capture.py).
+        :param requests: The images to get.
+        :param default_alpha: The alpha to add to images without alpha, if the return type has alpha.
+        :param out: Arrays to write each image into (None for a new array), to reuse them between frames.
+        :return: A numpy array of each image, in the order of the requests (see images.to_array).
+        """
+        return self._read_images(requests, default_alpha, out)[1]
+
+    def _read_images(self, requests: Sequence[camera_config.ImageRequest], default_alpha: int = 128,
+                     out: Optional[Sequence[Optional[np.ndarray]]] = None) -> Tuple[float, List[np.ndarray]]:
+        """
+        Like get_images, and also returns the simulator's timestamp (in seconds) of the first image.
+        """
+        responses = self._get_image_responses(requests)
+
+        if out is None:
+            out = [None] * len(requests)
+        return responses[0].time_stamp / 1e9, [images.to_array(response, request, default_alpha, buffer)
+                                               for response, request, buffer in zip(responses, requests, out)]
+
+    def _get_image_responses(self, requests: Sequence[camera_config.ImageRequest]) -> List[airsim.ImageResponse]:
+        bulk = self.pool.bulk
+        with bulk.lock:
+            return bulk.client.simGetImages([images.request(request) for request in requests], self.vehicle_name)
+
+    def _get_camera_fov(self, camera_id: Union[int, str]) -> float:
+        """
+        The field of view of a camera doesn't change (unless set through the client), so it is read once.
+        """
+        camera_id = str(camera_id)
+        if camera_id not in self._camera_fovs:
+            bulk = self.pool.bulk
+            with bulk.lock:
+                self._camera_fovs[camera_id] = bulk.client.simGetCameraInfo(camera_id, self.vehicle_name).fov
+        return self._camera_fovs[camera_id]
+
+    def get_point_cloud(self, camera_id: Union[int, str] = 0,
+                        image_type: camera_config.ImageType = camera_config.ImageType.DEPTH_PERSPECTIVE,
+                        stride: int = 1, voxel_size: Optional[float] = None,
+                        max_depth: Optional[float] = None) -> np.ndarray:
+        """
+        Get a depth image and turn it into the points it sees, e.g. for obstacle detection.
+        :param camera_id: The id of the camera.
+        :param image_type: ImageType.DEPTH_PERSPECTIVE or ImageType.DEPTH_PLANAR.
+        :param stride: Use every stride-th pixel in each axis.
+        :param voxel_size: Keep a single point in each cube of this size, in meters. Leave 'None' to keep all.
+        :param max_depth: Drop the points that are farther than this from the camera (e.g. the sky), in meters.
+         Leave 'None' to keep all.
+        :return: An array of shape (N, 3) of the x, y, z of the points, in the coordinate system (like get_position).
+        """
+        if image_type not in (camera_config.ImageType.DEPTH_PERSPECTIVE, camera_config.ImageType.DEPTH_PLANAR):
+            raise ValueError("A point cloud needs a DEPTH_PERSPECTIVE or DEPTH_PLANAR image, not %s." % image_type)
+
+        request = camera_config.ImageRequest(camera_id, image_type, as_float=True)
+        response = self._get_image_responses([request])[0]
+
+        points = depth.to_points(images.to_array(response, request), self._get_camera_fov(camera_id),
+                                 image_type is camera_config.ImageType.DEPTH_PERSPECTIVE,
+                                 response.camera_position, response.camera_orientation, stride,
+                                 None if max_depth is None else world_to_airsim.distance(max_depth))
+        points = airsim_to_world.distance(points)
+        points = self.system.fa_pos_batch(points)
+
+        if voxel_size is not None:
+            points = depth.voxel_downsample(points, voxel_size)
+        return points
 
     # Sim only
 
@@ -306,3 +583,11 @@ class SimDrone(Drone):
     @synchronized_with_attr("lock")
     def continue_for_time(self, seconds):
         self.client.simContinueForTime(seconds)
+
+    @synchronized_with_attr("lock")
+    def enable_api_control(self, is_enabled: bool):
+        """
+        Enable or disable control through the api (i.e. switch between the algorithm and manual control).
+        :param is_enabled: True for the api, False for manual.
+        """
+        self.client.enableApiControl(is_enabled, self.vehicle_name)
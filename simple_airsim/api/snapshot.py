@@ -0,0 +1,21 @@
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class Snapshot(NamedTuple):
+    """
+    The state of the drone at a single point in time, read using a single call to the simulator.
+    All values are in the coordinate system of the drone that created it.
+    """
+
+    # The simulator time of the reading, in seconds.
+    timestamp: float
+    # A dictionary of 'x', 'y', 'z' and their values in meters.
+    position: Dict[str, float]
+    # A dictionary of 'roll', 'pitch', 'yaw' and their values in degrees.
+    orientation: Dict[str, float]
+    # A dictionary of 'x', 'y', 'z', 'roll', 'pitch', 'yaw' and the velocity (linear or angular) in each.
+    velocity: Dict[str, float]
+    # A dictionary of 'has_collided', 'object_name' and 'penetration_depth' (in meters).
+    collision: Dict[str, Any]
+    # A dictionary of the lidar names and their values, or None if the lidars were not read.
+    lidars: Optional[Dict[str, Optional[float]]] = None
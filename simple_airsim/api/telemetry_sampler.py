@@ -0,0 +1,124 @@
+import time
+from threading import Condition, Thread
+from typing import Callable, Optional, Tuple
+
+from .snapshot import Snapshot
+
+# The longest time get waits for a reading by default.
+GET_TIMEOUT = 5.0  # seconds
+
+
+class TelemetrySampler:
+    """
+    Reads the drone's state at a fixed rate on a single thread, and shares the latest reading with every reader.
+    The number of calls to the simulator stays the same no matter how many readers there are.
+    """
+    run: bool
+    _thread: Optional[Thread]
+    _sample: Optional[Tuple[float, Snapshot]]
+
+    def __init__(self, read: Callable[[], Snapshot], rate: float):
+        """
+
+        :param read: A function that reads a Snapshot from the simulator.
+        :param rate: The number of readings per second.
+        """
+        self.read = read
+        self.period = 1 / rate
+        self.run = False
+        # The error of the latest reading, or None if it succeeded.
+        self.error: Optional[Exception] = None
+
+        self._thread = None
+        self._sample = None
+        self._condition = Condition()
+
+    def start(self):
+        """
+        Start reading in the background. Does nothing if already running.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self.run = True
+        self._thread = Thread(target=self._sample_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop reading and wait for the background thread to finish.
+        """
+        self.run = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self) -> Optional[Snapshot]:
+        """
+        Never blocks.
+        :return: The latest Snapshot, or None if nothing was read yet.
+        """
+        sample = self._sample
+        return None if sample is None else sample[1]
+
+    def age(self) -> Optional[float]:
+        """
+
+        :return: How long ago (in seconds) the latest Snapshot was read, or None if nothing was read yet.
+        """
+        sample = self._sample
+        return None if sample is None else time.monotonic() - sample[0]
+
+    def get(self, max_age: Optional[float] = None, timeout: Optional[float] = GET_TIMEOUT) -> Snapshot:
+        """
+        Get a Snapshot that is no older than max_age, waiting for the next reading if needed.
+        If the sampler is not running, reads from the simulator directly.
+        If the latest reading failed, its error is raised, as if the simulator was read directly.
+        :param max_age: The maximal age of the Snapshot in seconds. Leave 'None' to accept any reading.
+        :param timeout: The maximal time (in seconds) to wait for a fresh enough reading. Leave 'None' to wait forever.
+        :return: The Snapshot.
+        """
+        if not self.is_running():
+            return self.read()
+
+        def fresh() -> bool:
+            sample = self._sample
+            return sample is not None and (max_age is None or time.monotonic() - sample[0] <= max_age)
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.error is not None or fresh(), timeout):
+                raise TimeoutError("No reading newer than %s seconds within %s seconds." % (max_age, timeout))
+            if self.error is not None:
+                raise self.error
+            return self._sample[1]
+
+    def _sample_loop(self):
+        next_time = time.monotonic()
+        while self.run:
+            try:
+                snapshot = self.read()
+            except Exception as e:
+                with self._condition:
+                    self.error = e
+                    self._condition.notify_all()
+            else:
+                with self._condition:
+                    self._sample = (time.monotonic(), snapshot)
+                    self.error = None
+                    self._condition.notify_all()
+
+            next_time += self.period
+            now = time.monotonic()
+            if next_time < now:  # Reading took longer than the period, don't try to catch up.
+                next_time = now
+            time.sleep(next_time - now)
+
+    def __enter__(self) -> "TelemetrySampler":
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
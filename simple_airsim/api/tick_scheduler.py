@@ -0,0 +1,120 @@
+import collections
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .._utils.histogram import Histogram
+from .lockstep import Tick
+from .sim_drone import SimDrone
+
+# When a tick runs past the start of the next one, drop the missed ticks and wait for the next slot.
+SKIP = "skip"
+# When a tick runs past the start of the next one, run the missed ticks right away, until back on schedule.
+CATCH_UP = "catch_up"
+
+OVERRUN_POLICIES = (SKIP, CATCH_UP)
+
+# The number of recent ticks that the achieved rate is measured over.
+RATE_WINDOW = 100
+
+
+class TickScheduler:
+    """
+    Runs a tick function at a fixed rate, in real time. Ticks are scheduled on a fixed grid from the start,
+    so the rate doesn't drift with the time each tick takes (e.g. with the latency of the simulator).
+    Measures the achieved rate, how late each tick started (jitter), and the ticks that ran past their slot.
+    """
+    _starts: Deque[float]
+
+    def __init__(self, drone: SimDrone, tick: Tick, rate: float, overrun_policy: str = SKIP,
+                 with_lidars: bool = True):
+        """
+
+        :param drone: The drone to pass to the tick function.
+        :param tick: The function to run every tick, with the drone and a Snapshot of its state.
+        :param rate: The number of ticks per second.
+        :param overrun_policy: What to do when a tick takes longer than the period: SKIP or CATCH_UP.
+        :param with_lidars: Should the snapshots include the lidars?
+        """
+        if overrun_policy not in OVERRUN_POLICIES:
+            raise ValueError("overrun_policy must be one of %s, not %r." % (OVERRUN_POLICIES, overrun_policy))
+
+        self.drone = drone
+        self.tick = tick
+        self.rate = rate
+        self.period = 1 / rate
+        self.overrun_policy = overrun_policy
+        self.with_lidars = with_lidars
+
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self._jitter = Histogram()
+        self._tick_time = Histogram()
+        self._starts = collections.deque(maxlen=RATE_WINDOW)
+
+    def run(self, ticks: Optional[int] = None, before_tick: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+        """
+        Run the tick function until it returns False (or for a number of ticks).
+        :param ticks: The number of ticks to run. Leave 'None' to run until the tick function returns False.
+        :param before_tick: A function to call before every tick (e.g. to handle a pause request).
+         The time it takes (e.g. while paused) is not counted as lateness: the schedule starts over after it.
+        :return: The stats of the run (see get_stats).
+        """
+        next_time = time.monotonic()
+        while ticks is None or self.ticks < ticks:
+            if before_tick is not None:
+                before_start = time.monotonic()
+                before_tick()
+                if time.monotonic() - before_start > self.period:
+                    # E.g. after a pause, start a new schedule, and measure the rate from it.
+                    next_time = time.monotonic()
+                    with self._lock:
+                        self._starts.clear()
+
+            start = time.monotonic()
+            # noinspection PyProtectedMember
+            keep_running = self.tick(self.drone, self.drone._get_snapshot(self.with_lidars)) is not False
+            end = time.monotonic()
+
+            with self._lock:
+                self.ticks += 1
+                self._jitter.add(start - next_time)
+                self._tick_time.add(end - start)
+                self._starts.append(start)
+
+            if not keep_running:
+                break
+
+            next_time += self.period
+            if next_time < end:  # The tick ran past the start of the next one.
+                with self._lock:
+                    self.overruns += 1
+                    if self.overrun_policy == SKIP:
+                        missed = int((end - next_time) / self.period) + 1
+                        self.skipped += missed
+                        next_time += missed * self.period
+            time.sleep(max(0.0, next_time - time.monotonic()))
+
+        return self.get_stats()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Can be called while running, from any thread.
+        :return: A dictionary of 'ticks', 'target_rate' and 'rate' (the achieved ticks per second, over the recent
+         ticks), 'overruns' (ticks that ran past the start of the next one), 'skipped' (ticks dropped by the SKIP
+         policy), and 'jitter' (how late the ticks started) and 'tick_time' (how long the ticks took), each with its
+         'mean', 'p50', 'p95', 'p99', 'max' and 'histogram' (see Histogram.to_dict). All times are in seconds.
+        """
+        with self._lock:
+            rate = 0.0
+            if len(self._starts) > 1 and self._starts[-1] > self._starts[0]:
+                rate = (len(self._starts) - 1) / (self._starts[-1] - self._starts[0])
+            return {"ticks": self.ticks,
+                    "target_rate": self.rate,
+                    "rate": rate,
+                    "overruns": self.overruns,
+                    "skipped": self.skipped,
+                    "jitter": self._jitter.to_dict(),
+                    "tick_time": self._tick_time.to_dict()}
@@ -0,0 +1,217 @@
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# The side of a cell of the spatial index, in meters.
+DEFAULT_CELL_SIZE = 10.0
+# The rays are tested against the obstacles in chunks of at most this many ray-obstacle pairs, to bound the memory.
+CHUNK_PAIRS = 1 << 18
+# The height range of a wall (segment) that doesn't give one, in airsim's z (down is positive).
+DEFAULT_WALL_Z = (-100.0, 0.0)
+
+
+class World:
+    """
+    Static obstacles for the local simulator (see LocalSim): boxes, infinite planes and walls, in airsim's coordinates
+    (meters, x north, y east, z down). Rays are cast against all of them at once, with numpy, and a grid over x and y
+    limits the boxes and walls a batch of rays is tested against to the ones near the rays.
+
+    The file is JSON, e.g.:
+    {"boxes": [{"center": [10, 0, -1], "size": [2, 2, 2], "yaw": 45}, {"min": [0, 5, -3], "max": [20, 6, 0]}],
+     "planes": [{"point": [0, 0, -20], "normal": [0, 0, 1]}],
+     "segments": [{"start": [0, -2], "end": [30, -2], "z": [-5, 0]}]}
+    Boxes turn by their yaw (in degrees) around their center. Segments are walls along a line in x and y, between
+    two z values (from the ground up to 100 meters by default).
+    """
+
+    def __init__(self, boxes: Iterable[Dict[str, Any]] = (), planes: Iterable[Dict[str, Any]] = (),
+                 segments: Iterable[Dict[str, Any]] = (), cell_size: Optional[float] = DEFAULT_CELL_SIZE):
+        """
+
+        :param boxes: The boxes, in the file's format.
+        :param planes: The planes, in the file's format.
+        :param segments: The walls, in the file's format.
+        :param cell_size: The side of a cell of the spatial index, in meters. Leave 'None' to test every batch of rays
+         against all the obstacles.
+        """
+        boxes, planes, segments = list(boxes), list(planes), list(segments)
+
+        centers, half_sizes, yaws = [], [], []
+        for box in boxes:
+            if "center" in box:
+                center, size = np.asarray(box["center"], float), np.asarray(box["size"], float)
+            else:
+                low, high = np.asarray(box["min"], float), np.asarray(box["max"], float)
+                center, size = (low + high) / 2, high - low
+            centers.append(center)
+            half_sizes.append(np.abs(size) / 2)
+            yaws.append(math.radians(box.get("yaw", 0.0)))
+        self.box_centers = np.array(centers, dtype=float).reshape(-1, 3)
+        self.box_half_sizes = np.array(half_sizes, dtype=float).reshape(-1, 3)
+        self.box_cos = np.cos(yaws).reshape(-1)
+        self.box_sin = np.sin(yaws).reshape(-1)
+
+        self.plane_points = np.array([plane["point"] for plane in planes], dtype=float).reshape(-1, 3)
+        normals = np.array([plane["normal"] for plane in planes], dtype=float).reshape(-1, 3)
+        self.plane_normals = normals / np.linalg.norm(normals, axis=1, keepdims=True) if len(normals) else normals
+
+        self.segment_starts = np.array([segment["start"][:2] for segment in segments], dtype=float).reshape(-1, 2)
+        self.segment_ends = np.array([segment["end"][:2] for segment in segments], dtype=float).reshape(-1, 2)
+        z = np.array([segment.get("z", DEFAULT_WALL_Z) for segment in segments], dtype=float).reshape(-1, 2)
+        self.segment_z = np.sort(z, axis=1)
+
+        # The extent of every box and wall in x and y, for the index.
+        cos, sin = np.abs(self.box_cos), np.abs(self.box_sin)
+        half_x, half_y = self.box_half_sizes[:, 0], self.box_half_sizes[:, 1]
+        box_reach = np.stack((cos * half_x + sin * half_y, sin * half_x + cos * half_y), axis=1)
+        self._box_bounds = np.hstack((self.box_centers[:, :2] - box_reach, self.box_centers[:, :2] + box_reach))
+        self._segment_bounds = np.hstack((np.minimum(self.segment_starts, self.segment_ends),
+                                          np.maximum(self.segment_starts, self.segment_ends)))
+
+        self.cell_size = cell_size
+        self._box_cells = self._index(self._box_bounds)
+        self._segment_cells = self._index(self._segment_bounds)
+
+    @classmethod
+    def load(cls, path: str, cell_size: Optional[float] = DEFAULT_CELL_SIZE) -> "World":
+        """
+        Load a world from a JSON file (see World).
+        :param path: The path of the file.
+        :param cell_size: The side of a cell of the spatial index (see __init__).
+        :return: The world.
+        """
+        with open(path) as f:
+            return cls.from_dict(json.load(f), cell_size)
+
+    @classmethod
+    def from_dict(cls, world: Dict[str, Any], cell_size: Optional[float] = DEFAULT_CELL_SIZE) -> "World":
+        return cls(world.get("boxes", ()), world.get("planes", ()), world.get("segments", ()), cell_size)
+
+    def __len__(self) -> int:
+        """
+        :return: The number of obstacles.
+        """
+        return len(self.box_centers) + len(self.plane_points) + len(self.segment_starts)
+
+    def _index(self, bounds: np.ndarray) -> Optional[Dict[tuple, List[int]]]:
+        """
+        :param bounds: The x, y extent of every obstacle: min x, min y, max x, max y.
+        :return: The obstacles in every cell of the grid, by the cell's x and y index.
+        """
+        if self.cell_size is None:
+            return None
+        cells = {}
+        first, last = np.floor(bounds[:, :2] / self.cell_size), np.floor(bounds[:, 2:] / self.cell_size)
+        for i, ((x0, y0), (x1, y1)) in enumerate(zip(first.astype(int), last.astype(int))):
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    cells.setdefault((x, y), []).append(i)
+        return cells
+
+    def _near(self, cells: Optional[Dict[tuple, List[int]]], bounds: np.ndarray, low: np.ndarray,
+              high: np.ndarray) -> np.ndarray:
+        """
+        :return: The indices of the obstacles whose cells overlap the x, y area between low and high.
+        """
+        count = len(bounds)
+        if cells is None or count == 0 or not np.all(np.isfinite(low) & np.isfinite(high)):
+            return np.arange(count)
+
+        first, last = np.floor(low / self.cell_size).astype(int), np.floor(high / self.cell_size).astype(int)
+        if (last[0] - first[0] + 1) * (last[1] - first[1] + 1) > max(len(cells), count):
+            # Looking up the cells would take longer than testing the extent of every obstacle.
+            return np.nonzero(np.all(bounds[:, :2] <= high, axis=1) & np.all(bounds[:, 2:] >= low, axis=1))[0]
+
+        near = set()
+        for x in range(first[0], last[0] + 1):
+            for y in range(first[1], last[1] + 1):
+                near.update(cells.get((x, y), ()))
+        return np.fromiter(sorted(near), dtype=int, count=len(near))
+
+    def cast(self, origins: np.ndarray, directions: np.ndarray, max_range: float = np.inf) -> np.ndarray:
+        """
+        Cast a batch of rays against all the obstacles.
+        :param origins: The start of every ray, an array of shape (N, 3) (or (3,) for a shared start).
+        :param directions: The unit direction of every ray, of shape (N, 3).
+        :param max_range: Hits farther than this are ignored, which also lets the index skip far obstacles.
+        :return: The distance along every ray to its nearest hit, or inf where it hits nothing (within max_range).
+        """
+        directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+        origins = np.broadcast_to(np.asarray(origins, dtype=float), directions.shape)
+        distances = np.full(len(directions), np.inf)
+        if len(directions) == 0:
+            return distances
+
+        # The area the rays can reach, for the index.
+        if np.isfinite(max_range):
+            ends = origins + directions * max_range
+            low = np.minimum(origins.min(axis=0), ends.min(axis=0))[:2]
+            high = np.maximum(origins.max(axis=0), ends.max(axis=0))[:2]
+        else:
+            low, high = np.full(2, -np.inf), np.full(2, np.inf)
+
+        boxes = self._near(self._box_cells, self._box_bounds, low, high)
+        segments = self._near(self._segment_cells, self._segment_bounds, low, high)
+
+        for hits in (self._cast_planes(origins, directions),
+                     *self._chunks(self._cast_boxes, origins, directions, boxes),
+                     *self._chunks(self._cast_segments, origins, directions, segments)):
+            np.minimum(distances, hits, out=distances)
+
+        distances[distances > max_range] = np.inf
+        return distances
+
+    @staticmethod
+    def _chunks(cast, origins: np.ndarray, directions: np.ndarray, indices: np.ndarray):
+        """
+        Run a cast against the obstacles in chunks, so no more than CHUNK_PAIRS ray-obstacle pairs are in memory.
+        """
+        step = max(1, CHUNK_PAIRS // len(directions))
+        for start in range(0, len(indices), step):
+            yield cast(origins, directions, indices[start:start + step])
+
+    def _cast_planes(self, origins: np.ndarray, directions: np.ndarray) -> np.ndarray:
+        if len(self.plane_points) == 0:
+            return np.full(len(directions), np.inf)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.einsum("mj,nmj->nm", self.plane_normals, self.plane_points[None] - origins[:, None]) \
+                / (directions @ self.plane_normals.T)
+        return np.where(t >= 0, t, np.inf).min(axis=1)
+
+    def _cast_boxes(self, origins: np.ndarray, directions: np.ndarray, indices: Sequence[int]) -> np.ndarray:
+        cos, sin = self.box_cos[indices], self.box_sin[indices]
+        offsets = origins[:, None, :] - self.box_centers[indices][None]
+        # The rays in the frame of every box (turned back by its yaw).
+        local_origins = np.stack((cos * offsets[..., 0] + sin * offsets[..., 1],
+                                  -sin * offsets[..., 0] + cos * offsets[..., 1], offsets[..., 2]), axis=-1)
+        dx, dy, dz = directions[:, None, 0], directions[:, None, 1], directions[:, None, 2]
+        local_directions = np.stack((cos * dx + sin * dy, -sin * dx + cos * dy,
+                                     np.broadcast_to(dz, (len(directions), len(indices)))), axis=-1)
+
+        half = self.box_half_sizes[indices][None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t1 = (-half - local_origins) / local_directions
+            t2 = (half - local_origins) / local_directions
+        # A ray parallel to a pair of faces is between them (all t) or not (no t).
+        parallel = local_directions == 0
+        inside = np.abs(local_origins) <= half
+        t_near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2)).max(axis=2)
+        t_far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2)).min(axis=2)
+
+        hit = (t_far >= np.maximum(t_near, 0))
+        return np.where(hit, np.maximum(t_near, 0), np.inf).min(axis=1)
+
+    def _cast_segments(self, origins: np.ndarray, directions: np.ndarray, indices: Sequence[int]) -> np.ndarray:
+        starts, edges = self.segment_starts[indices], self.segment_ends[indices] - self.segment_starts[indices]
+        to_start = starts[None] - origins[:, None, :2]
+        dx, dy = directions[:, None, 0], directions[:, None, 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denominator = dx * edges[:, 1] - dy * edges[:, 0]
+            t = (to_start[..., 0] * edges[:, 1] - to_start[..., 1] * edges[:, 0]) / denominator
+            s = (to_start[..., 0] * dy - to_start[..., 1] * dx) / denominator
+            z = origins[:, None, 2] + t * directions[:, None, 2]
+        z_range = self.segment_z[indices]
+        hit = (t >= 0) & (s >= 0) & (s <= 1) & (z >= z_range[:, 0]) & (z <= z_range[:, 1])
+        return np.where(hit, t, np.inf).min(axis=1)
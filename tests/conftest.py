@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+# Run from any directory, without installing the package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# noinspection PyProtectedMember
+from simple_airsim.api.local_sim import _DEFAULT_LIDARS, LocalSim  # noqa: E402
+
+# A world with walls around the start, so the lidars measure real distances.
+WORLD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "worlds",
+                     "square_loop.json")
+
+
+@pytest.fixture
+def sim():
+    """
+    A local stand-in simulator on a free port, with its clock 10 times faster than real time.
+    """
+    with LocalSim(port=0, clock_speed=10) as sim:
+        yield sim
+
+
+@pytest.fixture
+def paused_sim():
+    """
+    A paused local stand-in simulator on a free port, in WORLD, for lockstep runs.
+    """
+    with LocalSim(port=0, paused=True, world=WORLD) as sim:
+        yield sim
+
+
+# Three vehicles, 5 meters apart, with the lidars of the repository's settings.json.
+FLEET = {"Vehicles": {name: {"X": 5.0 * i, "Sensors": _DEFAULT_LIDARS}
+                      for i, name in enumerate(("Drone1", "Drone2", "Drone3"))}}
+
+
+@pytest.fixture
+def fleet_sim():
+    """
+    Like sim, with the vehicles of FLEET.
+    """
+    with LocalSim(port=0, clock_speed=10, settings=FLEET) as sim:
+        yield sim
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.async_manager import AsyncManager
+from simple_airsim._utils.async_rpc import AsyncClient
+
+
+async def _fly_forever(drone, finished: list):
+    await drone.takeoff()
+    try:
+        await drone.move_by_velocity(2, 0, 0, 1000)
+    finally:
+        finished.append(True)
+
+
+def test_pause_resume_and_terminate(sim):
+    finished = []
+
+    async def run():
+        async with AsyncManager(coordinate_system.AIRSIM, client=AsyncClient(port=sim.port), method=_fly_forever,
+                                default_args=[finished]) as manager:
+            manager.start_algo()
+            await asyncio.sleep(0.5)
+            assert manager.get_algo_state() == 'running'
+
+            manager.pause_algo()
+            assert manager.get_algo_state() == 'paused'
+            manager.resume_algo()
+            assert manager.get_algo_state() == 'running'
+
+            await manager.terminate_algo()
+            assert manager.get_algo_state() == 'stopped'
+            # The command that the algorithm was waiting for is cancelled in the simulator too.
+            await asyncio.sleep(0.3)  # Hover brakes.
+            x = (await manager.get_position())['x']
+            await asyncio.sleep(0.3)
+            return x, (await manager.get_position())['x']
+
+    before, after = asyncio.run(run())
+    assert finished == [True]  # Its 'finally' ran.
+    assert after == pytest.approx(before, abs=0.1)
+
+
+def test_exit_closes_only_its_own_client(sim):
+    async def run():
+        client = AsyncClient(port=sim.port)
+        async with AsyncManager(coordinate_system.AIRSIM, client=client):
+            pass
+        # The caller's client is still connected.
+        # noinspection PyProtectedMember
+        assert client._writer is not None
+        assert await client.call("ping")
+        client.close()
+
+    asyncio.run(run())
+
+
+def test_getters_are_not_paused(sim):
+    async def run():
+        async with AsyncManager(coordinate_system.AIRSIM, client=AsyncClient(port=sim.port)) as manager:
+            manager.pause_algo()
+            return await asyncio.wait_for(asyncio.gather(manager.get_position(), manager.get_lidars(),
+                                                         manager.get_snapshot(True)), 5)
+
+    position, lidars, snapshot = asyncio.run(run())
+    assert snapshot.position == pytest.approx(position)
+    assert snapshot.lidars == lidars
@@ -0,0 +1,56 @@
+import asyncio
+
+import airsim
+import pytest
+from msgpackrpc.error import RPCError
+
+from simple_airsim._utils.async_rpc import AsyncClient, REQUESTS
+
+
+def test_requests_are_built_as_airsim_sends_them():
+    assert REQUESTS.getMultirotorState("Drone1") == ("getMultirotorState", ("Drone1",))
+    assert REQUESTS.enableApiControl(True) == ("enableApiControl", (True, ""))
+    assert REQUESTS.client.call_async("simPause", True) == ("simPause", (True,))
+
+
+def test_many_calls_at_once_on_one_connection(sim):
+    async def run():
+        client = AsyncClient(port=sim.port)
+        try:
+            results = await asyncio.gather(*(client.send(REQUESTS.getMultirotorState()) for _ in range(20)))
+            pong = await client.call("ping")
+        finally:
+            client.close()
+        return results, pong
+
+    results, pong = asyncio.run(run())
+    assert pong
+    assert len(results) == 20
+    for result in results:
+        assert isinstance(airsim.MultirotorState.from_msgpack(result), airsim.MultirotorState)
+
+
+def test_a_failed_call_raises_and_keeps_the_connection(sim):
+    async def run():
+        client = AsyncClient(port=sim.port)
+        try:
+            with pytest.raises(RPCError):
+                await client.call("noSuchMethod")
+            return await client.call("ping")
+        finally:
+            client.close()
+
+    assert asyncio.run(run())
+
+
+def test_a_closed_client_connects_again(sim):
+    async def run():
+        client = AsyncClient(port=sim.port)
+        await client.call("ping")
+        client.close()
+        try:
+            return await client.call("ping")
+        finally:
+            client.close()
+
+    assert asyncio.run(run())
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.async_sim_drone import AsyncSimDrone
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.sim_drone import SimDrone
+from simple_airsim._utils.async_rpc import AsyncClient
+
+
+def _run(sim, body, client: AsyncClient = None):
+    async def run():
+        drone = AsyncSimDrone(coordinate_system.AIRSIM, client=client or AsyncClient(port=sim.port))
+        try:
+            await drone.connect()
+            return await body(drone)
+        finally:
+            drone.client.close()
+
+    return asyncio.run(run())
+
+
+def test_commands_return_when_done(sim):
+    async def body(drone):
+        await drone.takeoff()
+        return await drone.get_position()
+
+    assert _run(sim, body)['z'] < -1
+
+
+def test_getters_run_at_once(sim):
+    async def body(drone):
+        return await asyncio.gather(drone.get_position(), drone.get_orientation(), drone.get_velocity(),
+                                    drone.get_snapshot(True))
+
+    position, orientation, velocity, snapshot = _run(sim, body)
+    assert set(position) == {'x', 'y', 'z'}
+    assert set(orientation) == {'roll', 'pitch', 'yaw'}
+    assert set(velocity) == {'x', 'y', 'z', 'roll', 'pitch', 'yaw'}
+    assert snapshot.position == pytest.approx(position)
+    assert set(snapshot.lidars) == set(SimDrone(coordinate_system.AIRSIM,
+                                                pool=ConnectionPool("", sim.port)).lidar_names.values())
+
+
+def test_get_lidars_reads_only_the_lidars(sim):
+    client = AsyncClient(port=sim.port)
+    methods = []
+    send = client.send
+
+    async def recording_send(request):
+        methods.append(request[0])
+        return await send(request)
+
+    client.send = recording_send
+
+    async def body(drone):
+        methods.clear()
+        return await drone.get_lidars()
+
+    lidars = _run(sim, body, client)
+    assert methods and set(methods) == {"getLidarData"}
+    assert lidars == SimDrone(coordinate_system.AIRSIM, pool=ConnectionPool("", sim.port)).get_lidars()
+
+
+def test_cancel_the_last_command(sim):
+    async def body(drone):
+        await drone.takeoff()
+        move = asyncio.ensure_future(drone.move_by_velocity(2, 0, 0, 100))
+        await asyncio.sleep(0.2)
+        # noinspection PyProtectedMember
+        await drone._cancel_last_command()
+        await asyncio.wait_for(move, 5)  # The simulator ends the command.
+        await asyncio.sleep(0.3)  # Hover brakes.
+        x = (await drone.get_position())['x']
+        await asyncio.sleep(0.3)
+        return x, (await drone.get_position())['x']
+
+    before, after = _run(sim, body)
+    assert after == pytest.approx(before, abs=0.1)
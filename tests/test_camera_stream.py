@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+import pytest
+
+from simple_airsim.api import camera_stream
+from simple_airsim.api.camera_stream import CameraStream
+
+
+class _FailingDrone:
+    """
+    Stands in for a SimDrone whose simulator fails the first captures (every capture by default).
+    """
+
+    def __init__(self, failures: float = float("inf")):
+        self.calls = 0
+        self.failures = failures
+
+    def _read_images(self, requests, default_alpha, out=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("the simulator is down")
+        return self.calls * 0.1, out if out is not None else [np.zeros((2, 2, 3), np.uint8)]
+
+
+def test_failed_captures_back_off_without_a_rate():
+    drone = _FailingDrone()
+    with CameraStream(drone, []):
+        time.sleep(camera_stream.ERROR_BACKOFF * 3)
+    assert 1 <= drone.calls <= 5
+
+
+def test_failed_capture_is_raised_by_the_readers():
+    stream = CameraStream(_FailingDrone(), [], rate=100)
+    with stream:
+        time.sleep(0.05)
+        with pytest.raises(ConnectionError):
+            stream.latest()
+    assert isinstance(stream.error, ConnectionError)
+
+
+def test_a_failed_capture_wakes_the_waiters():
+    stream = CameraStream(_FailingDrone(), [], rate=100)
+    with stream:
+        start = time.monotonic()
+        with pytest.raises(ConnectionError):
+            stream.at_or_after(0, timeout=5)
+        assert time.monotonic() - start < 1
+
+
+def test_a_successful_capture_clears_the_error():
+    stream = CameraStream(_FailingDrone(failures=2), [], rate=100)
+    with stream:
+        time.sleep(0.1)
+        assert stream.error is None
+        assert stream.latest().index > 0
+        assert stream.at_or_after(0, timeout=5).timestamp >= 0.3
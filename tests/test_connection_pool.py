@@ -0,0 +1,67 @@
+import threading
+
+import airsim
+import pytest
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.connection_pool import BULK, CONTROL, TELEMETRY, ConnectionPool
+from simple_airsim.api.local_sim import LocalSim
+from simple_airsim.api.sim_drone import SimDrone
+
+
+def test_missing_lanes_use_the_control_lane():
+    pool = ConnectionPool(lanes=(CONTROL, BULK))
+    assert pool.telemetry is pool.control
+    assert pool.lane("other") is pool.control
+    assert pool.bulk is not pool.control
+
+
+def test_lanes_connect_on_first_use(sim):
+    pool = ConnectionPool("", sim.port)
+    assert not any(lane.is_connected() for lane in pool.lanes.values())
+    assert pool.check_health() == {}  # Lanes that never connected are skipped.
+
+    pool.telemetry.client.getMultirotorState()
+    assert pool.telemetry.is_connected()
+    assert not pool.control.is_connected() and not pool.bulk.is_connected()
+    assert pool.check_health() == {TELEMETRY: True}
+    pool.close()
+
+
+def test_a_failed_health_check_reconnects_on_next_use():
+    with LocalSim(port=0) as sim:
+        port = sim.port
+        pool = ConnectionPool("", port)
+        assert pool.control.client.ping()
+
+    # The simulator is gone: the lane disconnects.
+    assert pool.check_health(timeout=0.2) == {CONTROL: False}
+    assert not pool.control.is_connected()
+
+    # And connects again once the simulator is back.
+    with LocalSim(port=port):
+        assert pool.control.client.ping()
+        assert pool.check_health() == {CONTROL: True}
+    pool.close()
+
+
+def test_from_client_uses_the_client_for_every_lane(sim):
+    client = airsim.MultirotorClient("", sim.port)
+    lock = threading.RLock()
+    pool = ConnectionPool.from_client(client, lock)
+    assert list(pool.lanes) == [CONTROL]
+    assert pool.control.client is client
+    assert pool.control.lock is lock
+    assert pool.telemetry is pool.control and pool.bulk is pool.control
+
+
+def test_a_drone_takes_either_a_client_or_a_pool(sim):
+    client = airsim.MultirotorClient("", sim.port)
+    with pytest.raises(ValueError):
+        SimDrone(coordinate_system.AIRSIM, client=client, pool=ConnectionPool("", sim.port))
+    with pytest.raises(ValueError):
+        SimDrone(coordinate_system.AIRSIM, lock=threading.RLock(), pool=ConnectionPool("", sim.port))
+
+    lock = threading.RLock()
+    drone = SimDrone(coordinate_system.AIRSIM, client=client, lock=lock)
+    assert drone.lock is lock
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.coordinate_system import CoordinateSystem
+
+FLU = CoordinateSystem(pos_matrix=np.diag([1, -1, -1]), pos_offset=(1, 2, 3), ori_matrix=np.diag([1, -1, -1]),
+                       name="FLU")
+ROTATED = CoordinateSystem(pos_matrix=[[0, -1, 0], [1, 0, 0], [0, 0, 1]], pos_offset=(5, 0, -1), name="ROTATED")
+
+
+class SwappedXY(CoordinateSystem):
+    """
+    A system defined the old way, by overriding the scalar methods.
+    """
+
+    def fa_pos(self, x, y, z):
+        return y, x, z
+
+    def ta_pos(self, x, y, z):
+        return y, x, z
+
+    def fa_ori(self, r, p, y):
+        return p, r, y
+
+    def ta_ori(self, r, p, y):
+        return p, r, y
+
+
+POINTS = np.random.default_rng(0).uniform(-100, 100, (20, 3))
+
+
+@pytest.mark.parametrize("system", [coordinate_system.AIRSIM, coordinate_system.DJI, FLU, ROTATED, SwappedXY()],
+                         ids=repr)
+@pytest.mark.parametrize("name", ["fa_pos", "ta_pos", "fa_dir", "ta_dir", "fa_ori", "ta_ori"])
+def test_batch_matches_scalar(system, name):
+    batch = getattr(system, name + "_batch")(POINTS)
+    scalar = [getattr(system, name)(*point) for point in POINTS.tolist()]
+    np.testing.assert_allclose(batch, scalar, atol=1e-9)
+
+
+@pytest.mark.parametrize("system", [coordinate_system.DJI, FLU, ROTATED, SwappedXY()], ids=repr)
+def test_ta_inverts_fa(system):
+    for x, y, z in POINTS.tolist():
+        np.testing.assert_allclose(system.ta_pos(*system.fa_pos(x, y, z)), (x, y, z), atol=1e-9)
+        np.testing.assert_allclose(system.ta_ori(*system.fa_ori(x, y, z)), (x, y, z), atol=1e-9)
+        np.testing.assert_allclose(system.ta_dir(*system.fa_dir(x, y, z)), (x, y, z), atol=1e-9)
+
+
+def test_scalar_methods_match_the_matrices():
+    assert FLU.fa_pos(1, 2, 3) == (2, 0, 0)
+    assert FLU.ta_pos(2, 0, 0) == (1, 2, 3)
+    assert FLU.fa_dir(1, 2, 3) == (1, -2, -3)
+    assert coordinate_system.DJI.fa_ori(10, 20, 30) == (10, -20, -30)
+    assert ROTATED.fa_pos(1, 2, 3) == (3, 1, 2)
+
+
+def test_overridden_scalar_methods_are_used_everywhere():
+    system = SwappedXY()
+    assert system.ta_pos(1, 2, 3) == (2, 1, 3)
+    assert system.ta_dir(1, 2, 3) == (2, 1, 3)
+    assert system.fa_dir(1, 2, 3) == (2, 1, 3)
+    np.testing.assert_array_equal(system.fa_pos_batch([[1, 2, 3]]), [[2, 1, 3]])
+    np.testing.assert_array_equal(system.fa_pos_batch(np.empty((0, 3))), np.empty((0, 3)))
+
+
+def test_to_converts_between_systems():
+    transform = FLU.to(ROTATED)
+    assert FLU.to(ROTATED) is transform
+    for point in POINTS.tolist():
+        np.testing.assert_allclose(transform.fa_pos(*point), ROTATED.fa_pos(*FLU.ta_pos(*point)), atol=1e-9)
+
+
+def test_to_refuses_overridden_systems():
+    with pytest.raises(NotImplementedError):
+        FLU.to(SwappedXY())
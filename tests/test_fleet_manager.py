@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.fleet_manager import FleetManager
+
+NAMES = ["Drone1", "Drone2", "Drone3"]
+
+
+def _fleet(sim, method=None, connections=2) -> FleetManager:
+    return FleetManager(coordinate_system.AIRSIM, NAMES, method=method, connections=connections, port=sim.port)
+
+
+def _fly_forever(drone):
+    drone.takeoff(wait=True)
+    drone.move_by_velocity(1, 0, 0, 1000, wait=True)
+
+
+def _send_and_return(drone):
+    drone.takeoff(wait=True)
+    drone.move_by_velocity(1, 0, 0, 1000)  # Still running after the algorithm ends.
+
+
+@pytest.mark.parametrize("connections, expected", [(1, [NAMES]), (2, [["Drone1", "Drone3"], ["Drone2"]]),
+                                                   (5, [["Drone1"], ["Drone2"], ["Drone3"]])])
+def test_vehicles_are_split_across_pools(fleet_sim, connections, expected):
+    fleet = _fleet(fleet_sim, connections=connections)
+    assert len(fleet.pools) == len(expected)
+    # noinspection PyProtectedMember
+    assert fleet._vehicles_of == expected
+    for pool, names in zip(fleet.pools, expected):
+        for name in names:
+            assert fleet[name].get_airsim_client() is pool.control.client
+
+
+def test_get_snapshots_reads_every_vehicle(fleet_sim):
+    fleet = _fleet(fleet_sim)
+    snapshots = fleet.get_snapshots(with_lidars=True)
+
+    assert sorted(snapshots) == NAMES
+    for name in NAMES:
+        assert snapshots[name].position == fleet[name].get_position()
+    assert [snapshots[name].position['x'] for name in NAMES] == [0, 5, 10]
+    assert fleet.get_positions() == {name: snapshots[name].position for name in NAMES}
+
+
+def _x_speeds(fleet: FleetManager):
+    before = {name: position['x'] for name, position in fleet.get_positions().items()}
+    time.sleep(0.1)
+    return {name: position['x'] - before[name] for name, position in fleet.get_positions().items()}
+
+
+@pytest.mark.parametrize("method", [_fly_forever, _send_and_return])
+def test_terminate_stops_every_vehicle(fleet_sim, method):
+    fleet = _fleet(fleet_sim, method=method)
+    fleet.start_algo()
+    time.sleep(0.6)
+    assert all(speed > 0.5 for speed in _x_speeds(fleet).values())
+
+    assert fleet.terminate_algo()
+    assert fleet.get_algo_states() == {name: 'stopped' for name in NAMES}
+    time.sleep(0.1)  # Let the vehicles stop.
+    assert all(speed == pytest.approx(0, abs=0.05) for speed in _x_speeds(fleet).values())
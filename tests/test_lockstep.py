@@ -0,0 +1,27 @@
+import pytest
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.lockstep import Lockstep
+from simple_airsim.api.sim_drone import SimDrone
+
+
+def test_every_step_advances_the_simulator_by_dt(paused_sim):
+    drone = SimDrone(coordinate_system.AIRSIM, pool=ConnectionPool("", paused_sim.port))
+    timestamps = []
+
+    def tick(d, snapshot):
+        timestamps.append(snapshot.timestamp)
+        assert d.pause_sim_state()  # The simulator stays paused during the tick.
+        d.move_by_velocity(1, 0, 0, 1)
+
+    stats = Lockstep(drone, tick, 0.05).run(20)
+
+    assert [b - a for a, b in zip(timestamps, timestamps[1:])] == pytest.approx([0.05] * 19, abs=1e-3)
+    assert stats["steps"] == 20
+    assert stats["sim_time"] == pytest.approx(19 * 0.05, abs=1e-3)
+    assert stats["wall_time"] > 0
+    assert stats["sim_wall_ratio"] == pytest.approx(stats["sim_time"] / stats["wall_time"])
+    assert 0 < stats["tick_time"] < stats["wall_time"]
+    # The simulator was paused to begin with, so it stays paused.
+    assert drone.pause_sim_state()
@@ -0,0 +1,168 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from simple_airsim.api import binary_log, coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.lockstep import Lockstep
+from simple_airsim.api.logwriter import DEFAULT_SNAPSHOT_VALUES, LogWriter
+from simple_airsim.api.manager import Manager
+from simple_airsim.api.snapshot import Snapshot
+
+
+class _FakeManager:
+    """
+    Serves a Snapshot that moves 1 meter in x per read, and can be made slow or failing.
+    """
+
+    def __init__(self, delay: float = 0.0, fail_after: int = None):
+        self.reads = 0
+        self.delay = delay
+        self.fail_after = fail_after
+        self.lock = threading.Lock()
+
+    def get_snapshot(self, with_lidars: bool = False) -> Snapshot:
+        with self.lock:
+            self.reads += 1
+            reads = self.reads
+        if self.fail_after is not None and reads > self.fail_after:
+            raise ConnectionError("the simulator is down")
+        time.sleep(self.delay)
+        lidars = {name: 1.0 for name in ("up", "down", "front", "back", "right", "left")}
+        return Snapshot(reads * 0.1, {"x": float(reads), "y": 0.0, "z": 0.0}, {"roll": 0.0, "pitch": 0.0, "yaw": 0.0},
+                        {"x": 1.0, "y": 0.0, "z": 0.0, "roll": 0.0, "pitch": 0.0, "yaw": 0.0},
+                        {"has_collided": False}, lidars)
+
+    def get_position(self):
+        return dict(self.get_snapshot().position)
+
+
+def _read_csv(filename):
+    with open(filename) as file:
+        columns = [name.strip() for name in file.readline().split(",")]
+        return columns, [[float(x) for x in line.split(",")] for line in file if line.strip()]
+
+
+def test_every_read_row_is_written(tmp_path):
+    # A slow read keeps the reader inside write() when the log is stopped.
+    man = _FakeManager(delay=0.02)
+    filename = str(tmp_path / "log.csv")
+    with LogWriter(man, filename=filename, t_delta_time=0.001) as log:
+        time.sleep(0.2)
+
+    stats = log.get_stats()
+    columns, rows = _read_csv(filename)
+    assert columns == list(DEFAULT_SNAPSHOT_VALUES.keys())
+    assert stats["queued"] == 0
+    assert stats["written"] == len(rows) == man.reads - stats["dropped"]
+
+
+def test_errors_of_the_reader_are_raised(tmp_path):
+    man = _FakeManager(fail_after=3)
+    filename = str(tmp_path / "log.csv")
+    with pytest.raises(ConnectionError):
+        with LogWriter(man, filename=filename, t_delta_time=0.001):
+            time.sleep(0.1)
+
+    # The rows before the error are still written.
+    assert len(_read_csv(filename)[1]) == 3
+
+
+def test_a_stopped_log_starts_again(tmp_path):
+    man = _FakeManager()
+    filename = str(tmp_path / "log.csv")
+    log = LogWriter(man, filename=filename, t_delta_time=0.01)
+    for _ in range(2):
+        log.start()
+        with pytest.raises(RuntimeError):
+            log.start()
+        time.sleep(0.1)
+        log.stop_thread()
+
+    # Both runs are in the same file, under a single header.
+    columns, rows = _read_csv(filename)
+    assert columns == list(DEFAULT_SNAPSHOT_VALUES.keys())
+    assert len(rows) == log.get_stats()["written"] == man.reads
+    assert [row[1] for row in rows] == list(range(1, man.reads + 1))
+
+
+def test_values_take_the_manager(tmp_path):
+    man = _FakeManager()
+    filename = str(tmp_path / "log.csv")
+    log = LogWriter(man, values={"x": lambda m: m.get_position()["x"]}, filename=filename, use_thread=False)
+    log.write()
+    log.write()
+    log.stop_thread()
+
+    assert _read_csv(filename) == (["x"], [[1.0], [2.0]])
+
+
+def test_snapshot_values_and_values_share_a_row(tmp_path):
+    man = _FakeManager()
+    filename = str(tmp_path / "log.salog")
+    log = LogWriter(man, values={"reads": lambda m: m.reads}, filename=filename, use_thread=False,
+                    file_format="binary", snapshot_values={"sim_time": lambda snap: snap.timestamp})
+    for _ in range(3):
+        log.write()
+    log.stop_thread()
+
+    columns = binary_log.read(filename)
+    assert list(columns.keys()) == ["sim_time", "reads"]
+    assert columns["sim_time"].tolist() == pytest.approx([0.1, 0.2, 0.3])
+    assert columns["reads"].tolist() == [1, 2, 3]
+
+
+def _log_a_flight(sim, csv_filename: str, binary_filename: str, steps: int = 20):
+    """
+    Log the same rows of a lockstep flight to a CSV and a binary log: the simulator is paused while both read.
+    """
+    manager = Manager(coordinate_system.AIRSIM, pool=ConnectionPool("", sim.port))
+    # Without the wall-clock time, which differs between the two reads.
+    values = {name: value for name, value in DEFAULT_SNAPSHOT_VALUES.items() if name != "time"}
+    logs = [LogWriter(manager, filename=csv_filename, use_thread=False, snapshot_values=values),
+            LogWriter(manager, filename=binary_filename, use_thread=False, snapshot_values=values,
+                      file_format="binary")]
+
+    def tick(drone, snapshot):
+        for log in logs:
+            log.write()
+        drone.move_by_velocity(2, 1, -1, 1)
+
+    # noinspection PyProtectedMember
+    Lockstep(manager._drone, tick, 0.05).run(steps)
+    for log in logs:
+        log.stop_thread()
+
+
+def test_csv_and_binary_logs_of_a_flight_match(paused_sim, tmp_path):
+    csv_filename, binary_filename = str(tmp_path / "log.csv"), str(tmp_path / "log.salog")
+    _log_a_flight(paused_sim, csv_filename, binary_filename)
+
+    with open(csv_filename) as file:
+        columns = [name.strip() for name in file.readline().split(",")]
+        rows = [[binary_log._csv_value(x) for x in line.split(",")] for line in file]
+    binary = binary_log.read(binary_filename)
+
+    assert columns == list(binary.keys()) == [name for name in DEFAULT_SNAPSHOT_VALUES if name != "time"]
+    assert len(rows) == 20
+    np.testing.assert_array_equal(np.array(rows), np.column_stack(list(binary.values())))
+    # The drone flew, and the walls are in range of the lidars.
+    assert binary["x"][-1] > binary["x"][0]
+    assert np.isfinite(binary["front"]).all()
+
+
+def test_conversions_round_trip(paused_sim, tmp_path):
+    csv_filename, binary_filename = str(tmp_path / "log.csv"), str(tmp_path / "log.salog")
+    _log_a_flight(paused_sim, csv_filename, binary_filename)
+
+    binary_log.csv_to_binary(csv_filename, str(tmp_path / "converted.salog"))
+    binary_log.binary_to_csv(binary_filename, str(tmp_path / "converted.csv"))
+
+    binary, converted = binary_log.read(binary_filename), binary_log.read(str(tmp_path / "converted.salog"))
+    assert list(converted.keys()) == list(binary.keys())
+    for name in binary:
+        np.testing.assert_array_equal(converted[name], binary[name])
+    with open(csv_filename) as original, open(str(tmp_path / "converted.csv")) as converted_csv:
+        assert converted_csv.read() == original.read()
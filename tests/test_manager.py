@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.local_sim import LocalSim
+from simple_airsim.api.manager import Manager
+
+
+def _manager(sim: LocalSim, **kwargs) -> Manager:
+    return Manager(coordinate_system.AIRSIM, pool=ConnectionPool("", sim.port), **kwargs)
+
+
+def _fly_forever(drone, finished: list):
+    drone.takeoff(wait=True)
+    try:
+        drone.move_by_velocity(1, 0, 0, 1000, wait=True)
+    finally:
+        finished.append(True)
+
+
+def test_pause_holds_a_waiting_command_and_resume_sends_it_again(sim):
+    manager = _manager(sim, method=_fly_forever, default_args=[[]])
+    manager.start_algo()
+    time.sleep(0.5)
+    assert manager.get_algo_state() == 'running'
+
+    manager.pause_algo()
+    time.sleep(0.1)
+    assert manager.get_algo_state() == 'paused'
+    x = manager.get_position()['x']
+    time.sleep(0.2)
+    assert manager.get_position()['x'] == pytest.approx(x, abs=0.05)
+
+    manager.resume_algo()
+    time.sleep(0.2)
+    assert manager.get_algo_state() == 'running'
+    assert manager.get_position()['x'] > x + 0.5
+    assert manager.terminate_algo()
+
+
+def test_terminate_stops_a_waiting_algorithm(sim):
+    finished = []
+    manager = _manager(sim, method=_fly_forever, default_args=[finished])
+    manager.start_algo()
+    time.sleep(0.5)
+
+    start = time.monotonic()
+    assert manager.terminate_algo()
+    assert time.monotonic() - start < 0.5
+    assert manager.get_algo_state() == 'stopped'
+    assert finished == [True]  # Its 'finally' ran.
+
+    # It can run again right away.
+    manager.start_algo()
+    time.sleep(0.2)
+    assert manager.get_algo_state() == 'running'
+    assert manager.terminate_algo()
+
+
+def test_start_refuses_while_a_terminated_run_is_stopping(sim):
+    release = threading.Event()
+    runs = []
+
+    def algorithm(drone):
+        runs.append(drone)
+        release.wait(5)  # Never calls the drone, so it can't be stopped until released.
+
+    manager = _manager(sim, method=algorithm)
+    manager.start_algo()
+    assert not manager.terminate_algo(timeout=0.05)
+    assert manager.get_algo_state() == 'stopping'
+    with pytest.raises(RuntimeError):
+        manager.start_algo()
+
+    release.set()
+    assert manager.terminate_algo(None)
+    assert manager.get_algo_state() == 'stopped'
+
+    release.clear()
+    manager.start_algo()
+    assert manager.get_algo_state() == 'running'
+    release.set()
+    manager.algo_thread.join(5)
+    assert len(runs) == 2
+
+
+def test_lockstep_tick_stats(paused_sim):
+    steps = []
+
+    def tick(drone, snapshot):
+        steps.append(snapshot.timestamp)
+        return len(steps) < 10
+
+    manager = _manager(paused_sim, tick=tick, lockstep_dt=0.05)
+    assert manager.get_tick_stats() == {}
+    manager.start_algo()
+    manager.algo_thread.join(10)
+
+    stats = manager.get_tick_stats()
+    assert len(steps) == 10
+    assert stats["steps"] == 9  # The last tick asked to stop, so the simulator didn't advance after it.
+    assert stats["sim_time"] == pytest.approx(0.45, abs=1e-3)
@@ -0,0 +1,63 @@
+import pytest
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.lockstep import Lockstep
+from simple_airsim.api.recording import RecordingClient, ReplayClient, ReplayFinished, read
+from simple_airsim.api.sim_drone import SimDrone
+
+STEPS = 30
+
+
+def _fly(client, speed: float = 1.0):
+    """
+    :return: The position and the lidars of every step of a lockstep flight.
+    """
+    drone = SimDrone(coordinate_system.AIRSIM, client=client)
+    drone.enable_api_control(True)
+    readings = []
+
+    def tick(d, snapshot):
+        readings.append((snapshot.timestamp, dict(snapshot.position), dict(snapshot.lidars)))
+        d.move_by_velocity(speed, 0, 0, 1)
+
+    Lockstep(drone, tick, 0.05).run(STEPS)
+    return readings
+
+
+def _record(sim, path: str):
+    with RecordingClient(path, port=sim.port) as client:
+        return _fly(client)
+
+
+def test_replay_returns_the_recorded_readings(paused_sim, tmp_path):
+    path = str(tmp_path / "run.rec")
+    recorded = _record(paused_sim, path)
+
+    client = ReplayClient(path, speed=None)
+    assert _fly(client) == recorded
+    stats = client.get_stats()
+    # The last command was still running when the recording closed, so it has no recorded response.
+    assert stats["matched"] == len(read(path)) == stats["calls"] - 1
+    assert stats["missing"] == 1
+    assert stats["unmatched"] == stats["left"] == 0
+
+
+def test_changed_commands_get_the_response_of_their_method(paused_sim, tmp_path):
+    path = str(tmp_path / "run.rec")
+    recorded = _record(paused_sim, path)
+
+    client = ReplayClient(path, speed=None)
+    assert _fly(client, speed=2.0) == recorded  # The readings come from the recording, whatever the commands.
+    stats = client.get_stats()
+    assert stats["unmatched"] == STEPS - 1
+    assert stats["missing"] == 1  # The last command (see test_replay_returns_the_recorded_readings).
+
+
+def test_replay_raises_when_the_recording_ends(paused_sim, tmp_path):
+    path = str(tmp_path / "run.rec")
+    _record(paused_sim, path)
+
+    client = ReplayClient(path, speed=None)
+    _fly(client)
+    with pytest.raises(ReplayFinished):
+        client.getMultirotorState()
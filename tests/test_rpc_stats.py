@@ -0,0 +1,57 @@
+import airsim
+import pytest
+from msgpackrpc.error import RPCError
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.connection_pool import TELEMETRY, ConnectionPool
+from simple_airsim.api.manager import Manager
+from simple_airsim._utils import rpc
+
+
+def test_manager_stats_count_every_call(sim):
+    manager = Manager(coordinate_system.AIRSIM, pool=ConnectionPool("", sim.port), collect_stats=True)
+    lidars = len(manager.get_lidars())
+    manager.stats.reset()
+    for _ in range(3):
+        manager.get_position()
+    for _ in range(2):
+        manager.get_lidars()
+    with pytest.raises(RPCError):
+        manager.get_airsim_client().client.call("noSuchMethod")
+
+    stats = manager.get_stats()
+    methods = stats["methods"]
+    assert methods["simGetVehiclePose"]["count"] == 3
+    assert methods["getLidarData"]["count"] == 2 * lidars
+    assert methods["noSuchMethod"]["errors"] == 1
+    for method in methods.values():
+        assert method["bytes_sent"] > 0 and method["bytes_received"] > 0
+        assert 0 < method["p50"] <= method["max"]
+    # Every getter takes the lock of the telemetry lane.
+    assert stats["lock_waits"][TELEMETRY]["count"] >= 5
+    assert stats["rpc_time"] == pytest.approx(sum(method["total"] for method in methods.values()))
+
+
+def test_disabled_stats_record_nothing(sim):
+    pool = ConnectionPool("", sim.port)
+    stats = pool.enable_stats()
+    pool.telemetry.client.getMultirotorState()
+    pool.disable_stats()
+    pool.telemetry.client.getMultirotorState()
+    assert stats.to_dict()["methods"]["getMultirotorState"]["count"] == 1
+
+
+def test_trace_passes_every_call_and_response(sim):
+    client = airsim.MultirotorClient("", sim.port)
+    calls = []
+    remove = rpc.trace(client.client, lambda method, args, start, end, error, result:
+                       calls.append((method, args, end >= start, error, result)))
+    assert client.ping()
+    client.getMultirotorState("")
+    remove()
+    client.ping()
+
+    assert [call[0] for call in calls] == ["ping", "getMultirotorState"]
+    assert calls[0][1:] == ((), True, None, True)
+    assert calls[1][1] == ("",)
+    assert isinstance(calls[1][4], dict)
@@ -0,0 +1,128 @@
+import threading
+
+import numpy as np
+import pytest
+
+from simple_airsim.api import camera_config, connection_pool, coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.sim_drone import SimDrone
+
+
+def _drone(sim) -> SimDrone:
+    return SimDrone(coordinate_system.AIRSIM, pool=ConnectionPool("", sim.port))
+
+
+def test_a_shared_pool_enables_api_control(sim):
+    drone = _drone(sim)
+    assert drone.client.isApiControlEnabled("")
+
+
+def test_wait_for_a_command(sim):
+    drone = _drone(sim)
+    handle = drone.takeoff()
+    assert not handle.done()
+    assert handle.wait(10)
+    assert handle.done()
+    assert drone.get_position()['z'] < -1
+
+
+def test_wait_times_out_while_the_command_runs(sim):
+    drone = _drone(sim)
+    drone.takeoff(wait=True)
+    handle = drone.move_by(0, 0, -2)
+    assert not handle.wait(0.01)
+    assert handle.wait(10)
+
+
+def test_cancel_a_running_command(sim):
+    drone = _drone(sim)
+    drone.takeoff(wait=True)
+    handle = drone.move_by_velocity(1, 0, 0, 100)
+    assert handle.cancel()
+    assert handle.cancelled()
+    assert handle.done()
+    # A finished command can't be cancelled.
+    assert not handle.cancel()
+
+
+def test_done_callback_runs_when_the_command_finishes(sim):
+    drone = _drone(sim)
+    finished = threading.Event()
+    handle = drone.move_by_velocity(1, 0, 0, 1)
+    handle.add_done_callback(lambda h: finished.set())
+    assert finished.wait(5)
+    assert handle.done()
+
+    # Added after the command finished, it runs right away.
+    called = []
+    handle.add_done_callback(called.append)
+    assert called == [handle]
+
+
+VISUAL = camera_config.ImageType.VISUAL
+
+
+def _requests(return_type=camera_config.ReturnType.RGB):
+    return [camera_config.ImageRequest(camera, VISUAL, return_type) for camera in ("0", "1", "2")]
+
+
+def test_get_images_match_get_image(paused_sim):
+    drone = _drone(paused_sim)
+    ims = drone.get_images(_requests())
+
+    assert [im.shape for im in ims] == [(144, 256, 3)] * 3
+    for camera, im in zip(("0", "1", "2"), ims):
+        # Both are lossless, so the uncompressed image is the decoded PNG, pixel for pixel.
+        np.testing.assert_array_equal(im, drone.get_image(camera, VISUAL, camera_config.ReturnType.RGB))
+
+
+def test_get_images_return_types(paused_sim):
+    drone = _drone(paused_sim)
+    rgb, = drone.get_images(_requests()[:1])
+    bgr, = drone.get_images(_requests(camera_config.ReturnType.BGR)[:1])
+    rgba, = drone.get_images(_requests(camera_config.ReturnType.RGB_A)[:1], default_alpha=7)
+
+    np.testing.assert_array_equal(bgr, rgb[:, :, ::-1])
+    np.testing.assert_array_equal(rgba[:, :, :3], rgb)
+    assert (rgba[:, :, 3] == 7).all()
+
+
+@pytest.mark.parametrize("return_type", list(camera_config.ReturnType))
+def test_get_images_write_into_out(paused_sim, return_type):
+    drone = _drone(paused_sim)
+    expected = drone.get_images(_requests(return_type))
+    out = [np.zeros_like(im) for im in expected]
+
+    ims = drone.get_images(_requests(return_type), out=out)
+
+    for im, buffer, expected_im in zip(ims, out, expected):
+        assert im is buffer
+        np.testing.assert_array_equal(im, expected_im)
+
+
+def test_get_images_float(paused_sim):
+    drone = _drone(paused_sim)
+    requests = [camera_config.ImageRequest("0", camera_config.ImageType.DEPTH_PERSPECTIVE, as_float=True),
+                camera_config.ImageRequest("0", camera_config.ImageType.DEPTH_PLANAR, as_float=True)]
+    perspective, planar = drone.get_images(requests)
+
+    assert perspective.dtype == planar.dtype == np.float32
+    assert perspective.shape == planar.shape == (144, 256)
+    # The distance to the camera's plane is never more than the distance to the camera.
+    assert (planar <= perspective + 1e-3).all()
+    assert (planar < perspective - 1e-3).any()
+
+    out = [np.zeros_like(perspective), np.zeros_like(planar)]
+    ims = drone.get_images(requests, out=out)
+    assert ims[0] is out[0] and ims[1] is out[1]
+    np.testing.assert_array_equal(out[0], perspective)
+    np.testing.assert_array_equal(out[1], planar)
+
+
+def test_bulk_lane_reads_large_chunks(sim):
+    drone = _drone(sim)
+    drone.get_images(_requests())
+    # noinspection PyProtectedMember
+    sockets = drone.pool.bulk.client.client._transport._sockets
+    # noinspection PyProtectedMember
+    assert [sock._stream.read_chunk_size for sock in sockets] == [connection_pool.BULK_READ_CHUNK_SIZE]
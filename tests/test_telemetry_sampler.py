@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from simple_airsim.api.snapshot import Snapshot
+from simple_airsim.api.telemetry_sampler import TelemetrySampler
+
+
+def _snapshot(timestamp: float = 0.0) -> Snapshot:
+    return Snapshot(timestamp, {"x": 0, "y": 0, "z": 0}, {"roll": 0, "pitch": 0, "yaw": 0},
+                    {"x": 0, "y": 0, "z": 0, "roll": 0, "pitch": 0, "yaw": 0}, {"has_collided": False})
+
+
+def test_get_returns_the_latest_reading():
+    readings = iter(range(1000000))
+    with TelemetrySampler(lambda: _snapshot(next(readings)), 200) as sampler:
+        first = sampler.get()
+        time.sleep(0.05)
+        assert sampler.get(max_age=0.05).timestamp > first.timestamp
+
+
+def test_get_raises_the_error_of_a_failed_reading():
+    def read():
+        raise ConnectionError("the simulator is down")
+
+    with TelemetrySampler(read, 200) as sampler:
+        with pytest.raises(ConnectionError):
+            sampler.get(timeout=1)
+
+
+def test_get_recovers_after_a_failed_reading():
+    failures = [True, True]
+
+    def read():
+        if failures:
+            failures.pop()
+            raise ConnectionError("the simulator is down")
+        return _snapshot()
+
+    with TelemetrySampler(read, 200) as sampler:
+        time.sleep(0.1)
+        assert sampler.get(timeout=1) is not None
+        assert sampler.error is None
+
+
+def test_get_times_out_without_a_fresh_reading():
+    def read():
+        time.sleep(0.2)
+        return _snapshot()
+
+    with TelemetrySampler(read, 100) as sampler:
+        sampler.get(timeout=1)
+        time.sleep(0.02)
+        with pytest.raises(TimeoutError):
+            sampler.get(max_age=0.01, timeout=0.05)
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from simple_airsim.api import coordinate_system
+from simple_airsim.api.connection_pool import ConnectionPool
+from simple_airsim.api.sim_drone import SimDrone
+from simple_airsim.api.tick_scheduler import CATCH_UP, SKIP, TickScheduler
+
+
+def _drone(sim) -> SimDrone:
+    return SimDrone(coordinate_system.AIRSIM, pool=ConnectionPool("", sim.port))
+
+
+def test_ticks_run_at_the_rate(sim):
+    stats = TickScheduler(_drone(sim), lambda d, snapshot: None, 50).run(25)
+
+    assert stats["ticks"] == 25
+    assert stats["target_rate"] == 50
+    assert stats["rate"] == pytest.approx(50, rel=0.3)
+    # LocalSim runs in the same process, so a tick can be held up by its physics now and then.
+    assert stats["overruns"] <= 5
+    for name in ("jitter", "tick_time"):
+        assert set(stats[name]) >= {"mean", "p50", "p95", "p99", "max", "histogram"}
+
+
+def test_tick_returning_false_stops_the_run(sim):
+    ticks = []
+    stats = TickScheduler(_drone(sim), lambda d, snapshot: ticks.append(snapshot) or len(ticks) < 3, 100).run()
+    assert stats["ticks"] == len(ticks) == 3
+
+
+@pytest.mark.parametrize("policy, skipped", [(SKIP, True), (CATCH_UP, False)])
+def test_overruns(sim, policy, skipped):
+    def slow(d, snapshot):
+        time.sleep(0.025)  # Longer than the period, 10 ms.
+
+    stats = TickScheduler(_drone(sim), slow, 100, policy).run(5)
+
+    assert stats["overruns"] >= 4
+    assert (stats["skipped"] > 0) == skipped
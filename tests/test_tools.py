@@ -0,0 +1,74 @@
+import math
+
+import airsim
+import numpy as np
+import pytest
+
+# noinspection PyProtectedMember
+from simple_airsim._utils import tools
+
+COUNT = 1000
+
+
+def _loop_range_degrees(degree: float, with_negative: bool = True) -> float:
+    """
+    The original range_degrees, which range_degrees and range_degrees_batch have to match.
+    """
+    while degree < 0:
+        degree += 360
+    while degree > 360:
+        degree -= 360
+    if with_negative:
+        degree -= 180
+    return degree
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+
+@pytest.mark.parametrize("with_negative", [True, False])
+@pytest.mark.parametrize("degree, expected", [(-720, 0), (-360, 0), (-1, 359), (0, 0), (1, 1), (360, 360),
+                                              (361, 1), (720, 360), (1080, 360)])
+def test_range_degrees_boundaries(degree, expected, with_negative):
+    expected -= 180 if with_negative else 0
+    assert _loop_range_degrees(degree, with_negative) == expected
+    assert tools.range_degrees(degree, with_negative) == expected
+    assert tools.range_degrees_batch([degree], with_negative).tolist() == [expected]
+
+
+@pytest.mark.parametrize("with_negative", [True, False])
+def test_range_degrees_matches_the_loop(rng, with_negative):
+    angles = rng.uniform(-5000, 5000, COUNT).tolist()
+    expected = [_loop_range_degrees(a, with_negative) for a in angles]
+    np.testing.assert_allclose([tools.range_degrees(a, with_negative) for a in angles], expected, atol=1e-9)
+    np.testing.assert_allclose(tools.range_degrees_batch(angles, with_negative), expected, atol=1e-9)
+
+
+def test_quaternion_to_euler_batch_matches_scalar(rng):
+    q = rng.normal(size=(COUNT, 4))
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    # Include the gimbal lock, where the pitch is clamped.
+    q[:2] = [[math.sqrt(0.5), 0, math.sqrt(0.5), 0], [math.sqrt(0.5), 0, -math.sqrt(0.5), 0]]
+
+    scalar = [tools.quaternion_to_euler(airsim.Quaternionr(x, y, z, w)) for w, x, y, z in q]
+    np.testing.assert_allclose(np.column_stack(tools.quaternion_to_euler_batch(*q.T)), scalar, atol=1e-9)
+
+
+def test_relative_to_global_batch_matches_scalar(rng):
+    positions = rng.uniform(-100, 100, (COUNT, 3))
+    yaws = rng.uniform(-720, 720, COUNT)
+    moves = rng.uniform(-10, 10, (COUNT, 3))
+
+    scalar = [tools.relative_to_global({'x': p[0], 'y': p[1], 'z': p[2]}, yaw, *move)
+              for p, yaw, move in zip(positions, yaws, moves)]
+    np.testing.assert_allclose(tools.relative_to_global_batch(positions, yaws, moves), scalar, atol=1e-9)
+
+
+def test_global_to_relative_velocity_batch_matches_scalar(rng):
+    velocities = rng.uniform(-10, 10, (COUNT, 3))
+    yaws = rng.uniform(-720, 720, COUNT)
+
+    scalar = [tools.global_to_relative_velocity(*v, yaw) for v, yaw in zip(velocities, yaws)]
+    np.testing.assert_allclose(tools.global_to_relative_velocity_batch(velocities, yaws), scalar, atol=1e-9)